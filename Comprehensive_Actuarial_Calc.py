@@ -1,8 +1,27 @@
+import io
 import streamlit as st
-import math
-import pandas as pd
-import plotly.graph_objects as go
 import numpy as np
+from actuarial import charts
+from actuarial.amortization import loan_model
+from actuarial.annuities import annuity_value
+from actuarial.bonds import price_bonds
+from actuarial.cache import ResultCache, cache_stats
+from actuarial.cashflows import DAY_COUNTS, load_cash_flows
+from actuarial.curves import yield_curve
+from actuarial.downsample import percentile_bands
+from actuarial.export import write_schedule_csv
+from actuarial.instrumentation import invocation, phase
+from actuarial.life import life_annuity_value, load_mortality_table, makeham_table
+from actuarial.retirement import (retirement_balance_series, retirement_funds,
+                                  simulate_retirement)
+from actuarial.scenarios import project_retirement
+from actuarial.sensitivity import sensitivity_grid
+from actuarial.solvers import solve_tvm_periods, solve_tvm_rate
+from actuarial.tvm import future_value, present_value, tvm_growth_series
+
+# Shared across sessions: identical inputs reuse numbers and built figures
+RESULTS = ResultCache('results', maxsize=256, ttl=3600)
+FIGURES = ResultCache('figures', maxsize=512, ttl=3600)
 
 
 def show_footer():  # Footer
@@ -29,18 +48,11 @@ def show_homepage():  # Homepage
 
 def create_sensitivity_analysis(base_value, shock_range, calculation_function, title,
                                 # Sensitivity Analysis
-                                xlabel="Interest Rate Shock (%)", ylabel="Value ($)"):
-    shocked_values = [calculation_function(shock) for shock in shock_range]
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=shock_range * 100, y=shocked_values,
-                             mode='lines', line=dict(color='red', width=2)))
-
-    fig.update_layout(
-        title_text=title,
-        xaxis_title=xlabel,
-        yaxis_title=ylabel,
-        yaxis_tickprefix='$', yaxis_tickformat=',.0f')
+                                xlabel="Interest Rate Shock (%)", ylabel="Value ($)", cache_key=None):
+    def build(): return charts.sensitivity_chart(
+        shock_range, calculation_function(shock_range), title, xlabel, ylabel)
+    fig = build() if cache_key is None else FIGURES.get_or_compute(
+        ('sensitivity', cache_key, shock_range, title, xlabel, ylabel), build)
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -53,10 +65,11 @@ def tvm_calculator():  # TVM Calculator
             "Future Value (FV)",
             "Present Value (PV)",
             "Interest Rate (r)",
-            "Number of periods (n)"
+            "Number of periods (n)",
+            "Dated Cash Flows (XNPV / XIRR)"
         ])
 
-        use_payment = st.checkbox("Include periodic payments")
+        use_payment = calc_type != "Dated Cash Flows (XNPV / XIRR)" and st.checkbox("Include periodic payments")
         PMT = 0.0
         payment_at_beginning = False
         if use_payment:
@@ -105,55 +118,59 @@ def tvm_calculator():  # TVM Calculator
             m = st.number_input(
                 "Compounding frequency per year (e.g. 1, 2, 12):", min_value=1, value=12, step=1)
             calc_button = st.button("Calculate Time")
+        elif calc_type == "Dated Cash Flows (XNPV / XIRR)":
+            flows_file = st.file_uploader("Cash flows CSV with date,amount columns (ISO dates)", type="csv")
+            r = st.number_input(
+                "Enter annual discount rate (in %, e.g. 5): ", value=5.0) / 100
+            compounding = {"Annual": 1, "Monthly": 12, "Daily": 365, "Continuous": 'continuous'}[
+                st.selectbox("Compounding:", ["Annual", "Monthly", "Daily", "Continuous"])]
+            convention = st.selectbox("Day count convention:", DAY_COUNTS)
+            calc_button = st.button("Calculate XNPV")
     with col2:
         if calc_button:
             if calc_type == "Future Value (FV)":
-                FV = PV * (1 + r/m) ** (n*m) + (PMT * ((1 + r/m) ** (n*m) - 1) / (r/m) * (1 + r/m)
-                                                if payment_at_beginning else PMT * ((1 + r/m) ** (n*m) - 1) / (r/m)) if use_payment else PV * (1 + r/m) ** (n*m)
+                FV = float(future_value(PV, r, n, m, PMT, payment_at_beginning))
                 st.success(f"Future Value after {n} years: ${FV:,.2f}")
             elif calc_type == "Present Value (PV)":
-                PV = FV / (1 + r/m) ** (n*m) - (PMT * ((1 + r/m) ** (n*m) - 1) / (r/m) / (1 + r/m) ** (n*m) * (1 + r/m)
-                                                if payment_at_beginning else PMT * ((1 + r/m) ** (n*m) - 1) / (r/m) / (1 + r/m) ** (n*m)) if use_payment else FV / (1 + r/m) ** (n*m)
+                PV = float(present_value(FV, r, n, m, PMT, payment_at_beginning))
                 st.success(f"Present Value: ${PV:,.2f}")
             elif calc_type == "Interest Rate (r)":
                 if use_payment:
-                    total_periods = n * m
-
-                    def f(x): return PV * (1 + x) ** total_periods + PMT * ((1 + x) ** total_periods - 1) / x * (1 + x) - \
-                        FV if payment_at_beginning else PV * \
-                        (1 + x) ** total_periods + PMT * \
-                        ((1 + x) ** total_periods - 1) / x - FV
-
-                    def df(x): return PV * total_periods * (1 + x) ** (total_periods - 1) + PMT * (
-                        total_periods * x * (1 + x) ** (total_periods - 1) - ((1 + x) ** total_periods - 1)) / (x ** 2)
-                    x = 0.05 / m
-                    for _ in range(20):
-                        x_new = x - f(x) / df(x)
-                        if abs(x_new - x) < 1e-8:
-                            break
-                        x = x_new
-                    r = x * m
+                    solution = solve_tvm_rate(
+                        PV, FV, PMT, n * m, payment_at_beginning)
+                    r = float(solution.root) * \
+                        m if solution.converged else None
+                else:
+                    r = m * float(np.expm1(np.log(FV / PV) / (n * m)))
+                if r is None:
+                    st.error(
+                        "No interest rate reaches the target future value with these inputs.")
                 else:
-                    r = m * ((FV / PV) ** (1 / (n * m)) - 1)
-                st.success(f"Required annual interest rate: {r * 100:.4f}%")
+                    st.success(
+                        f"Required annual interest rate: {r * 100:.4f}%")
             elif calc_type == "Number of periods (n)":
-                if use_payment:
-                    period_rate = r / m
-
-                    def f(n_periods): return PV * (1 + period_rate) ** n_periods + PMT * ((1 + period_rate) ** n_periods - 1) / period_rate * (1 + period_rate) - \
-                        FV if payment_at_beginning else PV * (1 + period_rate) ** n_periods + PMT * (
-                            (1 + period_rate) ** n_periods - 1) / period_rate - FV
-                    low, high = 1, 1000
-                    while high - low > 0.01:
-                        mid = (low + high) / 2
-                        if f(mid) < 0:
-                            low = mid
-                        else:
-                            high = mid
-                    n = low / m
+                try:
+                    n = float(solve_tvm_periods(
+                        PV, FV, PMT, r / m, payment_at_beginning)) / m
+                    st.success(f"Time required: {n:.2f} years")
+                except ValueError as error:
+                    st.error(str(error))
+            elif calc_type == "Dated Cash Flows (XNPV / XIRR)":
+                if flows_file is None:
+                    st.error("Upload a CSV of dated cash flows.")
                 else:
-                    n = math.log(FV / PV) / (m * math.log(1 + r / m))
-                st.success(f"Time required: {n:.2f} years")
+                    try:
+                        flows = load_cash_flows(io.StringIO(flows_file.getvalue().decode('utf-8')),
+                                                convention=convention)
+                        st.success(f"Net present value at {flows.valuation_date}: ${flows.npv(r, compounding):,.2f}")
+                        irr = flows.irr(compounding)
+                        if irr.converged:
+                            st.success(f"Internal rate of return: {irr.root * 100:.4f}%")
+                        else:
+                            st.error("No internal rate of return found for these cash flows.")
+                        st.write(f"{flows.amounts.size:,} flows from {flows.dates.min()} to {flows.dates.max()}")
+                    except ValueError as error:
+                        st.error(str(error))
 
     if calc_button and calc_type in ["Future Value (FV)", "Present Value (PV)"]:
         st.markdown("---")
@@ -162,46 +179,31 @@ def tvm_calculator():  # TVM Calculator
                              PMT if use_payment else 0, payment_at_beginning)
             create_sensitivity_analysis(
                 r, np.linspace(-0.03, 0.03, 21),
-                lambda shock: PV * (1 + (r+shock)/m) ** (n*m) + (PMT * ((1 + (r+shock)/m) ** (n*m) - 1) / ((r+shock)/m) * (1 + (r+shock)/m)
-                                                                 if payment_at_beginning else PMT * ((1 + (r+shock)/m) ** (n*m) - 1) / ((r+shock)/m)) if use_payment else PV * (1 + (r+shock)/m) ** (n*m),
+                lambda shock: future_value(
+                    PV, r + shock, n, m, PMT, payment_at_beginning),
                 f'Interest Rate Sensitivity Analysis - Future Value',
-                "Interest Rate Shock (%)", "Future Value ($)"
+                "Interest Rate Shock (%)", "Future Value ($)",
+                ('tvm', "FV", PV, r, n, m, PMT, payment_at_beginning)
             )
         else:
             create_tvm_chart(FV, r, n, m, "PV",
                              PMT if use_payment else 0, payment_at_beginning)
             create_sensitivity_analysis(
                 r, np.linspace(-0.03, 0.03, 21),
-                lambda shock: FV / (1 + (r+shock)/m) ** (n*m) - (PMT * ((1 + (r+shock)/m) ** (n*m) - 1) / ((r+shock)/m) / (1 + (r+shock)/m) ** (n*m) * (1 + (r+shock)/m)
-                                                                 if payment_at_beginning else PMT * ((1 + (r+shock)/m) ** (n*m) - 1) / ((r+shock)/m) / (1 + (r+shock)/m) ** (n*m)) if use_payment else FV / (1 + (r+shock)/m) ** (n*m),
+                lambda shock: present_value(
+                    FV, r + shock, n, m, PMT, payment_at_beginning),
                 f'Interest Rate Sensitivity Analysis - Present Value',
-                "Interest Rate Shock (%)", "Present Value ($)"
+                "Interest Rate Shock (%)", "Present Value ($)",
+                ('tvm', "PV", FV, r, n, m, PMT, payment_at_beginning)
             )
     show_footer()
 
 
 def create_tvm_chart(value, r, n, m, calc_type, PMT=0, payment_at_beginning=False):
-    years = []
-    values = []
-    for year in range(n + 1):
-        if calc_type == "FV":
-            result = value * (1 + r/m) ** (year*m) + (PMT * ((1 + r/m) ** (year*m) - 1) / (r/m) * (1 + r/m)
-                                                      if payment_at_beginning else PMT * ((1 + r/m) ** (year*m) - 1) / (r/m)) if PMT > 0 else value * (1 + r/m) ** (year*m)
-        else:
-            result = value / (1 + r/m) ** (year*m) - (PMT * ((1 + r/m) ** (year*m) - 1) / (r/m) / (1 + r/m) ** (year*m) * (1 + r/m)
-                                                      if payment_at_beginning else PMT * ((1 + r/m) ** (year*m) - 1) / (r/m) / (1 + r/m) ** (year*m)) if PMT > 0 else value / (1 + r/m) ** (year*m)
-        years.append(year)
-        values.append(result)
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=years, y=values, mode='lines+markers',
-                             line=dict(color='blue', width=2)))
-
-    fig.update_layout(
-        title_text=f'Time Value of Money - {calc_type} Growth',
-        xaxis_title='Years',
-        yaxis_title='Value ($)',
-        yaxis_tickprefix='$', yaxis_tickformat=',.0f')
+    def build(): return charts.tvm_chart(*tvm_growth_series(
+        value, r, n, m, calc_type, PMT, payment_at_beginning), calc_type)
+    fig = FIGURES.get_or_compute(
+        ('tvm chart', value, r, n, m, calc_type, PMT, payment_at_beginning), build)
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -214,18 +216,24 @@ def annuity_calculator():  # Annuity Calculator
             "Annuity Immediate",
             "Annuity Due",
             "Growing Annuity",
-            "Deferred Annuity"
+            "Deferred Annuity",
+            "Life Annuity"
         ])
-        calc_choice = st.selectbox("Choose calculation:", [
-            "Present Value (PV)", "Future Value (FV)"])
+        if annuity_type == "Life Annuity":
+            calc_choice = "Present Value (PV)"
+        else:
+            calc_choice = st.selectbox("Choose calculation:", [
+                "Present Value (PV)", "Future Value (FV)"])
+        value_choice = "PV" if calc_choice == "Present Value (PV)" else "FV"
 
         # Common inputs
         PMT = st.number_input("Enter payment per period: $",
                               min_value=0.0, value=1000.0)
         r = st.number_input(
             "Interest rate per period (in %, e.g. 6): ", min_value=0.0, value=6.0) / 100
-        n = st.number_input("Number of periods:",
-                            min_value=1, value=10, step=1)
+        if annuity_type != "Life Annuity":
+            n = st.number_input("Number of periods:",
+                                min_value=1, value=10, step=1)
 
         # Type-specific inputs
         if annuity_type == "Growing Annuity":
@@ -234,74 +242,60 @@ def annuity_calculator():  # Annuity Calculator
         elif annuity_type == "Deferred Annuity":
             m = st.number_input("Number of deferral periods:",
                                 min_value=0, value=5, step=1)
-
+        elif annuity_type == "Life Annuity":
+            table_file = st.file_uploader(
+                "Mortality table CSV with age,qx columns (default: Standard Ultimate Life Table)", type="csv")
+            table = load_mortality_table(io.StringIO(table_file.getvalue().decode('utf-8')), table_file.name) \
+                if table_file is not None else makeham_table()
+            age = st.number_input("Age of annuitant:", min_value=table.min_age,
+                                  max_value=table.max_age, value=max(table.min_age, min(65, table.max_age)), step=1)
+            n = st.number_input("Payment term in years (0 = for life):",
+                                min_value=0, value=0, step=1)
+            m = st.number_input("Number of deferral years:",
+                                min_value=0, value=0, step=1)
+            due = st.selectbox("Payment timing:", [
+                "Beginning of year", "End of year"]) == "Beginning of year"
+
+            def life_value(rate): return life_annuity_value(
+                table, PMT, rate, age, n or None, m, due)
+
+        label = "Immediate Annuity" if annuity_type == "Annuity Immediate" else annuity_type
         calc_button = st.button("Calculate")
     with col2:
-        if calc_button:
-            if annuity_type == "Annuity Immediate":
-                result = PMT * \
-                    ((1 - (1 + r) ** -n) / r) if calc_choice == "PV" else PMT * \
-                    (((1 + r) ** n - 1) / r)
-                st.success(
-                    f"{'Present' if calc_choice == 'PV' else 'Future'} Value of Immediate Annuity: ${result:,.2f}")
-            elif annuity_type == "Annuity Due":
-                result = PMT * ((1 - (1 + r) ** -n) / r) * (
-                    1 + r) if calc_choice == "PV" else PMT * (((1 + r) ** n - 1) / r) * (1 + r)
-                st.success(
-                    f"{'Present' if calc_choice == 'PV' else 'Future'} Value of Annuity Due: ${result:,.2f}")
-            elif annuity_type == "Growing Annuity":
-                if calc_choice == "PV":
-                    result = n * PMT / (1 + r) if r == g else PMT * \
-                        (1 - ((1 + g) / (1 + r)) ** n) / (r - g)
-                else:
-                    result = n * PMT * \
-                        (1 + r) ** (n - 1) if r == g else PMT * \
-                        (((1 + r) ** n - (1 + g) ** n) / (r - g))
-                st.success(
-                    f"{'Present' if calc_choice == 'PV' else 'Future'} Value of Growing Annuity: ${result:,.2f}")
-            elif annuity_type == "Deferred Annuity":
-                if calc_choice == "PV":
-                    pv_immediate = PMT * ((1 - (1 + r) ** -n) / r)
-                    result = pv_immediate / (1 + r) ** m
-                else:
-                    fv_immediate = PMT * (((1 + r) ** n - 1) / r)
-                    result = fv_immediate * ((1 + r) ** m)
-                st.success(
-                    f"{'Present' if calc_choice == 'PV' else 'Future'} Value of Deferred Annuity: ${result:,.2f}")
+        if calc_button and annuity_type == "Life Annuity":
+            result = float(life_value(r))
+            st.success(f"Expected Present Value of Life Annuity: ${result:,.2f}")
+            st.write(
+                f"Annuity factor: {result / PMT if PMT else 0:.4f} ({table.name} table)")
+        elif calc_button:
+            result = float(annuity_value(annuity_type, value_choice, PMT, r, n,
+                                         g if annuity_type == "Growing Annuity" else 0.0,
+                                         m if annuity_type == "Deferred Annuity" else 0))
+            st.success(
+                f"{'Present' if value_choice == 'PV' else 'Future'} Value of {label}: ${result:,.2f}")
 
     if calc_button:
         st.markdown("---")
-        if annuity_type == "Annuity Immediate":
-            def sensitivity_func(shock): return PMT * ((1 - (1 + r + shock) ** -n) / (
-                r + shock)) if calc_choice == "PV" else PMT * (((1 + r + shock) ** n - 1) / (r + shock))
-            title = f'Interest Rate Sensitivity Analysis - Immediate Annuity {calc_choice}'
-        elif annuity_type == "Annuity Due":
-            def sensitivity_func(shock): return PMT * ((1 - (1 + r + shock) ** -n) / (r + shock)) * (
-                1 + r + shock) if calc_choice == "PV" else PMT * (((1 + r + shock) ** n - 1) / (r + shock)) * (1 + r + shock)
-            title = f'Interest Rate Sensitivity Analysis - Annuity Due {calc_choice}'
-        elif annuity_type == "Growing Annuity":
-            if calc_choice == "PV":
-                def sensitivity_func(shock): return n * PMT / (1 + r + shock) if r + \
-                    shock == g else PMT * (1 - ((1 + g) / (1 + r + shock)) ** n) / (r + shock - g)
-            else:
-                def sensitivity_func(shock): return n * PMT * (1 + r + shock) ** (n - 1) if r + \
-                    shock == g else PMT * (((1 + r + shock) ** n - (1 + g) ** n) / (r + shock - g))
-            title = f'Interest Rate Sensitivity Analysis - Growing Annuity {calc_choice}'
-        elif annuity_type == "Deferred Annuity":
-            if calc_choice == "PV":
-                def sensitivity_func(shock): return (
-                    PMT * ((1 - (1 + r + shock) ** -n) / (r + shock))) / (1 + r + shock) ** m
-            else:
-                def sensitivity_func(shock): return (
-                    PMT * (((1 + r + shock) ** n - 1) / (r + shock))) * (1 + r + shock) ** m
-            title = f'Interest Rate Sensitivity Analysis - Deferred Annuity {calc_choice}'
+
+        if annuity_type == "Life Annuity":
+            def sensitivity_func(shock): return life_value(r + shock)
+        else:
+            def sensitivity_func(shock): return annuity_value(
+                annuity_type, value_choice, PMT, r + shock, n,
+                g if annuity_type == "Growing Annuity" else 0.0,
+                m if annuity_type == "Deferred Annuity" else 0)
+        title = f'Interest Rate Sensitivity Analysis - {label} {value_choice}'
 
         create_sensitivity_analysis(
             r, np.linspace(-0.03, 0.03, 21),
             sensitivity_func,
             title,
             "Interest Rate Shock (%)",
-            f"{calc_choice} Value ($)"
+            f"{value_choice} Value ($)",
+            ('annuity', annuity_type, value_choice, PMT, r, n,
+             g if annuity_type == "Growing Annuity" else 0.0,
+             m if annuity_type in ("Deferred Annuity", "Life Annuity") else 0,
+             (table.key, age, due) if annuity_type == "Life Annuity" else None)
         )
     show_footer()
 
@@ -317,30 +311,45 @@ def bond_pricing():  # Bond Pricing
             "Enter annual coupon rate (in %, e.g. 5): ", min_value=0.0, value=5.0) / 100
         years = st.number_input(
             "Enter years to maturity:", min_value=1, value=10, step=1)
-        ytm = st.number_input(
-            "Enter yield to maturity (in %, e.g. 4): ", min_value=0.0, value=4.0) / 100
+        discounting = st.radio("Discount with:", ["Flat yield to maturity", "Par yield curve"])
+        if discounting == "Par yield curve":
+            quotes = st.text_input(
+                "Par yields by tenor (years:%, comma-separated):",
+                value="0.5:4.6, 1:4.4, 2:4.2, 5:4.0, 10:4.1, 30:4.4")
+            ytm = None
+        else:
+            ytm = st.number_input(
+                "Enter yield to maturity (in %, e.g. 4): ", min_value=0.0, value=4.0) / 100
         frequency = st.number_input(
             "Coupon payments per year (1=annual, 2=semi-annual):", min_value=1, value=2, step=1)
         calc_button = st.button("Calculate")
+    curve = None
+    if calc_button and ytm is None:
+        try:
+            tenors, par_yields = zip(*((float(t), float(y) / 100) for t, y in
+                                       (quote.split(':') for quote in quotes.split(','))))
+            curve = yield_curve(list(tenors), list(par_yields), basis='par', frequency=2)
+        except ValueError:
+            st.error("Enter the curve as tenor:yield pairs, e.g. 1:4.4, 5:4.0")
+            calc_button = False
     with col2:
         if calc_button:
-            coupon_payment = (face_value * coupon_rate) / frequency
-            periods = years * frequency
-            period_rate = ytm / frequency
-            pv_coupons = coupon_payment * \
-                ((1 - (1 + period_rate) ** -periods) / period_rate)
-            pv_face = face_value / (1 + period_rate) ** periods
-            bond_price = pv_coupons + pv_face
-
-            macaulay_duration = sum((t / frequency) * (coupon_payment if t < periods else coupon_payment +
-                                    face_value) / (1 + period_rate) ** t for t in range(1, periods + 1)) / bond_price
-            modified_duration = macaulay_duration / (1 + ytm / frequency)
+            bond = price_bonds(face_value, coupon_rate,
+                               years, curve or ytm, frequency)
+            bond_price = float(bond['price'])
+            pv_coupons = float(bond['pv_coupons'])
+            pv_face = float(bond['pv_face'])
+            macaulay_duration = float(bond['macaulay_duration'])
+            modified_duration = float(bond['modified_duration'])
 
             st.success(f"Bond Price: ${bond_price:,.2f}")
             st.write(f"Present Value of Coupons: ${pv_coupons:,.2f}")
             st.write(f"Present Value of Face Value: ${pv_face:,.2f}")
+            if curve is not None:
+                st.write(f"Yield to Maturity: {float(bond['ytm']) * 100:.4f}%")
             st.write(f"Macaulay Duration: {macaulay_duration:.4f} years")
             st.write(f"Modified Duration: {modified_duration:.4f} years")
+            st.write(f"Convexity: {float(bond['convexity']):.4f}")
 
             if abs(bond_price - face_value) < 0.01:
                 st.info("The bond is selling at par.")
@@ -351,14 +360,29 @@ def bond_pricing():  # Bond Pricing
 
     if calc_button:
         st.markdown("---")
-        create_sensitivity_analysis(
-            ytm, np.linspace(-0.03, 0.03, 21),
-            lambda shock: ((face_value * coupon_rate) / frequency) * ((1 - (1 + (ytm + shock) / frequency) ** -(years * frequency)
-                                                                       ) / ((ytm + shock) / frequency)) + face_value / (1 + (ytm + shock) / frequency) ** (years * frequency),
-            'Bond Price Sensitivity to Interest Rate Changes',
-            "Interest Rate Shock (%)",
-            "Bond Price ($)"
-        )
+        if curve is None:
+            create_sensitivity_analysis(
+                ytm, np.linspace(-0.03, 0.03, 21),
+                lambda shocks: sensitivity_grid(
+                    lambda ytm: price_bonds(face_value, coupon_rate, years, ytm, frequency)['price'],
+                    {'ytm': ytm}, {'ytm': shocks}).values,
+                'Bond Price Sensitivity to Interest Rate Changes',
+                "Interest Rate Shock (%)",
+                "Bond Price ($)",
+                ('bond', face_value, coupon_rate, years, ytm, frequency)
+            )
+        else:
+            create_sensitivity_analysis(
+                0.0, np.linspace(-0.03, 0.03, 21),
+                lambda shocks: sensitivity_grid(
+                    lambda curve_shift: price_bonds(face_value, coupon_rate, years, curve, frequency,
+                                                    curve_shift)['price'],
+                    {'curve_shift': 0.0}, {'curve_shift': shocks}).values,
+                'Bond Price Sensitivity to Parallel Curve Shifts',
+                "Curve Shift (%)",
+                "Bond Price ($)",
+                ('bond curve', face_value, coupon_rate, years, curve.key, frequency)
+            )
     show_footer()
 
 
@@ -378,23 +402,13 @@ def loan_amortization():  # Loan Amortization
         calc_button = st.button("Calculate")
     with col2:
         if calc_button:
-            monthly_rate = annual_rate / 12
-            n_payments = years * 12
-            monthly_payment = principal * \
-                (monthly_rate * (1 + monthly_rate) ** n_payments) / \
-                ((1 + monthly_rate) ** n_payments - 1)
-            total_monthly_payment = monthly_payment + extra_payment
+            with phase('math'):
+                loan = loan_model(principal, annual_rate, years, extra_payment)
+            monthly_payment = loan.monthly_payment
+            total_monthly_payment = loan.total_payment
 
             if extra_payment > 0:
-                balance, payment_num = principal, 0
-                while balance > 0 and payment_num < 1000:
-                    payment_num += 1
-                    interest_payment = balance * monthly_rate
-                    principal_payment = min(
-                        total_monthly_payment - interest_payment, balance)
-                    balance -= principal_payment
-
-                time_to_pay_off_years = payment_num / 12
+                time_to_pay_off_years = loan.payoff_month / 12
                 time_saved_years = years - time_to_pay_off_years
 
                 st.success(f"Monthly Payment (base): ${monthly_payment:,.2f}")
@@ -403,104 +417,46 @@ def loan_amortization():  # Loan Amortization
                 st.write(f"Time to Pay Off: {time_to_pay_off_years:.2f} years")
                 st.write(f"Time Saved: {time_saved_years:.2f} years")
                 st.write(
-                    f"Total Payments: ${total_monthly_payment * payment_num:,.2f}")
+                    f"Total Payments: ${loan.total_payments:,.2f}")
                 st.write(
-                    f"Total Interest: ${(total_monthly_payment * payment_num) - principal:,.2f}")
+                    f"Total Interest: ${loan.total_interest:,.2f}")
             else:
                 st.success(f"Monthly Payment: ${monthly_payment:,.2f}")
                 st.write(
-                    f"Total Payments: ${monthly_payment * n_payments:,.2f}")
+                    f"Total Payments: ${loan.total_payments:,.2f}")
                 st.write(
-                    f"Total Interest: ${(monthly_payment * n_payments) - principal:,.2f}")
+                    f"Total Interest: ${loan.total_interest:,.2f}")
 
     if calc_button:
         st.markdown("---")
-        schedule = generate_amortization_schedule_with_extra(
-            principal, monthly_rate, n_payments, monthly_payment, extra_payment) if extra_payment > 0 else generate_amortization_schedule(
-            principal, monthly_rate, n_payments, monthly_payment)
-
-        df = pd.DataFrame(schedule)
-        st.dataframe(df)
-        csv = df.to_csv(index=False).encode('utf-8')
+        with phase('math'):
+            schedule = loan.schedule
+
+        with phase('dataframe'):
+            df = schedule.to_dataframe(decimals=2)
+        with phase('render'):
+            st.dataframe(df)
+        loan_key = (principal, annual_rate, years, extra_payment)
+
+        def build_csv():
+            with phase('csv'):
+                csv = io.StringIO()
+                write_schedule_csv(schedule, csv)
+                return csv.getvalue().encode('utf-8')
         st.download_button(
             label="Download Amortization Schedule as CSV",
-            data=csv,
+            data=RESULTS.get_or_compute(('schedule csv', loan_key), build_csv),
             file_name="loan_amortization.csv",
             mime="text/csv"
         )
-        create_amortization_chart(schedule)
+        create_amortization_chart(schedule, loan_key)
     show_footer()
 
 
-def generate_amortization_schedule(principal, monthly_rate, n_payments, monthly_payment):
-    schedule = []
-    balance = principal
-    for payment_num in range(1, n_payments + 1):
-        interest = balance * monthly_rate
-        principal_payment = monthly_payment - interest
-        ending_balance = balance - principal_payment
-        schedule.append({
-            'Payment': payment_num,
-            'Beginning Balance': round(balance, 2),
-            'Monthly Payment': round(monthly_payment, 2),
-            'Interest': round(interest, 2),
-            'Principal': round(principal_payment, 2),
-            'Ending Balance': round(ending_balance, 2)
-        })
-        balance = ending_balance
-    return schedule
-
-
-def generate_amortization_schedule_with_extra(principal, monthly_rate, n_payments, monthly_payment, extra_payment):
-    schedule, balance, total_payment, payment_num = [
-    ], principal, monthly_payment + extra_payment, 0
-
-    while balance > 0 and payment_num < 1000:
-        payment_num += 1
-        interest_payment = balance * monthly_rate
-        principal_payment = min(total_payment - interest_payment, balance)
-        balance -= principal_payment
-
-        # Adjusted last PMT
-        if balance < 0.01:
-            principal_payment += balance
-            total_payment = interest_payment + principal_payment
-            balance = 0
-
-        schedule.append({
-            'Payment': payment_num,
-            'Beginning Balance': round(balance + principal_payment, 2),
-            'Monthly Payment': round(total_payment, 2),
-            'Interest': round(interest_payment, 2),
-            'Principal': round(principal_payment, 2),
-            'Ending Balance': round(balance, 2)
-        })
-
-    return schedule
-
-
-def create_amortization_chart(schedule):
-    payments = [row['Payment'] for row in schedule]
-    interest_payments = [row['Interest'] for row in schedule]
-    principal_payments = [row['Principal'] for row in schedule]
-    balances = [row['Ending Balance'] for row in schedule]
-
-    # Chart 1: Principal vs Interest
-    fig1 = go.Figure()
-    fig1.add_trace(go.Scatter(x=payments, y=interest_payments,
-                              mode='lines', name='Interest', line=dict(color='red', width=2)))
-    fig1.add_trace(go.Scatter(x=payments, y=principal_payments,
-                              mode='lines', name='Principal', line=dict(color='blue', width=2)))
-    fig1.update_layout(title_text='Principal vs Interest Payments Over Time',
-                       xaxis_title='Payment Number', yaxis_title='Payment Amount ($)')
+def create_amortization_chart(schedule, cache_key=None):
+    fig1, fig2 = charts.amortization_charts(schedule) if cache_key is None else FIGURES.get_or_compute(
+        ('amortization charts', cache_key), lambda: charts.amortization_charts(schedule))
     st.plotly_chart(fig1, use_container_width=True)
-
-    # Chart 2: Outstanding Balance
-    fig2 = go.Figure()
-    fig2.add_trace(go.Scatter(x=payments, y=balances,
-                              mode='lines', name='Balance', line=dict(color='green', width=2)))
-    fig2.update_layout(title_text='Outstanding Loan Balance',
-                       xaxis_title='Payment Number', yaxis_title='Balance ($)')
     st.plotly_chart(fig2, use_container_width=True)
 
 
@@ -519,16 +475,26 @@ def retirement_planning():  # Retirement Planning
             "Enter monthly contribution: $", min_value=0.0, value=500.0)
         annual_return = st.number_input(
             "Enter expected annual return (in %, e.g. 7): ", min_value=0.0, value=7.0) / 100
+        run_simulation = st.checkbox("Run Monte Carlo simulation")
+        if run_simulation:
+            annual_volatility = st.number_input(
+                "Enter annual return volatility (in %, e.g. 15): ", min_value=0.0, value=15.0) / 100
+            end_age = st.number_input(
+                "Plan withdrawals until age:", min_value=0, value=95, step=1)
+            n_paths = st.number_input(
+                "Number of simulated paths:", min_value=100, value=100000, step=1000)
+        compare_scenarios = st.checkbox("Compare scenarios")
+        if compare_scenarios:
+            return_range = st.slider("Annual return range (%):", 0.0, 15.0, (4.0, 10.0), 0.5)
+            contribution_range = st.slider("Monthly contribution range ($):", 0, 5000, (250, 1000), 50)
+            retirement_ages = st.multiselect("Retirement ages:", list(range(50, 76)), [62, 65, 67])
+            grid_steps = st.number_input("Steps per range:", min_value=2, value=10, step=1)
         calc_button = st.button("Calculate")
     with col2:
         if calc_button:
             years_to_retirement = retirement_age - current_age
-            months_to_retirement = years_to_retirement * 12
-            monthly_return = annual_return / 12
-            fv_current = current_savings * \
-                (1 + annual_return) ** years_to_retirement
-            fv_contributions = monthly_contribution * \
-                (((1 + monthly_return) ** months_to_retirement - 1) / monthly_return)
+            fv_current, fv_contributions = (float(value) for value in retirement_funds(
+                current_savings, monthly_contribution, annual_return, years_to_retirement))
             total_retirement_funds = fv_current + fv_contributions
             annual_withdrawal = total_retirement_funds * 0.04
             monthly_withdrawal = annual_withdrawal / 12
@@ -551,36 +517,59 @@ def retirement_planning():  # Retirement Planning
 
         create_sensitivity_analysis(
             annual_return, np.linspace(-0.05, 0.05, 21),
-            lambda shock: current_savings * (1 + annual_return + shock) ** (retirement_age - current_age) +
-            monthly_contribution * (((1 + (annual_return + shock) / 12) ** (
-                (retirement_age - current_age) * 12) - 1) / ((annual_return + shock) / 12)),
+            lambda shock: sum(retirement_funds(current_savings, monthly_contribution,
+                                               annual_return + shock, retirement_age - current_age)),
             'Retirement Funds Sensitivity to Return Rate Changes',
             "Return Rate Shock (%)",
-            "Total Retirement Funds ($)"
+            "Total Retirement Funds ($)",
+            ('retirement', current_savings, monthly_contribution,
+             annual_return, retirement_age - current_age)
         )
+
+        if run_simulation:
+            simulation_key = (current_age, retirement_age, current_savings, monthly_contribution,
+                              annual_return, annual_volatility, end_age, n_paths)
+            try:
+                simulation = RESULTS.get_or_compute(
+                    ('simulation', simulation_key), lambda: simulate_retirement(*simulation_key))
+            except ValueError as error:
+                st.error(str(error))
+            else:
+                st.success(
+                    f"Probability savings last until age {end_age}: {simulation['success_probability']:.1%}")
+                create_monte_carlo_chart(simulation, simulation_key)
+
+        if compare_scenarios and retirement_ages:
+            returns, contributions, ages = (grid.ravel() for grid in np.meshgrid(
+                np.linspace(*return_range, grid_steps) / 100, np.linspace(*contribution_range, grid_steps),
+                retirement_ages))
+            try:
+                projection = project_retirement({'current_age': current_age, 'retirement_age': ages,
+                                                 'current_savings': current_savings,
+                                                 'monthly_contribution': contributions, 'annual_return': returns})
+            except ValueError as error:
+                st.error(str(error))
+            else:
+                st.write(f"{returns.size:,} scenarios: median balance at retirement "
+                         f"${np.median(projection['retirement_balance']):,.2f}")
+                fig = charts.monte_carlo_chart(
+                    {'ages': projection['ages'], 'percentiles': percentile_bands(projection['balances'], axis=1)},
+                    title='Retirement Savings by Age Across Scenarios')
+                st.plotly_chart(fig, use_container_width=True)
     show_footer()
 
 
 def create_retirement_chart(current_age, retirement_age, current_savings, monthly_contribution, annual_return):
-    ages = []
-    balances = []
-    balance = current_savings
-    monthly_return = annual_return / 12
-    for age in range(current_age, retirement_age + 1):
-        ages.append(age)
-        balances.append(balance)
-        if age < retirement_age:
-            for _ in range(12):
-                balance = balance * (1 + monthly_return) + monthly_contribution
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=ages, y=balances, mode='lines+markers',
-                             line=dict(color='green', width=2)))
-    fig.update_layout(
-        title_text='Retirement Savings Growth Over Time',
-        xaxis_title='Age',
-        yaxis_title='Retirement Savings ($)',
-        yaxis_tickprefix='$', yaxis_tickformat=',.0f')
+    def build(): return charts.retirement_chart(*retirement_balance_series(
+        current_age, retirement_age, current_savings, monthly_contribution, annual_return))
+    fig = FIGURES.get_or_compute(('retirement chart', current_age, retirement_age,
+                                  current_savings, monthly_contribution, annual_return), build)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def create_monte_carlo_chart(simulation, cache_key=None):
+    fig = charts.monte_carlo_chart(simulation) if cache_key is None else FIGURES.get_or_compute(
+        ('monte carlo chart', cache_key), lambda: charts.monte_carlo_chart(simulation))
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -595,19 +584,22 @@ def main():  # Main App
             "Retirement Planning 🌴"
             ]
     choice = st.sidebar.selectbox("Select Calculator", menu)
-
-    if choice == "Home 🏠":
-        show_homepage()
-    elif choice == "Time Value of Money ⏳":
-        tvm_calculator()
-    elif choice == "Annuity Calculator 💰":
-        annuity_calculator()
-    elif choice == "Bond Pricing 💵":
-        bond_pricing()
-    elif choice == "Loan Amortization 🏦":
-        loan_amortization()
-    elif choice == "Retirement Planning 🌴":
-        retirement_planning()
+    with st.sidebar.expander("Cache statistics"):
+        st.json(cache_stats())
+
+    with invocation(choice):
+        if choice == "Home 🏠":
+            show_homepage()
+        elif choice == "Time Value of Money ⏳":
+            tvm_calculator()
+        elif choice == "Annuity Calculator 💰":
+            annuity_calculator()
+        elif choice == "Bond Pricing 💵":
+            bond_pricing()
+        elif choice == "Loan Amortization 🏦":
+            loan_amortization()
+        elif choice == "Retirement Planning 🌴":
+            retirement_planning()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+# Headless calculation core. Submodules import nothing heavier than NumPy and
+# are loaded on first attribute access, so `import actuarial` stays cheap.
+import importlib
+
+_EXPORTS = {
+    'use_backend': 'accel',
+    'amortize_portfolio': 'amortization',
+    'generate_amortization_schedule': 'amortization',
+    'generate_amortization_schedule_with_extra': 'amortization',
+    'iter_amortization_schedule': 'amortization',
+    'iter_amortization_schedule_with_extra': 'amortization',
+    'LoanModel': 'amortization',
+    'LoanSchedule': 'amortization',
+    'loan_model': 'amortization',
+    'loan_summaries': 'amortization',
+    'annuity_due': 'annuities',
+    'annuity_immediate': 'annuities',
+    'annuity_value': 'annuities',
+    'deferred_annuity': 'annuities',
+    'growing_annuity': 'annuities',
+    'price_bonds': 'bonds',
+    'run_batch': 'batch',
+    'CashFlows': 'cashflows',
+    'load_cash_flows': 'cashflows',
+    'xirr': 'cashflows',
+    'xnpv': 'cashflows',
+    'year_fractions': 'cashflows',
+    'yield_curve': 'curves',
+    'YieldCurve': 'curves',
+    'LoanPool': 'pool',
+    'pool_cash_flows': 'pool',
+    'prepayment_rates': 'pool',
+    'GrowthTable': 'scenarios',
+    'project_retirement': 'scenarios',
+    'Schedule': 'schedule',
+    'CommutationTable': 'life',
+    'commutation_table': 'life',
+    'life_annuity_value': 'life',
+    'load_mortality_table': 'life',
+    'makeham_table': 'life',
+    'MortalityTable': 'life',
+    'cache_stats': 'cache',
+    'ResultCache': 'cache',
+    'accumulation_factor': 'kernels',
+    'annuity_factor': 'kernels',
+    'compensated_sum': 'kernels',
+    'growing_annuity_factor': 'kernels',
+    'iter_portfolio_rows': 'export',
+    'write_portfolio_csv': 'export',
+    'write_portfolio_parquet': 'export',
+    'write_schedule_csv': 'export',
+    'retirement_balance_series': 'retirement',
+    'retirement_funds': 'retirement',
+    'simulate_retirement': 'retirement',
+    'CalculationService': 'service',
+    'bump_and_reprice': 'sensitivity',
+    'finite_difference_greeks': 'sensitivity',
+    'key_rate_bumps': 'sensitivity',
+    'sensitivity_grid': 'sensitivity',
+    'SensitivityGrid': 'sensitivity',
+    'bond_ytm': 'solvers',
+    'newton_bisect': 'solvers',
+    'solve_tvm_periods': 'solvers',
+    'solve_tvm_rate': 'solvers',
+    'future_value': 'tvm',
+    'present_value': 'tvm',
+    'tvm_growth_series': 'tvm',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
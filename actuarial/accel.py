@@ -0,0 +1,74 @@
+# Optional compiled backend for the scalar loops (early payoff under extra
+# payments, LoanModel schedules, the Monte Carlo month loop, the Newton
+# passes of the rate solvers). When numba is installed the loops decorated
+# with @jit are compiled on first use and cached on disk, so later processes
+# skip the warm-up; otherwise the NumPy implementations run. Kernels repeat
+# the NumPy versions' floating-point operations in the same order, so every
+# backend gives bitwise identical results (tests/test_parity.py checks this).
+#
+#   ACTUARIAL_BACKEND=numpy|numba|auto   (default auto: numba when installed)
+#   ACTUARIAL_JIT_CACHE=<dir>            (default ~/.cache/actuarial/numba)
+import contextvars
+import functools
+import importlib.util
+import os
+import threading
+from contextlib import contextmanager
+
+BACKENDS = ('numpy', 'numba', 'python')  # 'python' runs the kernels uncompiled, for parity checks
+CACHE_DIR = os.environ.get('ACTUARIAL_JIT_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'actuarial', 'numba'))
+
+_backend = None  # Process default, detected once
+_detect_lock = threading.Lock()
+_forced = contextvars.ContextVar('actuarial_backend', default=None)  # use_backend, per thread / async task
+
+
+def available():  # numba importable, checked without importing it
+    return importlib.util.find_spec('numba') is not None
+
+
+def backend():  # Active backend name: use_backend's in this context, else the process default
+    global _backend
+    forced = _forced.get()
+    if forced is not None:
+        return forced
+    if _backend is None:
+        with _detect_lock:
+            requested = os.environ.get('ACTUARIAL_BACKEND', 'auto')
+            if requested not in BACKENDS + ('auto',):
+                raise ValueError(f"Unknown ACTUARIAL_BACKEND: {requested}; expected auto or one of {BACKENDS}")
+            if requested == 'numba' and not available():
+                raise ImportError("ACTUARIAL_BACKEND=numba requires numba: pip install numba")
+            _backend = requested if requested != 'auto' else 'numba' if available() else 'numpy'
+    return _backend
+
+
+@contextmanager
+def use_backend(name):  # Force a backend in the current thread or async task (for checks and benchmarks)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}; expected one of {BACKENDS}")
+    if name == 'numba' and not available():
+        raise ImportError("The numba backend requires numba: pip install numba")
+    token = _forced.set(name)
+    try:
+        yield
+    finally:
+        _forced.reset(token)
+
+
+def jit(func):  # Compile with numba on first call (disk-cached); the 'python' backend calls func as is
+    compiled = None
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        nonlocal compiled
+        if backend() == 'python':
+            return func(*args)
+        if compiled is None:
+            os.environ.setdefault('NUMBA_CACHE_DIR', CACHE_DIR)
+            import numba
+            compiled = numba.njit(cache=True, nogil=True, error_model='numpy')(func)  # x / 0 gives inf, as in NumPy
+        return compiled(*args)
+    wrapper.py_func = func
+    return wrapper
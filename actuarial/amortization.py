@@ -0,0 +1,553 @@
+import bisect
+
+import numpy as np
+
+from .accel import backend, jit
+from .cache import ResultCache
+from .kernels import accumulation_factor, annuity_factor, growth_factor
+from .schedule import SCHEDULE_FIELDS, Schedule
+
+PAYOFF_THRESHOLD = 0.01  # Balance below which the last payment is adjusted
+
+
+def level_payment(principal, monthly_rate, n_payments):  # Level monthly payment
+    return np.asarray(principal, dtype=float) / annuity_factor(monthly_rate, n_payments)
+
+
+def amortize_portfolio(principals, annual_rates, years, extra_payments=0.0):  # Batch schedules
+    # Every loan is stepped month by month together, so each row matches
+    # generate_amortization_schedule (no extra) or
+    # generate_amortization_schedule_with_extra (extra > 0) for that loan.
+    principals, annual_rates, years, extra_payments = np.broadcast_arrays(
+        np.asarray(principals, dtype=float), np.asarray(annual_rates, dtype=float),
+        np.asarray(years), np.asarray(extra_payments, dtype=float))
+    principals, annual_rates = principals.ravel(), annual_rates.ravel()
+    years, extra_payments = years.ravel(), extra_payments.ravel()
+
+    monthly_rate = annual_rates / 12
+    n_payments = (years * 12).astype(np.int64)
+    monthly_payment = level_payment(principals, monthly_rate, n_payments)
+    total_payment = monthly_payment + extra_payments
+    has_extra = extra_payments > 0
+
+    horizon = int(n_payments[~has_extra].max(initial=0))
+    if has_extra.any():
+        payoff = payoff_months(principals[has_extra], monthly_rate[has_extra], total_payment[has_extra])
+        horizon = max(horizon, int(payoff.max()) + 1)
+
+    amortize = _amortize_numpy if backend() == 'numpy' else _amortize_compiled
+    (beginning, payments, interest, principal_paid, ending), n_rows = amortize(
+        principals, monthly_rate, n_payments, monthly_payment, total_payment, has_extra, horizon)
+    return {
+        'Payment': np.arange(1, beginning.shape[1] + 1),
+        'Beginning Balance': beginning,
+        'Monthly Payment': payments,
+        'Interest': interest,
+        'Principal': principal_paid,
+        'Ending Balance': ending,
+        'Payments Made': n_rows,
+        'Base Payment': monthly_payment,
+    }
+
+
+def _amortize_numpy(principals, monthly_rate, n_payments, monthly_payment, total_payment, has_extra, horizon):
+    # All loans stepped together, one vectorized pass per month
+    n_loans = principals.size
+    beginning, payments, interest, principal_paid, ending = [], [], [], [], []
+    n_rows = np.zeros(n_loans, dtype=np.int64)
+
+    balance = principals.copy()
+    for k in range(horizon):
+        active = np.where(has_extra, balance > 0, k < n_payments)
+        if not active.any():
+            break
+        month_interest = balance * monthly_rate
+        month_principal = np.where(has_extra, np.minimum(total_payment - month_interest, balance),
+                                   monthly_payment - month_interest)
+        new_balance = balance - month_principal
+
+        # Adjusted last PMT
+        payoff = has_extra & (new_balance < PAYOFF_THRESHOLD)
+        month_principal = np.where(payoff, month_principal + new_balance, month_principal)
+        month_payment = np.where(payoff, month_interest + month_principal,
+                                 np.where(has_extra, total_payment, monthly_payment))
+        new_balance = np.where(payoff, 0.0, new_balance)
+
+        beginning.append(np.where(active, np.where(has_extra, new_balance + month_principal, balance), 0.0))
+        payments.append(np.where(active, month_payment, 0.0))
+        interest.append(np.where(active, month_interest, 0.0))
+        principal_paid.append(np.where(active, month_principal, 0.0))
+        ending.append(np.where(active, new_balance, 0.0))
+        n_rows += active
+        balance = np.where(active, new_balance, balance)
+
+    def stack(columns): return np.stack(columns, axis=1) if columns else np.zeros((n_loans, 0))
+    return [stack(columns) for columns in (beginning, payments, interest, principal_paid, ending)], n_rows
+
+
+def _amortize_compiled(principals, monthly_rate, n_payments, monthly_payment, total_payment, has_extra, horizon):
+    out = np.zeros((5, principals.size, horizon))
+    n_rows = np.zeros(principals.size, dtype=np.int64)
+    _amortize_loop(principals, monthly_rate, n_payments, monthly_payment, total_payment, has_extra,
+                   PAYOFF_THRESHOLD, out, n_rows)
+    months = int(n_rows.max(initial=0))
+    return [np.ascontiguousarray(columns[:, :months]) for columns in out], n_rows
+
+
+@jit
+def _amortize_loop(principals, monthly_rate, n_payments, monthly_payment, total_payment, has_extra, threshold,
+                   out, n_rows):  # One loan at a time, same operations as _amortize_numpy
+    for loan in range(principals.size):
+        balance = principals[loan]
+        rate, extra = monthly_rate[loan], has_extra[loan]
+        for k in range(out.shape[2]):
+            if not (balance > 0 if extra else k < n_payments[loan]):
+                break
+            month_interest = balance * rate
+            if extra:
+                month_principal = total_payment[loan] - month_interest
+                if not (month_principal <= balance or month_principal != month_principal):  # np.minimum
+                    month_principal = balance
+            else:
+                month_principal = monthly_payment[loan] - month_interest
+            new_balance = balance - month_principal
+
+            # Adjusted last PMT
+            if extra and new_balance < threshold:
+                month_principal = month_principal + new_balance
+                month_payment = month_interest + month_principal
+                new_balance = 0.0
+            else:
+                month_payment = total_payment[loan] if extra else monthly_payment[loan]
+
+            out[0, loan, k] = new_balance + month_principal if extra else balance
+            out[1, loan, k] = month_payment
+            out[2, loan, k] = month_interest
+            out[3, loan, k] = month_principal
+            out[4, loan, k] = new_balance
+            n_rows[loan] += 1
+            balance = new_balance
+
+
+def schedule_rows(schedules, loan):  # One loan back as the app's list-of-dicts rows
+    return Schedule.from_portfolio(schedules, loan).rows()
+
+
+def payoff_months(principal, monthly_rate, total_payment):  # Closed-form payoff month(s)
+    # Smallest k with B0 * (1+i)^k - T * ((1+i)^k - 1) / i below the payoff threshold
+    principal = np.asarray(principal, dtype=float)
+    monthly_rate = np.asarray(monthly_rate, dtype=float)
+    total_payment = np.asarray(total_payment, dtype=float)
+    if np.any((principal > 0) & (total_payment <= principal * monthly_rate)):
+        raise ValueError("Payment does not cover the monthly interest; the loan never pays off.")
+    with np.errstate(divide='ignore', invalid='ignore'):
+        periods = np.log((total_payment - PAYOFF_THRESHOLD * monthly_rate) /
+                         (total_payment - principal * monthly_rate)) / np.log1p(monthly_rate)
+        periods = np.where(monthly_rate == 0, (principal - PAYOFF_THRESHOLD) / total_payment, periods)
+    months = np.floor(periods).astype(np.int64) + 1
+    months = np.where(principal > 0, np.maximum(months, 1), 0)
+    # Nudge past floating-point ties at the threshold, so the month agrees with the balances
+    def balance(k): return _raw_balances(principal, monthly_rate, total_payment, k)
+
+    early = (months > 1) & (balance(months - 1) < PAYOFF_THRESHOLD)
+    while early.any():
+        months = months - early
+        early = (months > 1) & (balance(months - 1) < PAYOFF_THRESHOLD)
+    late = (months > 0) & (balance(months) >= PAYOFF_THRESHOLD)
+    while late.any():
+        months = months + late
+        late = (months > 0) & (balance(months) >= PAYOFF_THRESHOLD)
+    return months
+
+
+def _raw_balances(principal, monthly_rate, payment, k):  # Balance after k level payments, no payoff adjustment
+    return principal * growth_factor(monthly_rate, k) - payment * accumulation_factor(monthly_rate, k)
+
+
+def loan_summaries(principals, annual_rates, years, extra_payments=0.0):  # LoanModel totals for many loans
+    principals, annual_rates, years, extra_payments = np.broadcast_arrays(
+        np.asarray(principals, dtype=float), np.asarray(annual_rates, dtype=float),
+        np.asarray(years), np.asarray(extra_payments, dtype=float))
+    shape = principals.shape
+    principals, annual_rates, years, extra_payments = (a.ravel() for a in (principals, annual_rates, years,
+                                                                           extra_payments))
+    monthly_rate = annual_rates / 12
+    n_payments = (years * 12).astype(np.int64)
+    monthly_payment = level_payment(principals, monthly_rate, n_payments)
+    total_payment = monthly_payment + extra_payments
+    has_extra = extra_payments > 0
+
+    payoff = n_payments.copy()
+    if has_extra.any():
+        P, i, T = principals[has_extra], monthly_rate[has_extra], total_payment[has_extra]
+        payoff[has_extra] = payoff_months(P, i, T)
+
+    last_balance = _raw_balances(principals, monthly_rate, total_payment, np.maximum(payoff - 1, 0))
+    total_payments = np.where(has_extra & (payoff > 0),
+                              total_payment * (payoff - 1) + last_balance * (1 + monthly_rate),
+                              monthly_payment * payoff)
+    return {
+        'monthly_payment': monthly_payment.reshape(shape),
+        'total_monthly_payment': total_payment.reshape(shape),
+        'payoff_month': payoff.reshape(shape),
+        'total_payments': total_payments.reshape(shape),
+        'total_interest': (total_payments - principals).reshape(shape),
+    }
+
+
+def _level_steps(principal, monthly_rate, n_payments, monthly_payment):  # Unrounded row tuples, no extra
+    balance = principal
+    for payment_num in range(1, n_payments + 1):
+        interest = balance * monthly_rate
+        principal_payment = monthly_payment - interest
+        ending_balance = balance - principal_payment
+        yield payment_num, balance, monthly_payment, interest, principal_payment, ending_balance
+        balance = ending_balance
+
+
+def _extra_steps(principal, monthly_rate, n_payments, monthly_payment, extra_payment):  # Until paid off
+    balance, total_payment, payment_num = principal, monthly_payment + extra_payment, 0
+    if balance > 0 and total_payment <= balance * monthly_rate:
+        raise ValueError("Payment does not cover the monthly interest; the loan never pays off.")
+
+    while balance > 0:
+        payment_num += 1
+        interest_payment = balance * monthly_rate
+        principal_payment = min(total_payment - interest_payment, balance)
+        balance -= principal_payment
+
+        # Adjusted last PMT
+        if balance < PAYOFF_THRESHOLD:
+            principal_payment += balance
+            total_payment = interest_payment + principal_payment
+            balance = 0
+
+        yield payment_num, balance + principal_payment, total_payment, interest_payment, principal_payment, balance
+
+
+@jit
+def _schedule_loop(principal, monthly_rate, n_payments, monthly_payment, extra_payment, threshold, out):
+    # Rows of _level_steps (extra_payment 0) or _extra_steps into out, same operations; returns the row count
+    balance = principal
+    if extra_payment <= 0:
+        for k in range(n_payments):
+            interest = balance * monthly_rate
+            principal_payment = monthly_payment - interest
+            ending_balance = balance - principal_payment
+            out[k, 0], out[k, 1], out[k, 2] = k + 1, balance, monthly_payment
+            out[k, 3], out[k, 4], out[k, 5] = interest, principal_payment, ending_balance
+            balance = ending_balance
+        return n_payments
+    total_payment, k = monthly_payment + extra_payment, 0
+    while balance > 0 and k < out.shape[0]:
+        interest_payment = balance * monthly_rate
+        principal_payment = min(total_payment - interest_payment, balance)
+        balance -= principal_payment
+
+        # Adjusted last PMT
+        if balance < threshold:
+            principal_payment += balance
+            total_payment = interest_payment + principal_payment
+            balance = 0.0
+
+        out[k, 0], out[k, 1], out[k, 2] = k + 1, balance + principal_payment, total_payment
+        out[k, 3], out[k, 4], out[k, 5] = interest_payment, principal_payment, balance
+        k += 1
+    return k
+
+
+def _rounded_rows(steps):  # The legacy row dicts, rounded to cents
+    for payment_num, beginning, payment, interest, principal_payment, ending in steps:
+        yield {
+            'Payment': payment_num,
+            'Beginning Balance': round(beginning, 2),
+            'Monthly Payment': round(payment, 2),
+            'Interest': round(interest, 2),
+            'Principal': round(principal_payment, 2),
+            'Ending Balance': round(ending, 2)
+        }
+
+
+def iter_amortization_schedule(principal, monthly_rate, n_payments, monthly_payment):  # Rows one at a time
+    return _rounded_rows(_level_steps(principal, monthly_rate, n_payments, monthly_payment))
+
+
+def iter_amortization_schedule_with_extra(principal, monthly_rate, n_payments, monthly_payment, extra_payment):
+    return _rounded_rows(_extra_steps(principal, monthly_rate, n_payments, monthly_payment, extra_payment))
+
+
+def generate_amortization_schedule(principal, monthly_rate, n_payments, monthly_payment):
+    return list(iter_amortization_schedule(principal, monthly_rate, n_payments, monthly_payment))
+
+
+def generate_amortization_schedule_with_extra(principal, monthly_rate, n_payments, monthly_payment, extra_payment):
+    return list(iter_amortization_schedule_with_extra(
+        principal, monthly_rate, n_payments, monthly_payment, extra_payment))
+
+
+class LoanModel:  # Closed-form balance queries for one loan
+    def __init__(self, principal, annual_rate, years, extra_payment=0.0):
+        self.principal = float(principal)
+        self.annual_rate = float(annual_rate)
+        self.years = int(years)
+        self.extra_payment = float(extra_payment)
+        self.monthly_rate = self.annual_rate / 12
+        self.n_payments = self.years * 12
+        self.monthly_payment = float(level_payment(self.principal, self.monthly_rate, self.n_payments))
+        self.total_payment = self.monthly_payment + self.extra_payment
+        self.payoff_month = (self.n_payments if self.extra_payment <= 0 else
+                             int(payoff_months(self.principal, self.monthly_rate, self.total_payment)))
+        self._schedule = None
+
+    def _raw_balance(self, k):  # Balance after k payments of total_payment, no payoff adjustment
+        payment = self.total_payment if self.extra_payment > 0 else self.monthly_payment
+        return float(_raw_balances(self.principal, self.monthly_rate, payment, k))
+
+    def balance(self, k):  # Ending balance after payment k
+        k = max(0, int(k))
+        if k >= self.payoff_month:
+            return 0.0
+        return self._raw_balance(k)
+
+    def payments_to_date(self, k):  # Total paid through payment k
+        k = min(max(0, int(k)), self.payoff_month)
+        if self.extra_payment <= 0:
+            return self.monthly_payment * k
+        if k == self.payoff_month and k > 0:
+            return self.total_payment * (k - 1) + self._raw_balance(k - 1) * (1 + self.monthly_rate)
+        return self.total_payment * k
+
+    def principal_to_date(self, k):  # Cumulative principal through payment k
+        return self.principal - self.balance(k)
+
+    def interest_to_date(self, k):  # Cumulative interest through payment k
+        return self.payments_to_date(k) - self.principal_to_date(k)
+
+    @property
+    def total_payments(self):
+        return self.payments_to_date(self.payoff_month)
+
+    @property
+    def total_interest(self):
+        return self.interest_to_date(self.payoff_month)
+
+    @property
+    def schedule(self):  # Unrounded columnar Schedule, built once per model
+        if self._schedule is None:
+            if backend() != 'numpy':
+                table = np.zeros((max(self.n_payments, self.payoff_month) + 1, len(SCHEDULE_FIELDS)))
+                table = table[:_schedule_loop(self.principal, self.monthly_rate, self.n_payments,
+                                              self.monthly_payment, self.extra_payment, PAYOFF_THRESHOLD, table)]
+            else:
+                if self.extra_payment > 0:
+                    steps = _extra_steps(self.principal, self.monthly_rate, self.n_payments, self.monthly_payment,
+                                         self.extra_payment)
+                else:
+                    steps = _level_steps(self.principal, self.monthly_rate, self.n_payments, self.monthly_payment)
+                table = np.array(list(steps), dtype=float).reshape(-1, len(SCHEDULE_FIELDS))
+            self._schedule = Schedule(dict(zip(SCHEDULE_FIELDS, table.T)))
+        return self._schedule
+
+
+LOAN_MODELS = ResultCache('loan models', maxsize=256)
+
+
+@LOAN_MODELS.memoize
+def loan_model(principal, annual_rate, years, extra_payment=0.0):  # Shared model per loan inputs
+    return LoanModel(principal, annual_rate, years, extra_payment)
+
+
+def _segment_payoff(balance, monthly_rate, total_payment):  # Payments until payoff, or None if never
+    if balance <= 0:
+        return 1
+    if total_payment <= balance * monthly_rate:
+        return None
+    return int(payoff_months(balance, monthly_rate, total_payment))
+
+
+class _Segment:  # Months start..last on one set of loan terms
+    __slots__ = ('start', 'lump', 'balance', 'monthly_rate', 'payment', 'extra', 'payoff', 'last')
+
+    def __init__(self, start, lump, balance, monthly_rate, payment, extra):
+        self.start, self.lump, self.balance = start, lump, balance  # balance is net of the lump prepayment
+        self.monthly_rate, self.payment, self.extra = monthly_rate, payment, extra
+        self.payoff = _segment_payoff(balance, monthly_rate, payment + extra)  # Payments, None if never
+        self.last = None if self.payoff is None else start + self.payoff - 1
+
+    def balance_after(self, month):  # Ending balance after payment `month` of this segment
+        if self.last is not None and month >= self.last:
+            return 0.0
+        return float(_raw_balances(self.balance, self.monthly_rate, self.payment + self.extra,
+                                   month - self.start + 1))
+
+    def paid_through(self, month):  # Total paid in this segment through payment `month`
+        k = month - self.start + 1
+        total = self.payment + self.extra
+        if self.last is not None and month >= self.last:
+            if self.balance <= 0:
+                return self.lump
+            k = self.payoff
+            return self.lump + total * (k - 1) + float(
+                _raw_balances(self.balance, self.monthly_rate, total, k - 1)) * (1 + self.monthly_rate)
+        return self.lump + total * k
+
+
+class LoanSchedule:  # Amortization schedule that absorbs events without replaying the prefix
+    # The loan is a chain of segments, one per month where terms change, each
+    # valued in closed form. An event at month k keeps every segment before k and
+    # replays only the events from k on; materialized rows before k stay cached.
+    # Events take effect with payment k: a prepayment is paid before that month's
+    # interest accrues, a rate reset applies to that month's interest.
+    def __init__(self, principal, annual_rate, years, extra_payment=0.0):
+        self.principal = float(principal)
+        self.annual_rate = float(annual_rate)
+        self.n_payments = int(years) * 12
+        self.extra_payment = float(extra_payment)
+        self.events = []  # (month, sequence, kind, value, option), sorted
+        self._sequence = 0
+        self._columns = {field: [] for field in SCHEDULE_FIELDS}  # Materialized rows, unrounded
+        self._segments = []
+        self._rebuild(1)
+
+    def prepay(self, month, amount, recast=False):  # Lump-sum prepayment; recast re-levels the payment
+        return self._add(month, 'prepayment', float(amount), recast)
+
+    def reset_rate(self, month, annual_rate, reamortize=True):  # ARM reset; reamortize over the remaining term
+        return self._add(month, 'rate', float(annual_rate), reamortize)
+
+    def change_payment(self, month, payment):  # New scheduled payment, excluding extra
+        return self._add(month, 'payment', float(payment), None)
+
+    def change_extra(self, month, extra_payment):  # New recurring extra payment
+        return self._add(month, 'extra', float(extra_payment), None)
+
+    def _add(self, month, kind, value, option):
+        month = int(month)
+        if month < 1:
+            raise ValueError("Events start at payment 1.")
+        if month > self.payoff_month:
+            raise ValueError(f"The loan is paid off with payment {self.payoff_month}; no events after it.")
+        event = (month, self._sequence, kind, value, option)
+        self._sequence += 1
+        self.events.insert(bisect.bisect(self.events, event), event)
+        try:
+            self._rebuild(month)
+        except ValueError:
+            self.events.remove(event)
+            self._rebuild(month)
+            raise
+        return self
+
+    def _rebuild(self, month):  # Keep segments before month, replay events from month on
+        keep = bisect.bisect_left([segment.start for segment in self._segments], month)
+        self._segments = self._segments[:keep]
+        if self._segments:
+            previous = self._segments[-1]
+            balance = previous.balance_after(month - 1)
+            rate, payment, extra = previous.monthly_rate, previous.payment, previous.extra
+        else:
+            month, balance, rate, extra = 1, self.principal, self.annual_rate / 12, self.extra_payment
+            payment = float(level_payment(balance, rate, self.n_payments))
+        for field in SCHEDULE_FIELDS:
+            del self._columns[field][month - 1:]
+
+        start = bisect.bisect_left(self.events, (month,))
+        pending = self.events[start:]
+        i = 0
+        while True:
+            lump = 0.0
+            while i < len(pending) and pending[i][0] == month:
+                _, _, kind, value, option = pending[i]
+                remaining = max(self.n_payments - month + 1, 1)
+                if kind == 'prepayment':
+                    lump += min(value, balance)
+                    balance -= min(value, balance)
+                    if option:
+                        payment = float(level_payment(balance, rate, remaining))
+                elif kind == 'rate':
+                    rate = value / 12
+                    if option:
+                        payment = float(level_payment(balance, rate, remaining))
+                elif kind == 'payment':
+                    payment = value
+                else:
+                    extra = value
+                i += 1
+            segment = _Segment(month, lump, balance, rate, payment, extra)
+            next_month = pending[i][0] if i < len(pending) else None
+            if segment.payoff is None and next_month is None:
+                raise ValueError("Payment does not cover the monthly interest; the loan never pays off.")
+            self._segments.append(segment)
+            if next_month is None or (segment.last is not None and segment.last < next_month):
+                return
+            balance = segment.balance_after(next_month - 1)
+            month = next_month
+
+    def _spans(self):  # (segment, last payment month it covers)
+        for segment, following in zip(self._segments, self._segments[1:] + [None]):
+            yield segment, segment.last if following is None else following.start - 1
+
+    def _segment_at(self, month):
+        starts = [segment.start for segment in self._segments]
+        return self._segments[max(bisect.bisect_right(starts, month) - 1, 0)]
+
+    @property
+    def payoff_month(self):
+        return self._segments[-1].last
+
+    def balance(self, k):  # Ending balance after payment k
+        k = int(k)
+        if k <= 0:
+            return self.principal
+        return self._segment_at(k).balance_after(min(k, self.payoff_month))
+
+    def payments_to_date(self, k):  # Total paid through payment k, prepayments included
+        k = min(int(k), self.payoff_month)
+        if k <= 0:
+            return 0.0
+        total = 0.0
+        for segment, end in self._spans():
+            if segment.start > k:
+                break
+            total += segment.paid_through(min(k, end))
+        return total
+
+    def interest_to_date(self, k):  # Cumulative interest through payment k
+        return self.payments_to_date(k) - (self.principal - self.balance(k))
+
+    @property
+    def total_payments(self):
+        return self.payments_to_date(self.payoff_month)
+
+    @property
+    def total_interest(self):
+        return self.interest_to_date(self.payoff_month)
+
+    def _materialize(self):  # Step the rows after the cached prefix, one month at a time
+        columns = self._columns
+        month = len(columns['Payment']) + 1
+        balance = columns['Ending Balance'][-1] if month > 1 else self.principal
+        for segment, end in self._spans():
+            total = segment.payment + segment.extra
+            for payment_num in range(max(month, segment.start), end + 1):
+                beginning = balance
+                lump = min(segment.lump, balance) if payment_num == segment.start else 0.0
+                balance -= lump
+                interest = balance * segment.monthly_rate
+                principal_payment = min(total - interest, balance)
+                balance -= principal_payment
+                if balance < PAYOFF_THRESHOLD:
+                    principal_payment += balance
+                    balance = 0.0
+                for field, value in zip(SCHEDULE_FIELDS, (payment_num, beginning, lump + interest + principal_payment,
+                                                          interest, lump + principal_payment, balance)):
+                    columns[field].append(value)
+                if balance == 0:
+                    return
+
+    def rows(self):  # The app's list-of-dicts table, rounded to cents
+        return self.columns().rows()
+
+    def columns(self):  # Unrounded columnar Schedule
+        self._materialize()
+        return Schedule(self._columns)
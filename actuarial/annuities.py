@@ -0,0 +1,64 @@
+import numpy as np
+
+from .curves import YieldCurve
+from .kernels import accumulation_factor, annuity_factor, discount_factor, growing_annuity_factor, growth_factor
+
+
+def _rate_args(*args):
+    return (np.asarray(a, dtype=float) for a in args)
+
+
+def _curve_value(PMT, curve, n, calc_choice, **timing):  # r is a YieldCurve with 1-year periods
+    # FV is the PV carried forward on the same curve to time n, the end of the
+    # last period (the deferred FV is built in deferred_annuity).
+    pv = np.asarray(PMT, dtype=float) * curve.annuity_factor(n, **timing)
+    if calc_choice == "PV":
+        return pv
+    return pv / curve.discount(np.asarray(n, dtype=float))
+
+
+def annuity_immediate(PMT, r, n, calc_choice="PV"):  # Payments at the end of each period
+    if isinstance(r, YieldCurve):
+        return _curve_value(PMT, r, n, calc_choice)
+    PMT, r, n = _rate_args(PMT, r, n)
+    if calc_choice == "PV":
+        return PMT * annuity_factor(r, n)
+    return PMT * accumulation_factor(r, n)
+
+
+def annuity_due(PMT, r, n, calc_choice="PV"):  # Payments at the start of each period
+    if isinstance(r, YieldCurve):
+        return _curve_value(PMT, r, n, calc_choice, due=True)
+    return annuity_immediate(PMT, r, n, calc_choice) * (1 + np.asarray(r, dtype=float))
+
+
+def growing_annuity(PMT, r, g, n, calc_choice="PV"):  # Payments growing at g per period
+    if isinstance(r, YieldCurve):
+        return _curve_value(PMT, r, n, calc_choice, growth=g)
+    PMT, r, g, n = _rate_args(PMT, r, g, n)
+    if calc_choice == "PV":
+        return PMT * growing_annuity_factor(r, g, n)
+    return PMT * growing_annuity_factor(r, g, n) * growth_factor(r, n)
+
+
+def deferred_annuity(PMT, r, n, m, calc_choice="PV"):  # Annuity immediate deferred m periods
+    if isinstance(r, YieldCurve):
+        if calc_choice == "PV":
+            return _curve_value(PMT, r, n, calc_choice, deferred=m)
+        return annuity_immediate(PMT, r, n, "FV") / r.discount(np.asarray(m, dtype=float))
+    r, m = _rate_args(r, m)
+    if calc_choice == "PV":
+        return annuity_immediate(PMT, r, n, "PV") * discount_factor(r, m)
+    return annuity_immediate(PMT, r, n, "FV") * growth_factor(r, m)
+
+
+def annuity_value(annuity_type, calc_choice, PMT, r, n, g=0.0, m=0):  # Dispatch by calculator annuity type
+    if annuity_type == "Annuity Immediate":
+        return annuity_immediate(PMT, r, n, calc_choice)
+    if annuity_type == "Annuity Due":
+        return annuity_due(PMT, r, n, calc_choice)
+    if annuity_type == "Growing Annuity":
+        return growing_annuity(PMT, r, g, n, calc_choice)
+    if annuity_type == "Deferred Annuity":
+        return deferred_annuity(PMT, r, n, m, calc_choice)
+    raise ValueError(f"Unknown annuity type: {annuity_type}")
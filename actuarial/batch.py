@@ -0,0 +1,279 @@
+# Seriatim valuation of a contract file (python -m actuarial.batch --help). The
+# parent only splits the input into chunks; workers read, value and encode them,
+# and a checkpoint of finished chunks lets an interrupted run resume.
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from .amortization import loan_summaries
+from .annuities import annuity_value
+from .bonds import price_bonds
+
+CHUNK_ROWS = 50_000
+
+# Input columns per contract kind: name -> default (None = required)
+KINDS = {
+    'annuity': {'annuity_type': "Annuity Immediate", 'calc': "PV", 'PMT': None, 'r': None, 'n': None,
+                'g': 0.0, 'm': 0},
+    'bond': {'face_value': None, 'coupon_rate': None, 'years': None, 'ytm': None, 'frequency': 2},
+    'loan': {'principal': None, 'annual_rate': None, 'years': None, 'extra_payment': 0.0},
+}
+TEXT_COLUMNS = {'annuity_type', 'calc'}
+
+
+def value_chunk(kind, columns):  # Input columns -> result columns, all vectorized
+    if kind == 'bond':
+        return price_bonds(columns['face_value'], columns['coupon_rate'], columns['years'],
+                           columns['ytm'], columns['frequency'])
+    if kind == 'loan':
+        return loan_summaries(columns['principal'], columns['annual_rate'],
+                              columns['years'], columns['extra_payment'])
+    if kind == 'annuity':
+        value = np.full(len(columns['PMT']), np.nan)
+        groups = np.char.add(np.char.add(columns['annuity_type'].astype(str), '|'), columns['calc'].astype(str))
+        for group in np.unique(groups):
+            annuity_type, calc = group.split('|')
+            rows = groups == group
+            value[rows] = annuity_value(annuity_type, calc, columns['PMT'][rows], columns['r'][rows],
+                                        columns['n'][rows], columns['g'][rows], columns['m'][rows])
+        return {'value': value}
+    raise ValueError(f"Unknown contract kind: {kind}")
+
+
+def _typed_columns(kind, rows_or_columns, size, first_row=0):  # Fill defaults and convert numeric inputs
+    # Blank optional cells take the default; a blank or non-numeric required cell
+    # is an error naming the column and its row in the input (1 = first contract).
+    columns = {}
+    for name, default in KINDS[kind].items():
+        raw = rows_or_columns.get(name)
+        if raw is None:
+            if default is None:
+                raise ValueError(f"{kind} contracts need a '{name}' column.")
+            raw = [default] * size
+        elif default is not None:
+            raw = [default if value in ('', None) else value for value in raw]
+        if name in TEXT_COLUMNS:
+            columns[name] = np.asarray(raw, dtype=object)
+            continue
+        try:
+            values = np.asarray(raw, dtype=float)
+        except (TypeError, ValueError):
+            values = None
+        bad = _bad_cell(raw) if values is None or np.isnan(values).any() else None  # Parquet nulls become NaN
+        if bad is not None:
+            raise ValueError(f"Row {first_row + bad[0] + 1}: '{name}' {bad[1]}.")
+        columns[name] = values
+    return columns
+
+
+def _bad_cell(values):  # (index, complaint) of the first blank or non-numeric cell, or None
+    for row, value in enumerate(values):
+        if value in ('', None):
+            return row, "is blank"
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            return row, f"is not a number: {value!r}"
+    return None
+
+
+def read_header(path):  # Input column names
+    if path.endswith('.parquet'):
+        return _parquet_file(path).schema_arrow.names
+    with open(path, 'rb') as handle:
+        return next(csv.reader([handle.readline().decode('utf-8')]))
+
+
+def chunk_spans(path, chunk_rows=CHUNK_ROWS):  # Yields (start, stop) of each chunk without parsing any row
+    # CSV: byte offsets of chunk_rows records after the header, found by counting
+    # line breaks (so records must not contain quoted line breaks). Parquet: row
+    # numbers.
+    if path.endswith('.parquet'):
+        n_rows = _parquet_file(path).metadata.num_rows
+        for start in range(0, n_rows, chunk_rows):
+            yield start, min(start + chunk_rows, n_rows)
+        return
+    with open(path, 'rb') as handle:
+        handle.readline()
+        start = handle.tell()
+        while True:
+            lines = sum(1 for _ in islice(handle, chunk_rows))
+            if not lines:
+                return
+            stop = handle.tell()
+            yield start, stop
+            start = stop
+
+
+def read_span(path, header, start, stop):  # One chunk -> (passthrough columns dict, row count)
+    if path.endswith('.parquet'):
+        parquet = _parquet_file(path)
+        bounds = np.cumsum([0] + [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)])
+        first, last = np.searchsorted(bounds, start, 'right') - 1, np.searchsorted(bounds, stop, 'left')
+        table = parquet.read_row_groups(list(range(first, last))).slice(start - bounds[first], stop - start)
+        return {name: table.column(name).to_pylist() for name in header}, table.num_rows
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        text = handle.read(stop - start).decode('utf-8')
+    rows = [row for row in csv.reader(io.StringIO(text, newline='')) if row]
+    return {name: list(values) for name, values in zip(header, zip(*rows))}, len(rows)
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):  # Yields (passthrough columns dict, row count)
+    header = read_header(path)
+    for start, stop in chunk_spans(path, chunk_rows):
+        yield read_span(path, header, start, stop)
+
+
+def _parquet_file(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Parquet input requires pyarrow: pip install pyarrow") from error
+    return pq.ParquetFile(path)
+
+
+def _encode(raw, results, output_format, header):  # One chunk's output, ready to append or write
+    if output_format == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        sink = pa.BufferOutputStream()
+        pq.write_table(pa.table({**raw, **results}), sink)
+        return sink.getvalue().to_pybytes()
+    text = io.StringIO(newline='')
+    writer = csv.writer(text)
+    if header:
+        writer.writerow(list(raw) + list(results))
+    writer.writerows(zip(*raw.values(), *results.values()))
+    return text.getvalue().encode('utf-8')
+
+
+def _run_chunk(task):  # Process-pool entry point: read, value and encode one chunk -> (bytes, rows)
+    kind, path, header, (start, stop), output_format, with_header, first_row = task
+    raw, size = read_span(path, header, start, stop)
+    results = value_chunk(kind, _typed_columns(kind, raw, size, first_row))
+    results = {name: np.asarray(values).tolist() for name, values in results.items()}
+    return _encode(raw, results, output_format, with_header), size
+
+
+class _CsvOutput:  # Appends encoded chunks to one CSV; truncates to the checkpointed size on resume
+    def __init__(self, path, resume_bytes):
+        self.path = path
+        exists = resume_bytes is not None and os.path.exists(path)
+        self.handle = open(path, 'r+b' if exists else 'wb')
+        if exists:
+            self.handle.truncate(resume_bytes)
+            self.handle.seek(resume_bytes)
+
+    def write(self, index, payload):
+        self.handle.write(payload)
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+        return self.handle.tell()
+
+    def close(self):
+        self.handle.close()
+
+
+class _ParquetOutput:  # One part file per chunk in an output directory
+    def __init__(self, path, resume_bytes):
+        import pyarrow  # noqa: F401  (fail before any work if pyarrow is missing)
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+
+    def write(self, index, payload):
+        part = os.path.join(self.path, f'part-{index:06d}.parquet')
+        with open(part + '.tmp', 'wb') as handle:
+            handle.write(payload)
+        os.replace(part + '.tmp', part)
+        return 0
+
+    def close(self):
+        pass
+
+
+def _save_checkpoint(path, state):  # Atomic replace so a crash never leaves half a checkpoint
+    with open(path + '.tmp', 'w') as handle:
+        json.dump(state, handle)
+    os.replace(path + '.tmp', path)
+
+
+def run_batch(kind, input_path, output_path, chunk_rows=CHUNK_ROWS, workers=None, output_format='csv',
+              checkpoint_path=None, resume=False):  # Returns the number of contracts valued this run
+    if kind not in KINDS:
+        raise ValueError(f"Unknown contract kind: {kind}")
+    checkpoint_path = checkpoint_path or output_path.rstrip('/\\') + '.checkpoint'
+    state = {'kind': kind, 'input': os.path.abspath(input_path), 'chunk_rows': chunk_rows,
+             'chunks_done': 0, 'rows_done': 0, 'output_bytes': 0}
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as handle:
+            saved = json.load(handle)
+        if any(saved[key] != state[key] for key in ('kind', 'input', 'chunk_rows')):
+            raise ValueError("Checkpoint was written for a different input, kind or chunk size.")
+        state = saved
+    output = (_ParquetOutput if output_format == 'parquet' else _CsvOutput)(
+        output_path, state['output_bytes'] if resume else None)
+
+    header = read_header(input_path)
+    spans = islice(enumerate(chunk_spans(input_path, chunk_rows)), state['chunks_done'], None)
+    tasks = ((kind, input_path, header, span, output_format, index == 0, index * chunk_rows) for index, span in spans)
+    valued = 0
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    try:
+        if workers == 1:
+            results = map(_run_chunk, tasks)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers)
+            results = _ordered_results(pool, tasks, in_flight=2 * workers)
+        for payload, size in results:
+            state['output_bytes'] = output.write(state['chunks_done'], payload)
+            state['chunks_done'] += 1
+            state['rows_done'] += size
+            valued += size
+            _save_checkpoint(checkpoint_path, state)
+    finally:
+        output.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return valued
+
+
+def _ordered_results(pool, tasks, in_flight):  # Bounded look-ahead so memory stays at a few chunks
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(_run_chunk, task))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def main(argv=None):  # python -m actuarial.batch bond book.csv prices.csv --workers 64
+    parser = argparse.ArgumentParser(description="Seriatim valuation of a CSV or Parquet contract file. "
+                                                 "CSV records must not contain quoted line breaks.")
+    parser.add_argument('kind', choices=sorted(KINDS))
+    parser.add_argument('input', help='CSV or .parquet contract file')
+    parser.add_argument('output', help='Output CSV file, or directory for --format parquet')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: all cores)')
+    parser.add_argument('--checkpoint', help='Checkpoint path (default: <output>.checkpoint)')
+    parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint')
+    args = parser.parse_args(argv)
+    valued = run_batch(args.kind, args.input, args.output, args.chunk_rows, args.workers, args.format,
+                       args.checkpoint, args.resume)
+    print(f"Valued {valued:,} {args.kind} contracts", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
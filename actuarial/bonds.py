@@ -0,0 +1,127 @@
+import numpy as np
+
+from .curves import YieldCurve
+from .kernels import compensated_sum
+from .solvers import bond_ytm
+
+CHUNK_CELLS = 4_000_000  # Max bonds x periods discount cells built at once
+
+
+def price_bonds(face_value, coupon_rate, years, ytm, frequency=2, curve_shift=0.0):  # Batch bond analytics
+    # Bonds are grouped by number of coupon periods, so each group shares one
+    # time grid and is priced as a (bonds x periods) matrix without a per-bond loop.
+    # ytm may be a YieldCurve, in which case cash flows are discounted on the curve,
+    # moved in parallel by curve_shift (continuously compounded; broadcasts with the bonds).
+    if isinstance(ytm, YieldCurve):
+        return _price_on_curve(face_value, coupon_rate, years, ytm, frequency, curve_shift)
+    face_value, coupon_rate, years, ytm, frequency = np.broadcast_arrays(
+        np.asarray(face_value, dtype=float), np.asarray(coupon_rate, dtype=float),
+        np.asarray(years, dtype=float), np.asarray(ytm, dtype=float), np.asarray(frequency))
+    shape = face_value.shape
+    face_value, coupon_rate, ytm = face_value.ravel(), coupon_rate.ravel(), ytm.ravel()
+    frequency = frequency.ravel().astype(np.int64)
+    periods = np.rint(years.ravel() * frequency).astype(np.int64)
+
+    coupon_payment = face_value * coupon_rate / frequency
+    period_rate = ytm / frequency
+
+    pv_coupons = np.zeros(face_value.size)
+    pv_face = np.zeros(face_value.size)
+    weighted_time = np.zeros(face_value.size)  # sum of t * PV(CF_t), t in periods
+    weighted_convexity = np.zeros(face_value.size)  # sum of t(t+1) * PV(CF_t)
+
+    order = np.argsort(periods, kind='stable')
+    group_periods, starts = np.unique(periods[order], return_index=True)
+    bounds = np.append(starts, order.size)
+    for n, start, stop in zip(group_periods, bounds[:-1], bounds[1:]):
+        if n <= 0:
+            continue
+        t = np.arange(1, n + 1, dtype=float)
+        step = max(1, CHUNK_CELLS // int(n))
+        for chunk_start in range(start, stop, step):
+            idx = order[chunk_start:min(chunk_start + step, stop)]
+            # (periods x bonds), so the compensated sums run over contiguous rows
+            discount = np.exp(-t[:, None] * np.log1p(period_rate[idx]))
+            coupons = coupon_payment[idx]
+            face = face_value[idx] * discount[-1]
+            pv_coupons[idx] = coupons * compensated_sum(discount)
+            pv_face[idx] = face
+            weighted_time[idx] = coupons * compensated_sum(discount * t[:, None]) + n * face
+            weighted_convexity[idx] = coupons * compensated_sum(discount * (t * (t + 1))[:, None]) + n * (n + 1) * face
+
+    bond_price = pv_coupons + pv_face
+    with np.errstate(divide='ignore', invalid='ignore'):
+        macaulay_duration = weighted_time / frequency / bond_price
+        modified_duration = macaulay_duration / (1 + period_rate)
+        convexity = weighted_convexity / (bond_price * frequency ** 2 * (1 + period_rate) ** 2)
+
+    return {
+        'price': bond_price.reshape(shape),
+        'pv_coupons': pv_coupons.reshape(shape),
+        'pv_face': pv_face.reshape(shape),
+        'macaulay_duration': macaulay_duration.reshape(shape),
+        'modified_duration': modified_duration.reshape(shape),
+        'convexity': convexity.reshape(shape),
+    }
+
+
+def _price_on_curve(face_value, coupon_rate, years, curve, frequency, curve_shift):
+    # Bonds sharing (frequency, periods) share one cached discount schedule, so the
+    # book costs a few vector ops per group. Each bond's yield to maturity is then
+    # solved from its curve price: durations and convexity are taken at that yield,
+    # as for a flat ytm, and curve_duration / curve_convexity are with respect to
+    # a parallel shift of the continuously compounded zero curve.
+    face_value, coupon_rate, years, frequency, curve_shift = np.broadcast_arrays(
+        np.asarray(face_value, dtype=float), np.asarray(coupon_rate, dtype=float),
+        np.asarray(years, dtype=float), np.asarray(frequency), np.asarray(curve_shift, dtype=float))
+    shape = face_value.shape
+    face_value, coupon_rate, curve_shift = face_value.ravel(), coupon_rate.ravel(), curve_shift.ravel()
+    frequency = frequency.ravel().astype(np.int64)
+    periods = np.rint(years.ravel() * frequency).astype(np.int64)
+    coupon_payment = face_value * coupon_rate / frequency
+
+    pv_coupons = np.zeros(face_value.size)
+    pv_face = np.zeros(face_value.size)
+    weighted_time = np.zeros(face_value.size)  # sum of t * PV(CF_t), t in years
+    weighted_convexity = np.zeros(face_value.size)  # sum of t^2 * PV(CF_t)
+
+    groups, inverse = np.unique(np.stack([frequency, periods]), axis=1, return_inverse=True)
+    inverse = inverse.ravel()
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(groups.shape[1] + 1))
+    for (f, n), start, stop in zip(groups.T, bounds[:-1], bounds[1:]):
+        if n <= 0:
+            continue
+        idx = order[start:stop]
+        t = np.arange(1, n + 1) / f
+        discount = curve.discount_schedule(n, f)
+        if np.any(curve_shift[idx]):  # (periods x bonds), one column per shifted bond
+            t = t[:, None]
+            discount = discount[:, None] * np.exp(-t * curve_shift[idx])
+        coupons, face = coupon_payment[idx], face_value[idx] * discount[-1]
+        pv_coupons[idx] = coupons * compensated_sum(discount)
+        pv_face[idx] = face
+        weighted_time[idx] = coupons * compensated_sum(t * discount) + t[-1] * face
+        weighted_convexity[idx] = coupons * compensated_sum(t ** 2 * discount) + t[-1] ** 2 * face
+
+    bond_price = pv_coupons + pv_face
+    with np.errstate(divide='ignore', invalid='ignore'):
+        curve_duration = weighted_time / bond_price
+        curve_convexity = weighted_convexity / bond_price
+
+    live = periods > 0
+    ytm = np.full(face_value.size, np.nan)
+    ytm[live] = bond_ytm(bond_price[live], face_value[live], coupon_rate[live], periods[live] / frequency[live],
+                         frequency[live]).root
+    at_yield = price_bonds(face_value, coupon_rate, periods / frequency, ytm, frequency)
+    return {
+        'price': bond_price.reshape(shape),
+        'pv_coupons': pv_coupons.reshape(shape),
+        'pv_face': pv_face.reshape(shape),
+        'ytm': ytm.reshape(shape),
+        'macaulay_duration': at_yield['macaulay_duration'].reshape(shape),
+        'modified_duration': at_yield['modified_duration'].reshape(shape),
+        'convexity': at_yield['convexity'].reshape(shape),
+        'curve_duration': curve_duration.reshape(shape),
+        'curve_convexity': curve_convexity.reshape(shape),
+    }
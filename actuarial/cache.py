@@ -0,0 +1,91 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+SIGNIFICANT_DIGITS = 12  # Inputs equal to this many digits share a cache entry
+
+_CACHES = {}
+
+
+def normalize_key(value):  # Hashable, rounding-insensitive form of calculator inputs
+    if isinstance(value, (bool, np.bool_, str, bytes)) or value is None:
+        return value.item() if isinstance(value, np.bool_) else value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        value = float(value)
+        return float(f"{value:.{SIGNIFICANT_DIGITS}g}") if np.isfinite(value) else value
+    if isinstance(value, np.ndarray):
+        if value.size <= 64:
+            return ('ndarray', value.shape, tuple(normalize_key(item) for item in value.ravel().tolist()))
+        return ('ndarray', value.shape, value.dtype.str, value.tobytes())
+    if isinstance(value, (tuple, list)):
+        return tuple(normalize_key(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize_key(item)) for key, item in value.items()))
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
+
+class ResultCache:  # Bounded LRU cache with optional time-to-live and hit/miss counters
+    def __init__(self, name, maxsize=256, ttl=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl  # Seconds, or None to keep entries until evicted
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        _CACHES[name] = self
+
+    def get_or_compute(self, key, compute):
+        key = normalize_key(key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        # Computed outside the lock so slow work never blocks other sessions
+        value = compute()
+        with self._lock:
+            self._entries[key] = (None if self.ttl is None else now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def memoize(self, func):  # Decorator keyed on the normalized, default-filled arguments
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return self.get_or_compute((func.__qualname__, tuple(bound.arguments.items())),
+                                       lambda: func(*args, **kwargs))
+
+        wrapper.cache = self
+        return wrapper
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'expirations': self.expirations, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+def cache_stats():  # Counters for every named cache
+    return {name: cache.stats for name, cache in _CACHES.items()}
@@ -0,0 +1,156 @@
+import csv
+
+import numpy as np
+
+from .curves import YieldCurve
+from .solvers import SolverResult, newton_bisect
+
+DAY_COUNTS = ('ACT/365F', 'ACT/360', 'ACT/ACT', '30/360', '30E/360')
+CHUNK_CELLS = 4_000_000  # Max rates x flows discount cells built at once
+GROWTH_BRACKET = (np.log(1e-4), np.log(1e4))  # log(1 + r) search range for IRR: r in (-99.99%, 999,900%)
+
+
+def _dates(values):
+    return np.asarray(values, dtype='datetime64[D]')
+
+
+def _ymd(dates):  # Year, month, day arrays
+    months = dates.astype('datetime64[M]')
+    return (dates.astype('datetime64[Y]').astype(np.int64) + 1970, months.astype(np.int64) % 12 + 1,
+            (dates - months).astype(np.int64) + 1)
+
+
+def _year_length(years):
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    return np.where(leap, 366.0, 365.0)
+
+
+def _act_act(start, end):  # ISDA: days in each calendar year over that year's length
+    later = end >= start
+    first, last = np.where(later, start, end), np.where(later, end, start)
+    y1, y2 = _ymd(first)[0], _ymd(last)[0]
+    start_of_y2 = (y2 - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+    end_of_y1 = (y1 + 1 - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+    same_year = (last - first).astype(np.int64) / _year_length(y1)
+    spanning = ((end_of_y1 - first).astype(np.int64) / _year_length(y1) + (y2 - y1 - 1) +
+                (last - start_of_y2).astype(np.int64) / _year_length(y2))
+    return np.where(later, 1, -1) * np.where(y1 == y2, same_year, spanning)
+
+
+def year_fractions(start, dates, convention='ACT/365F'):  # Time in years from start to each date
+    start, dates = np.broadcast_arrays(_dates(start), _dates(dates))
+    if convention == 'ACT/365F':
+        return (dates - start).astype(np.int64) / 365.0
+    if convention == 'ACT/360':
+        return (dates - start).astype(np.int64) / 360.0
+    if convention == 'ACT/ACT':
+        return _act_act(start, dates)
+    if convention in ('30/360', '30E/360'):
+        y1, m1, d1 = _ymd(start)
+        y2, m2, d2 = _ymd(dates)
+        d1 = np.minimum(d1, 30)
+        d2 = np.minimum(d2, 30) if convention == '30E/360' else np.where((d2 == 31) & (d1 == 30), 30, d2)
+        return (360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)) / 360.0
+    raise ValueError(f"Unknown day count convention: {convention}; expected one of {DAY_COUNTS}")
+
+
+def log_growth(rate, compounding=1):  # Continuously compounded equivalent of a quoted rate
+    # compounding: periods per year (1 annual, 12 monthly, 365 daily) or 'continuous'
+    rate = np.asarray(rate, dtype=float)
+    if compounding == 'continuous':
+        return rate
+    return compounding * np.log1p(rate / compounding)
+
+
+def quoted_rate(growth, compounding=1):  # Inverse of log_growth
+    growth = np.asarray(growth, dtype=float)
+    if compounding == 'continuous':
+        return growth
+    return compounding * np.expm1(growth / compounding)
+
+
+class CashFlows:  # Dated cash flows with their year fractions computed once
+    # Every valuation is a dot product of the amounts with discount factors
+    # exp(-delta * t), so one instrument may carry millions of flows, and a
+    # whole array of rates is priced in chunks of CHUNK_CELLS.
+    def __init__(self, dates, amounts, valuation_date=None, convention='ACT/365F'):
+        self.dates = _dates(dates).ravel()
+        self.amounts = np.asarray(amounts, dtype=float).ravel()
+        if self.dates.size != self.amounts.size:
+            raise ValueError("Cash flows need one date per amount.")
+        if self.dates.size == 0:
+            raise ValueError("No cash flows.")
+        self.valuation_date = self.dates.min() if valuation_date is None else _dates(valuation_date)
+        self.convention = convention
+        self.times = year_fractions(self.valuation_date, self.dates, convention)
+
+    def discount_factors(self, rate, compounding=1):  # One factor per flow, for a scalar rate or a curve
+        if isinstance(rate, YieldCurve):
+            return rate.discount(self.times)
+        if compounding == 'simple':
+            return 1 / (1 + float(rate) * self.times)
+        with np.errstate(over='ignore'):
+            return np.exp(-float(log_growth(rate, compounding)) * self.times)
+
+    def npv(self, rate, compounding=1):  # Present value at valuation_date; rate may be an array or a curve
+        if isinstance(rate, YieldCurve) or np.ndim(rate) == 0:
+            return float(self.amounts @ self.discount_factors(rate, compounding))
+        rates = np.asarray(rate, dtype=float)
+        if compounding == 'simple':
+            return np.array([self.npv(r, 'simple') for r in rates.ravel()]).reshape(rates.shape)
+        return self._present_values(log_growth(rates, compounding).ravel()).reshape(rates.shape)
+
+    def _present_values(self, growth):  # sum_j a_j exp(-growth_i t_j) for every growth rate i
+        values = np.zeros(growth.size)
+        step = max(1, CHUNK_CELLS // growth.size)
+        with np.errstate(over='ignore', invalid='ignore'):
+            for start in range(0, self.times.size, step):
+                times = self.times[start:start + step]
+                values += np.exp(-growth[:, None] * times) @ self.amounts[start:start + step]
+        return values
+
+    def duration(self, rate, compounding=1):  # Macaulay duration in years, weighted by PV
+        discount = self.discount_factors(rate, compounding)
+        present = self.amounts * discount
+        return float(present @ self.times / present.sum())
+
+    def irr(self, compounding=1, guess=0.1, xtol=1e-12, max_iter=100):  # Rate with zero NPV
+        # Solved for delta = log growth, where NPV(delta) = sum a exp(-delta t) is
+        # smooth for any compounding; the root is then quoted back.
+        if compounding == 'simple':
+            raise ValueError("IRR needs periodic or continuous compounding.")
+
+        def func(delta, idx):
+            with np.errstate(over='ignore', invalid='ignore'):
+                weighted = self.amounts * np.exp(-delta[0] * self.times)
+            return np.array([weighted.sum()]), np.array([-(weighted @ self.times)])
+
+        start = np.clip(log_growth(guess, compounding), *GROWTH_BRACKET)
+        solution = newton_bisect(func, GROWTH_BRACKET[0], GROWTH_BRACKET[1], start, xtol, max_iter)
+        return SolverResult(float(quoted_rate(solution.root, compounding)), bool(solution.converged),
+                            int(solution.iterations))
+
+
+def load_cash_flows(source, valuation_date=None, convention='ACT/365F', date_column='date',
+                    amount_column='amount'):  # CSV with ISO date,amount columns
+    handle = open(source, newline='') if isinstance(source, str) else source
+    try:
+        reader = csv.reader(handle)
+        header = [name.strip() for name in next(reader, [])]
+        if date_column not in header or amount_column not in header:
+            raise ValueError(f"Cash-flow CSV needs '{date_column}' and '{amount_column}' columns.")
+        rows = [row for row in reader if row]
+    finally:
+        if isinstance(source, str):
+            handle.close()
+    columns = np.array(rows, dtype=str).reshape(len(rows), len(header))
+    return CashFlows(np.char.strip(columns[:, header.index(date_column)]),
+                     columns[:, header.index(amount_column)].astype(float), valuation_date, convention)
+
+
+def xnpv(rate, amounts, dates):  # Spreadsheet XNPV: ACT/365F from the first date, annual compounding
+    return CashFlows(dates, amounts, _dates(dates).ravel()[0]).npv(rate)
+
+
+def xirr(amounts, dates, guess=0.1):  # Spreadsheet XIRR; see SolverResult.converged
+    return CashFlows(dates, amounts, _dates(dates).ravel()[0]).irr(guess=guess)
@@ -0,0 +1,119 @@
+# Plotly figure builders. plotly is imported inside each function so the
+# calculation modules never pay for it. Series go in as NumPy arrays, are
+# downsampled to MAX_POINTS and drawn with WebGL (Scattergl) traces.
+import numpy as np
+
+from .downsample import MAX_POINTS, downsample
+from .instrumentation import instrumented
+
+SCHEDULE_SERIES = ('Payment', 'Interest', 'Principal', 'Ending Balance')
+
+
+def schedule_columns(schedule):  # Chart series from a Schedule, a column mapping or list-of-dicts rows
+    if hasattr(schedule, 'keys'):
+        return {name: np.asarray(schedule[name]) for name in SCHEDULE_SERIES}
+    table = np.array([[row[name] for name in SCHEDULE_SERIES] for row in schedule], dtype=float).reshape(-1, 4)
+    return dict(zip(SCHEDULE_SERIES, table.T))
+
+
+@instrumented('figure')
+def sensitivity_chart(shock_range, shocked_values, title,
+                      xlabel="Interest Rate Shock (%)", ylabel="Value ($)"):  # Sensitivity Analysis
+    import plotly.graph_objects as go
+    x, y = downsample(np.asarray(shock_range) * 100, shocked_values)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=x, y=y, mode='lines', line=dict(color='red', width=2)))
+
+    fig.update_layout(
+        title_text=title,
+        xaxis_title=xlabel,
+        yaxis_title=ylabel,
+        yaxis_tickprefix='$', yaxis_tickformat=',.0f')
+    return fig
+
+
+@instrumented('figure')
+def tvm_chart(years, values, calc_type, max_points=MAX_POINTS):  # TVM growth
+    import plotly.graph_objects as go
+    years, values = downsample(years, values, max_points=max_points)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=years, y=values, mode='lines+markers',
+                               line=dict(color='blue', width=2)))
+
+    fig.update_layout(
+        title_text=f'Time Value of Money - {calc_type} Growth',
+        xaxis_title='Years',
+        yaxis_title='Value ($)',
+        yaxis_tickprefix='$', yaxis_tickformat=',.0f')
+    return fig
+
+
+@instrumented('figure')
+def amortization_charts(schedule, max_points=MAX_POINTS):  # Principal vs interest, outstanding balance
+    # schedule is a Schedule or other mapping of column arrays (zero-copy), or row dicts
+    import plotly.graph_objects as go
+    columns = schedule_columns(schedule)
+    payments, interest_payments, principal_payments = downsample(
+        columns['Payment'], columns['Interest'], columns['Principal'], max_points=max_points)
+
+    # Chart 1: Principal vs Interest
+    fig1 = go.Figure()
+    fig1.add_trace(go.Scattergl(x=payments, y=interest_payments,
+                                mode='lines', name='Interest', line=dict(color='red', width=2)))
+    fig1.add_trace(go.Scattergl(x=payments, y=principal_payments,
+                                mode='lines', name='Principal', line=dict(color='blue', width=2)))
+    fig1.update_layout(title_text='Principal vs Interest Payments Over Time',
+                       xaxis_title='Payment Number', yaxis_title='Payment Amount ($)')
+
+    # Chart 2: Outstanding Balance
+    payments, balances = downsample(columns['Payment'], columns['Ending Balance'], max_points=max_points)
+    fig2 = go.Figure()
+    fig2.add_trace(go.Scattergl(x=payments, y=balances,
+                                mode='lines', name='Balance', line=dict(color='green', width=2)))
+    fig2.update_layout(title_text='Outstanding Loan Balance',
+                       xaxis_title='Payment Number', yaxis_title='Balance ($)')
+    return fig1, fig2
+
+
+@instrumented('figure')
+def retirement_chart(ages, balances, max_points=MAX_POINTS):  # Savings growth until retirement
+    import plotly.graph_objects as go
+    ages, balances = downsample(ages, balances, max_points=max_points)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=ages, y=balances, mode='lines+markers',
+                               line=dict(color='green', width=2)))
+    fig.update_layout(
+        title_text='Retirement Savings Growth Over Time',
+        xaxis_title='Age',
+        yaxis_title='Retirement Savings ($)',
+        yaxis_tickprefix='$', yaxis_tickformat=',.0f')
+    return fig
+
+
+@instrumented('figure')
+def monte_carlo_chart(simulation, max_points=MAX_POINTS, title='Simulated Retirement Savings by Age'):  # Percentile fan
+    # Only percentile bands are drawn: simulate_retirement aggregates its paths
+    # before returning, and raw (ages x paths) arrays can be reduced with
+    # downsample.percentile_bands first.
+    import plotly.graph_objects as go
+    levels = sorted(simulation['percentiles'])
+    ages, *series = downsample(simulation['ages'], *(simulation['percentiles'][level] for level in levels),
+                               max_points=max_points)
+    bands = dict(zip(levels, series))
+
+    fig = go.Figure()
+    for low, high in zip(levels[:len(levels) // 2], levels[::-1]):
+        fig.add_trace(go.Scattergl(x=ages, y=bands[high], mode='lines',
+                                   line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scattergl(x=ages, y=bands[low], mode='lines', line=dict(width=0),
+                                   fill='tonexty', fillcolor='rgba(0, 128, 0, 0.2)',
+                                   name=f'{low}th-{high}th percentile'))
+    median = levels[len(levels) // 2]
+    fig.add_trace(go.Scattergl(x=ages, y=bands[median], mode='lines',
+                               name=f'{median}th percentile', line=dict(color='green', width=2)))
+    fig.update_layout(
+        title_text=title,
+        xaxis_title='Age',
+        yaxis_title='Retirement Savings ($)',
+        yaxis_tickprefix='$', yaxis_tickformat=',.0f')
+    return fig
@@ -0,0 +1,148 @@
+import hashlib
+
+import numpy as np
+
+from .cache import ResultCache
+
+GRID_STEP = 1 / 360  # Years between cached discount factors for cubic curves
+SCHEDULE_CACHE_SIZE = 4096  # Discount schedules kept per curve
+YIELD_CURVES = ResultCache('yield curves', maxsize=64)
+
+
+def _natural_spline(x, y):  # Second derivatives of the natural cubic spline through (x, y)
+    h = np.diff(x)
+    second = np.zeros_like(y)
+    if x.size > 2:
+        system = np.diag(2 * (h[:-1] + h[1:])) + np.diag(h[1:-1], 1) + np.diag(h[1:-1], -1)
+        slopes = np.diff(y) / h
+        second[1:-1] = np.linalg.solve(system, 6 * np.diff(slopes))
+    return second
+
+
+def _spline_eval(x, y, second, t):
+    i = np.clip(np.searchsorted(x, t) - 1, 0, x.size - 2)
+    h = x[i + 1] - x[i]
+    a, b = (x[i + 1] - t) / h, (t - x[i]) / h
+    return a * y[i] + b * y[i + 1] + ((a ** 3 - a) * second[i] + (b ** 3 - b) * second[i + 1]) * h ** 2 / 6
+
+
+class YieldCurve:  # Zero curve with cached discount factors, usable wherever a flat rate is
+    # Knots hold continuously compounded zero rates. 'log_linear' interpolates
+    # log discount factors between knots (piecewise-flat forwards); 'cubic' runs
+    # a natural spline through the zero rates, sampled once onto a fine grid.
+    # Past the last knot the zero rate is held flat. Curves are immutable, so
+    # cached factors live as long as the curve; bumps return new curves.
+    METHODS = ('log_linear', 'cubic')
+
+    def __init__(self, times, zero_rates, compounding='continuous', method='log_linear'):
+        times, zero_rates = np.asarray(times, dtype=float), np.asarray(zero_rates, dtype=float)
+        order = np.argsort(times)
+        self.times, rates = times[order], zero_rates[order]
+        if self.times.size == 0 or self.times[0] <= 0 or np.any(np.diff(self.times) <= 0):
+            raise ValueError("Curve tenors must be positive and distinct.")
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown interpolation method: {method}")
+        if compounding != 'continuous':  # Periodic compounding m times a year
+            rates = compounding * np.log1p(rates / compounding)
+        self.zero_rates = rates
+        self.method = method
+        self.key = (method, hashlib.sha1(self.times.tobytes() + self.zero_rates.tobytes()).hexdigest())
+        self._schedules = {}
+
+        if method == 'log_linear':
+            self._grid = np.append(0.0, self.times)
+            self._log_df = np.append(0.0, -self.zero_rates * self.times)
+        else:
+            self._grid = np.arange(0, int(np.ceil(self.times[-1] / GRID_STEP)) + 1) * GRID_STEP
+            self._grid[-1] = self.times[-1]
+            if self.times.size == 1:
+                zero = np.full(self._grid.size, self.zero_rates[0])
+            else:
+                second = _natural_spline(self.times, self.zero_rates)
+                inside = np.clip(self._grid, self.times[0], self.times[-1])
+                zero = _spline_eval(self.times, self.zero_rates, second, inside)
+            self._log_df = -zero * self._grid
+
+    @classmethod
+    def from_par_yields(cls, times, par_yields, frequency=2, method='log_linear'):  # Bootstrap
+        # Par yields are linearly interpolated onto every coupon date, then each
+        # date's discount factor is solved from its par bond pricing to 1.
+        # Tenors shorter than one coupon period are treated as simple-interest bills.
+        times, par_yields = np.asarray(times, dtype=float), np.asarray(par_yields, dtype=float)
+        order = np.argsort(times)
+        times, par_yields = times[order], par_yields[order]
+        bills = times < 1 / frequency
+        coupon_dates = np.arange(1, int(np.rint(times[-1] * frequency)) + 1) / frequency
+        coupons = np.interp(coupon_dates, times, par_yields) / frequency
+        discount = np.empty(coupon_dates.size)
+        annuity = 0.0
+        for i, coupon in enumerate(coupons):
+            discount[i] = (1 - coupon * annuity) / (1 + coupon)
+            annuity += discount[i]
+        knots = np.append(times[bills], coupon_dates)
+        factors = np.append(1 / (1 + par_yields[bills] * times[bills]), discount)
+        return cls(knots, -np.log(factors) / knots, method=method)
+
+    def discount(self, t):  # Discount factors for times in years, any shape
+        t = np.asarray(t, dtype=float)
+        log_df = np.interp(t, self._grid, self._log_df)
+        beyond = t > self.times[-1]
+        if np.any(beyond):
+            log_df = np.where(beyond, -self.zero_rates[-1] * t, log_df)
+        return np.exp(log_df)
+
+    def zero_rate(self, t):  # Continuously compounded zero rates
+        t = np.asarray(t, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(t > 0, -np.log(self.discount(t)) / t, self.zero_rates[0])
+
+    def discount_schedule(self, n_periods, frequency=1, offset=0.0):  # DF at (offset + k) / frequency, k = 1..n
+        key = (int(n_periods), float(frequency), float(offset))
+        schedule = self._schedules.get(key)
+        if schedule is None:
+            if len(self._schedules) >= SCHEDULE_CACHE_SIZE:
+                self._schedules.clear()
+            schedule = self.discount((offset + np.arange(1, key[0] + 1)) / frequency)
+            schedule.flags.writeable = False
+            self._schedules[key] = schedule
+        return schedule
+
+    def annuity_factor(self, n, frequency=1, due=False, deferred=0, growth=0.0):  # sum (1+g)^(k-1) DF(t_k)
+        # Payments k = 1..n fall at (k - due + deferred) / frequency years, so one
+        # cached schedule per (deferral, timing) serves a whole batch of terms.
+        n, deferred, growth = np.broadcast_arrays(np.rint(np.asarray(n, dtype=float)),
+                                                  np.asarray(deferred, dtype=float),
+                                                  np.asarray(growth, dtype=float))
+        factor = np.zeros(n.shape)
+        n_max = int(n.max(initial=0))
+        if n_max <= 0:
+            return factor
+        k = np.arange(n_max)
+        for offset in np.unique(deferred):
+            rows = deferred == offset
+            schedule = self.discount_schedule(n_max, frequency, offset - float(due))
+            if np.all(growth[rows] == 0):
+                cumulative = np.append(0.0, np.cumsum(schedule))
+                factor[rows] = cumulative[n[rows].astype(np.int64)]
+            else:
+                weights = (1 + growth[rows][:, None]) ** k * schedule
+                factor[rows] = np.where(k < n[rows][:, None], weights, 0.0).sum(axis=1)
+        return factor
+
+    def shifted(self, shift):  # Parallel shift of the zero curve
+        return YieldCurve(self.times, self.zero_rates + shift, method=self.method)
+
+    def bumped(self, bump, tenor):  # Bump one knot's zero rate (a key-rate shift)
+        rates = self.zero_rates.copy()
+        rates[np.argmin(np.abs(self.times - tenor))] += bump
+        return YieldCurve(self.times, rates, method=self.method)
+
+
+@YIELD_CURVES.memoize
+def yield_curve(times, rates, basis='zero', frequency=2, method='log_linear', compounding='continuous'):
+    # One curve per distinct set of quotes; basis is 'zero' or 'par'
+    if basis == 'par':
+        return YieldCurve.from_par_yields(times, rates, frequency, method)
+    if basis == 'zero':
+        return YieldCurve(times, rates, compounding, method)
+    raise ValueError(f"Unknown curve basis: {basis}")
@@ -0,0 +1,71 @@
+# Point reduction for charts. Everything here is NumPy only, so series are cut
+# down before plotly (or the browser) ever sees them.
+import numpy as np
+
+MAX_POINTS = 2_000  # Points per trace sent to the browser
+
+
+def lttb(x, y, n_out):  # Largest-Triangle-Three-Buckets: indices of the points to keep
+    # Keeps the first and last points and, from each bucket in between, the point
+    # forming the largest triangle with the previous pick and the next bucket's
+    # mean, which preserves the visual shape of the line.
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < edges.size else n
+        mean_x, mean_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        area = np.abs((x[previous] - mean_x) * (y[start:stop] - y[previous]) -
+                      (x[previous] - x[start:stop]) * (mean_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def min_max(y, n_out):  # Indices of each bucket's minimum and maximum, in order
+    # Fully vectorized and keeps every spike; two points per bucket plus the
+    # first and last point, at most n_out in all.
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    width = -(-n // ((n_out - 2) // 2))
+    buckets = np.full(width * -(-n // width), np.nan)
+    buckets[:n] = y
+    buckets = buckets.reshape(-1, width)
+    offsets = np.arange(buckets.shape[0]) * width
+    with np.errstate(invalid='ignore'):
+        picks = (offsets + np.nanargmin(buckets, axis=1), offsets + np.nanargmax(buckets, axis=1))
+    return np.unique(np.concatenate(([0, n - 1], *picks)))
+
+
+def downsample(x, *ys, max_points=MAX_POINTS, method='lttb'):  # Shared x subset for one or more series
+    # Each series picks its own points from an equal share of max_points and the
+    # union is kept, so series drawn against the same x stay aligned and the
+    # result has at most max_points points. With too many series for a share of
+    # at least 4 points, every series is sampled on one evenly spaced grid.
+    x = np.asarray(x)
+    ys = [np.asarray(y) for y in ys]
+    if x.size <= max_points:
+        return (x, *ys)
+    if method not in ('lttb', 'minmax'):
+        raise ValueError(f"Unknown downsampling method: {method}")
+    share = max_points // max(len(ys), 1)
+    if share < 4:
+        keep = np.unique(np.linspace(0, x.size - 1, max_points).astype(np.int64))
+        return (x[keep], *(y[keep] for y in ys))
+    picks = [lttb(x, y, share) if method == 'lttb' else min_max(y, share) for y in ys]
+    keep = np.unique(np.concatenate(picks))
+    return (x[keep], *(y[keep] for y in ys))
+
+
+def percentile_bands(paths, percentiles=(5, 25, 50, 75, 95), axis=-1):  # Aggregate simulated paths
+    # paths is (points x paths) by default; only the bands need to leave the server.
+    bands = np.percentile(np.asarray(paths, dtype=float), percentiles, axis=axis)
+    return dict(zip(percentiles, bands))
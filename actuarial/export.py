@@ -0,0 +1,94 @@
+import csv
+from contextlib import contextmanager
+from itertools import islice
+
+import numpy as np
+
+from .amortization import amortize_portfolio
+from .schedule import MONEY_FIELDS, SCHEDULE_FIELDS, Schedule
+
+CHUNK_ROWS = 10_000  # Rows buffered per CSV write
+CHUNK_LOANS = 1_000  # Loans amortized together per batch
+
+
+@contextmanager
+def _text_target(target):  # Path, or any writable text stream (file, socket.makefile('w'), ...)
+    if hasattr(target, 'write'):
+        yield target
+    else:
+        with open(target, 'w', newline='') as handle:
+            yield handle
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def write_schedule_csv(schedule, target, chunk_rows=CHUNK_ROWS):  # Stream one schedule's rows to CSV
+    # schedule is a columnar Schedule (rounded to cents here, chunk by chunk) or
+    # row dicts, possibly a generator (iter_amortization_schedule), so memory stays at one chunk.
+    with _text_target(target) as handle:
+        writer = csv.writer(handle)
+        writer.writerow(SCHEDULE_FIELDS)
+        if isinstance(schedule, Schedule):
+            for start in range(0, len(schedule), chunk_rows):
+                columns = [schedule['Payment'][start:start + chunk_rows].tolist()] + [
+                    [round(value, 2) for value in schedule[column][start:start + chunk_rows].tolist()]
+                    for column in MONEY_FIELDS]
+                writer.writerows(zip(*columns))
+            return
+        for rows in _chunks(schedule, chunk_rows):
+            writer.writerows([row[column] for column in SCHEDULE_FIELDS] for row in rows)
+
+
+def iter_portfolio_schedules(loans, chunk_loans=CHUNK_LOANS):  # (loan_id, batch, index) per loan
+    # loans is an iterable of (loan_id, principal, annual_rate, years, extra_payment)
+    for chunk in _chunks(loans, chunk_loans):
+        loan_ids, principals, annual_rates, years, extra_payments = zip(*chunk)
+        schedules = amortize_portfolio(principals, annual_rates, years, extra_payments)
+        for index, loan_id in enumerate(loan_ids):
+            yield loan_id, schedules, index
+
+
+def iter_portfolio_rows(loans, chunk_loans=CHUNK_LOANS):  # Flat rows with the loan id first
+    for loan_id, schedules, index in iter_portfolio_schedules(loans, chunk_loans):
+        n_rows = int(schedules['Payments Made'][index])
+        columns = [[round(value, 2) for value in schedules[column][index, :n_rows].tolist()] for column in MONEY_FIELDS]
+        yield from zip([loan_id] * n_rows, range(1, n_rows + 1), *columns)
+
+
+def write_portfolio_csv(loans, target, chunk_loans=CHUNK_LOANS, chunk_rows=CHUNK_ROWS):  # Many loans, one CSV
+    with _text_target(target) as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['Loan ID', *SCHEDULE_FIELDS])
+        for rows in _chunks(iter_portfolio_rows(loans, chunk_loans), chunk_rows):
+            writer.writerows(rows)
+
+
+def write_portfolio_parquet(loans, path, chunk_loans=CHUNK_LOANS):  # Many loans, one Parquet file
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from error
+
+    writer = None
+    try:
+        for chunk in _chunks(loans, chunk_loans):
+            loan_ids = [loan[0] for loan in chunk]
+            schedules = amortize_portfolio(*(np.array([loan[i] for loan in chunk]) for i in range(1, 5)))
+            n_rows = schedules['Payments Made']
+            made = np.arange(schedules['Interest'].shape[1]) < n_rows[:, None]
+            columns = {'Loan ID': pa.array(np.repeat(np.array(loan_ids, dtype=object), n_rows)),
+                       'Payment': pa.array(np.nonzero(made)[1] + 1)}
+            for column in MONEY_FIELDS:
+                columns[column] = pa.array(np.round(schedules[column][made], 2))
+            table = pa.table(columns)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
@@ -0,0 +1,147 @@
+# Opt-in per-phase timing for calculator invocations. Enable with
+# ACTUARIAL_INSTRUMENTATION=1 or enable(); while disabled, phase() hands back a
+# shared no-op context so instrumented code pays one flag check.
+import contextlib
+import contextvars
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+_enabled = os.environ.get('ACTUARIAL_INSTRUMENTATION', '') not in ('', '0')
+_events = deque(maxlen=10_000)
+_lock = threading.Lock()
+_invocation = contextvars.ContextVar('invocation', default=(None, None))
+_invocation_ids = itertools.count(1)
+_NULL = contextlib.nullcontext()
+_LABEL_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})  # Prometheus label value escapes
+
+
+def enable(max_events=10_000):
+    global _enabled, _events
+    with _lock:
+        if _events.maxlen != max_events:
+            _events = deque(_events, maxlen=max_events)
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+class _Phase:  # Times one block and records it as an event
+    __slots__ = ('name', 'labels', 'calculator', 'token', 'start', 'blocks')
+
+    def __init__(self, name, labels, calculator=None):
+        self.name = name
+        self.labels = labels
+        self.calculator = calculator  # Set only for invocations
+        self.token = None
+
+    def __enter__(self):
+        if self.calculator is not None:
+            self.token = _invocation.set((next(_invocation_ids), self.calculator))
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        seconds = time.perf_counter() - self.start
+        allocated_blocks = sys.getallocatedblocks() - self.blocks
+        invocation_id, calculator = _invocation.get()
+        event = {'timestamp': time.time(), 'invocation': invocation_id, 'calculator': calculator,
+                 'phase': self.name, 'seconds': seconds, 'allocated_blocks': allocated_blocks,
+                 'error': exc_type.__name__ if exc_type else None}
+        event.update(self.labels)
+        with _lock:
+            _events.append(event)
+        if self.token is not None:
+            _invocation.reset(self.token)
+        return False
+
+
+def phase(name, **labels):  # with phase('dataframe'): ...
+    if not _enabled:
+        return _NULL
+    return _Phase(name, labels)
+
+
+def invocation(calculator, **labels):  # Groups the phases of one calculator run; records a 'total' phase
+    if not _enabled:
+        return _NULL
+    return _Phase('total', labels, calculator)
+
+
+def instrumented(name=None):  # Decorator form of phase()
+    def decorate(func):
+        phase_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Phase(phase_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def events(clear=False):  # Snapshot of recorded events, oldest first
+    with _lock:
+        snapshot = list(_events)
+        if clear:
+            _events.clear()
+    return snapshot
+
+
+def merge_events(recorded):  # Add events recorded elsewhere, e.g. returned by a worker process
+    with _lock:
+        _events.extend(recorded)
+
+
+def export_jsonl(target, clear=True):  # One JSON object per line to a path or text stream
+    recorded = events(clear)
+    lines = ''.join(json.dumps(event) + '\n' for event in recorded)
+    if hasattr(target, 'write'):
+        target.write(lines)
+    else:
+        with open(target, 'a') as handle:
+            handle.write(lines)
+    return len(recorded)
+
+
+def _label_text(labels):
+    return ','.join(f'{key}="{str(value).translate(_LABEL_ESCAPES)}"' for key, value in labels)
+
+
+def prometheus_text():  # Prometheus text exposition of per-phase totals
+    totals = {}
+    for event in events():
+        key = (('calculator', event['calculator'] or ''), ('phase', event['phase']))
+        count, seconds, blocks = totals.get(key, (0, 0.0, 0))
+        totals[key] = (count + 1, seconds + event['seconds'], blocks + max(event['allocated_blocks'], 0))
+    lines = ['# HELP actuarial_phase_seconds Time spent in each calculator phase.',
+             '# TYPE actuarial_phase_seconds summary']
+    for key, (count, seconds, _) in sorted(totals.items()):
+        lines.append(f'actuarial_phase_seconds_count{{{_label_text(key)}}} {count}')
+        lines.append(f'actuarial_phase_seconds_sum{{{_label_text(key)}}} {seconds:.9f}')
+    lines += ['# HELP actuarial_phase_allocated_blocks_total Net memory blocks allocated in each phase.',
+              '# TYPE actuarial_phase_allocated_blocks_total counter']
+    for key, (_, _, blocks) in sorted(totals.items()):
+        lines.append(f'actuarial_phase_allocated_blocks_total{{{_label_text(key)}}} {blocks}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_app(environ, start_response):  # Minimal WSGI endpoint serving prometheus_text()
+    body = prometheus_text().encode('utf-8')
+    start_response('200 OK', [('Content-Type', 'text/plain; version=0.0.4'), ('Content-Length', str(len(body)))])
+    return [body]
@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+
+SERIES_CUTOFF = 1e-5  # |n * log(1 + r)| below which factors use their Taylor series
+FSUM_LIMIT = 16  # Independent sums below which compensated_sum uses math.fsum
+
+
+def _args(*args):
+    return (np.asarray(a, dtype=float) for a in args)
+
+
+def growth_factor(r, n):  # (1 + r)^n via exp(n log1p r), accurate for tiny r and huge n
+    r, n = _args(r, n)
+    with np.errstate(over='ignore'):
+        return np.exp(n * np.log1p(r))
+
+
+def discount_factor(r, n):  # (1 + r)^-n
+    r, n = _args(r, n)
+    with np.errstate(over='ignore'):
+        return np.exp(-n * np.log1p(r))
+
+
+def accumulation_factor(r, n):  # s_n = ((1 + r)^n - 1) / r, equal to n at r = 0
+    # expm1 keeps the numerator's leading digits; within the cutoff the
+    # series n (1 + (n-1) r / 2 + (n-1)(n-2) r^2 / 6) replaces the 0/0.
+    r, n = _args(r, n)
+    x = n * np.log1p(r)
+    small = np.abs(x) < SERIES_CUTOFF
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        exact = np.expm1(x) / r
+    series = n * (1 + (n - 1) * r / 2 + (n - 1) * (n - 2) * r ** 2 / 6)
+    return np.where(small, series, exact)
+
+
+def accumulation_factor_derivative(r, n):  # ds_n/dr = (n (1 + r)^(n-1) - s_n) / r, for Newton rate solvers
+    # The difference cancels as n r -> 0; within the cutoff the series
+    # n(n-1)/2 + n(n-1)(n-2) r / 3 + n(n-1)(n-2)(n-3) r^2 / 8 replaces it.
+    r, n = _args(r, n)
+    x = n * np.log1p(r)
+    small = np.abs(x) < SERIES_CUTOFF
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        exact = (n * np.exp(x) / (1 + r) - accumulation_factor(r, n)) / r
+    series = n * (n - 1) / 2 + n * (n - 1) * (n - 2) / 3 * r + n * (n - 1) * (n - 2) * (n - 3) / 8 * r ** 2
+    return np.where(small, series, exact)
+
+
+def annuity_factor(r, n):  # a_n = (1 - (1 + r)^-n) / r, equal to n at r = 0
+    r, n = _args(r, n)
+    x = n * np.log1p(r)
+    small = np.abs(x) < SERIES_CUTOFF
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        exact = -np.expm1(-x) / r
+    series = n * (1 - (n + 1) * r / 2 + (n + 1) * (n + 2) * r ** 2 / 6)
+    return np.where(small, series, exact)
+
+
+def growing_annuity_factor(r, g, n):  # (1 - ((1+g)/(1+r))^n) / (r - g), continuous through r = g
+    # The growing annuity is a level annuity at j = (r - g) / (1 + g), scaled
+    # by 1 / (1 + g), so r close to g needs no special case.
+    r, g, n = _args(r, g, n)
+    return annuity_factor((r - g) / (1 + g), n) / (1 + g)
+
+
+def compensated_sum(values, axis=0):  # Compensated (TwoSum) summation along one axis
+    # Each addition's exact rounding error is recovered branch-free and carried
+    # separately, so the result is accurate to O(eps) whatever the ordering or
+    # signs of the terms. Vectorized across the other axes: summing a
+    # (periods x bonds) matrix costs one pass over its contiguous rows.
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, 0)
+    if values.shape[0] == 0:
+        return np.zeros(values.shape[1:])
+    if values[0].size <= FSUM_LIMIT:  # Few sums: math.fsum is exact and skips the row loop
+        columns = values.reshape(values.shape[0], -1).T
+        return np.array([math.fsum(column) for column in columns.tolist()]).reshape(values.shape[1:])
+    total = np.array(values[0])
+    error = np.zeros(values.shape[1:])
+    updated, virtual, scratch = (np.empty(values.shape[1:]) for _ in range(3))
+    for value in values[1:]:
+        np.add(total, value, out=updated)
+        np.subtract(updated, total, out=virtual)
+        np.subtract(updated, virtual, out=scratch)
+        np.subtract(total, scratch, out=scratch)  # Error from total's side
+        error += scratch
+        np.subtract(value, virtual, out=scratch)  # Error from value's side
+        error += scratch
+        total, updated = updated, total
+    return total + error
@@ -0,0 +1,133 @@
+import csv
+import hashlib
+
+import numpy as np
+
+from .cache import ResultCache
+
+RADIX = 100_000.0
+COMMUTATION_TABLES = ResultCache('commutation tables', maxsize=64)
+
+
+class MortalityTable:  # One-year death probabilities q_x for consecutive integer ages
+    def __init__(self, ages, qx, name="table"):
+        self.ages = np.asarray(ages, dtype=np.int64)
+        self.qx = np.asarray(qx, dtype=float)
+        self.name = name
+        if self.ages.size == 0 or np.any(np.diff(self.ages) != 1):
+            raise ValueError("Mortality table ages must be consecutive integers.")
+        if np.any((self.qx < 0) | (self.qx > 1)):
+            raise ValueError("Mortality rates q_x must lie in [0, 1].")
+        self.key = (name, hashlib.sha1(self.ages.tobytes() + self.qx.tobytes()).hexdigest())
+
+    @property
+    def min_age(self):
+        return int(self.ages[0])
+
+    @property
+    def max_age(self):
+        return int(self.ages[-1])
+
+
+def load_mortality_table(source, name=None, age_column='age', qx_column='qx'):  # CSV with age,qx columns
+    handle = open(source, newline='') if isinstance(source, str) else source
+    try:
+        rows = list(csv.DictReader(handle))
+    finally:
+        if isinstance(source, str):
+            handle.close()
+    if not rows or age_column not in rows[0] or qx_column not in rows[0]:
+        raise ValueError(f"Mortality CSV needs '{age_column}' and '{qx_column}' columns.")
+    rows.sort(key=lambda row: int(row[age_column]))
+    return MortalityTable([int(row[age_column]) for row in rows], [float(row[qx_column]) for row in rows],
+                          name or (source if isinstance(source, str) else "table"))
+
+
+def makeham_table(A=0.00022, B=2.7e-6, c=1.124, min_age=20, max_age=120, name="SULT"):  # Makeham's law
+    # Defaults are the Standard Ultimate Life Table parameters used in actuarial exams.
+    ages = np.arange(min_age, max_age + 1)
+    qx = -np.expm1(-A - B * c ** ages * (c - 1) / np.log(c))
+    qx[-1] = 1.0
+    return MortalityTable(ages, qx, name)
+
+
+class CommutationTable:  # D_x, N_x, C_x, M_x for one (mortality table, interest rate)
+    # Columns carry one trailing zero row (age omega + 1), so every lookup for
+    # ages and terms that run off the table is a plain index.
+    COLUMNS = ('age', 'lx', 'Dx', 'Nx', 'Cx', 'Mx')
+
+    def __init__(self, columns, interest_rate, name="table"):
+        self.columns = columns  # (6, ages + 1) array, possibly memory-mapped
+        self.interest_rate = float(interest_rate)
+        self.name = name
+        self.min_age = int(columns[0, 0])
+        self.max_age = self.min_age + columns.shape[1] - 2
+
+    @classmethod
+    def build(cls, table, interest_rate):
+        v = 1 / (1 + interest_rate)
+        px = 1 - table.qx
+        lx = RADIX * np.concatenate(([1.0], np.cumprod(px)))
+        dx = lx[:-1] - lx[1:]
+        ages = np.arange(table.min_age, table.max_age + 2, dtype=float)
+        Dx = v ** ages * lx
+        Cx = np.append(v ** (ages[:-1] + 1) * dx, 0.0)
+        Nx = np.cumsum(Dx[::-1])[::-1]
+        Mx = np.cumsum(Cx[::-1])[::-1]
+        Dx[-1] = Nx[-1] = Mx[-1] = 0.0  # Nobody survives past the table
+        return cls(np.vstack([ages, lx, Dx, Nx, Cx, Mx]), interest_rate, table.name)
+
+    def save(self, path):  # .npy file that load() can memory-map
+        np.save(path, np.vstack([self.columns, np.full(self.columns.shape[1], self.interest_rate)]))
+
+    @classmethod
+    def load(cls, path, mmap=True, name="table"):
+        data = np.load(path, mmap_mode='r' if mmap else None)
+        return cls(data[:-1], float(data[-1, 0]), name)
+
+    def column(self, name, x):  # Vectorized lookup by age, zero past the table
+        index = np.clip(np.asarray(x, dtype=np.int64) - self.min_age, 0, self.columns.shape[1] - 1)
+        if np.any(np.asarray(x) < self.min_age):
+            raise ValueError(f"Age below the table's minimum age {self.min_age}.")
+        return self.columns[self.COLUMNS.index(name)][index]
+
+    def _term_end(self, x, n):
+        return np.asarray(x) + (self.max_age + 1 - np.asarray(x) if n is None else np.asarray(n))
+
+    def annuity_due(self, x, n=None, deferred=0):  # n|ä_x or temporary ä_{x:n}, deferred by `deferred` years
+        start = np.asarray(x) + deferred
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.column('Nx', start) - self.column('Nx', self._term_end(start, n))) / self.column('Dx', x)
+
+    def annuity_immediate(self, x, n=None, deferred=0):  # a_x = ä_x - 1, paid at the end of each year
+        start = np.asarray(x) + deferred + 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.column('Nx', start) - self.column('Nx', self._term_end(start, n))) / self.column('Dx', x)
+
+    def pure_endowment(self, x, n):  # nE_x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.column('Dx', np.asarray(x) + n) / self.column('Dx', x)
+
+    def insurance(self, x, n=None):  # Whole life A_x, or term A^1_{x:n}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.column('Mx', x) - self.column('Mx', self._term_end(x, n))) / self.column('Dx', x)
+
+    def endowment_insurance(self, x, n):  # A_{x:n}
+        return self.insurance(x, n) + self.pure_endowment(x, n)
+
+
+def commutation_table(table, interest_rate):  # Built once per (table, rate), then served from memory
+    return COMMUTATION_TABLES.get_or_compute((table.key, float(interest_rate)),
+                                             lambda: CommutationTable.build(table, interest_rate))
+
+
+def life_annuity_value(table, PMT, interest_rate, age, n=None, deferred=0, due=True):  # PMT x EPV
+    # Vectorized over ages; interest_rate may also be an array (e.g. a shock
+    # grid), with one cached commutation table per rate.
+    rates = np.asarray(interest_rate, dtype=float)
+    values = []
+    for rate in rates.ravel():
+        commutation = commutation_table(table, rate)
+        annuity = commutation.annuity_due if due else commutation.annuity_immediate
+        values.append(PMT * annuity(age, n, deferred))
+    return np.reshape(values, rates.shape + np.shape(values[0]))
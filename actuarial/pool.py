@@ -0,0 +1,98 @@
+import numpy as np
+
+from .kernels import annuity_factor
+
+PREPAYMENT_MODELS = ('CPR', 'SMM', 'PSA')
+CHUNK_CELLS = 4_000_000  # Max loans x months scheduled-balance cells built at once
+PSA_RAMP_MONTHS = 30  # 100% PSA: CPR rises 0.2% a month to 6% at loan age 30 months
+PSA_CPR = 0.06
+
+
+def smm_from_cpr(cpr):  # Single monthly mortality from an annual conditional prepayment rate
+    with np.errstate(divide='ignore'):  # CPR 1 (e.g. a capped PSA speed): log1p(-1) = -inf gives SMM 1
+        return -np.expm1(np.log1p(-np.asarray(cpr, dtype=float)) / 12)
+
+
+def cpr_from_smm(smm):
+    return -np.expm1(12 * np.log1p(-np.asarray(smm, dtype=float)))
+
+
+def prepayment_rates(speeds, loan_ages, model='PSA'):  # SMM for every speed (rows) at every loan age (columns)
+    # speeds: annual CPR (0.06), monthly SMM (0.005) or PSA percent (150 = 150% PSA);
+    # loan_ages: age in months of the loan in the month the prepayment happens
+    speeds = np.asarray(speeds, dtype=float).reshape(-1, 1)
+    loan_ages = np.asarray(loan_ages, dtype=float).reshape(1, -1)
+    if model == 'SMM':
+        return np.broadcast_to(speeds, (speeds.shape[0], loan_ages.shape[1]))
+    if model == 'CPR':
+        cpr = np.broadcast_to(speeds, (speeds.shape[0], loan_ages.shape[1]))
+    elif model == 'PSA':
+        cpr = speeds / 100 * PSA_CPR * np.minimum(loan_ages, PSA_RAMP_MONTHS) / PSA_RAMP_MONTHS
+    else:
+        raise ValueError(f"Unknown prepayment model: {model}; expected one of {PREPAYMENT_MODELS}")
+    return smm_from_cpr(np.minimum(cpr, 1.0))
+
+
+class LoanPool:  # Level-payment loans aggregated by age, ready for any number of prepayment speeds
+    # A prepaying level-payment loan re-amortizes over its remaining term, so its
+    # balance is always (scheduled balance) x (survival factor), and the survival
+    # factor depends only on the loan's age. Scheduled balances are therefore
+    # summed once per age cohort, and each speed is a (cohorts x months) product.
+    def __init__(self, balances, annual_rates, remaining_months, ages=0):
+        balances, annual_rates, remaining_months, ages = (a.ravel() for a in np.broadcast_arrays(
+            np.asarray(balances, dtype=float), np.asarray(annual_rates, dtype=float),
+            np.asarray(remaining_months, dtype=np.int64), np.asarray(ages, dtype=np.int64)))
+        live = (balances > 0) & (remaining_months > 0)
+        self.n_loans = int(live.sum())
+        self.months = int(remaining_months[live].max()) if self.n_loans else 0
+        self.cohort_ages, cohort = np.unique(ages[live], return_inverse=True)
+        order = np.argsort(cohort, kind='stable')
+        balances, monthly_rates, terms = (a[live][order] for a in (balances, annual_rates / 12, remaining_months))
+        cohort = cohort.reshape(-1)[order]
+        # Sums over each cohort of the scheduled balance after t payments and of
+        # the interest due on it, for t = 0..months
+        self.scheduled = np.zeros((self.cohort_ages.size, self.months + 1))
+        self.scheduled_interest = np.zeros_like(self.scheduled)
+        elapsed = np.arange(self.months + 1)
+        step = max(1, CHUNK_CELLS // (self.months + 1))
+        for start in range(0, self.n_loans, step):
+            chunk = slice(start, start + step)
+            rate, term = monthly_rates[chunk, None], terms[chunk, None]
+            remaining = np.maximum(term - elapsed, 0)
+            scheduled = balances[chunk, None] * annuity_factor(rate, remaining) / annuity_factor(rate, term)
+            labels = cohort[chunk]
+            starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+            self.scheduled[labels[starts]] += np.add.reduceat(scheduled, starts, axis=0)
+            self.scheduled_interest[labels[starts]] += np.add.reduceat(scheduled * rate, starts, axis=0)
+
+    def cash_flows(self, speeds, model='PSA'):  # Monthly pool buckets, (speeds x months) per field
+        # Month t (1..months) is in column t - 1. A scalar speed gives 1-D arrays.
+        flat = np.asarray(speeds, dtype=float).reshape(-1)
+        elapsed = np.arange(1, self.months + 1)
+        smm = prepayment_rates(flat, (self.cohort_ages[:, None] + elapsed).ravel(), model).reshape(
+            flat.size, self.cohort_ages.size, self.months)
+        survival = np.ones((flat.size, self.cohort_ages.size, self.months + 1))
+        np.cumprod(1 - smm, axis=2, out=survival[:, :, 1:])
+        before = survival[:, :, :-1]  # Survival at the start of each month
+
+        def pooled(columns, factors): return np.einsum('ct,sct->st', columns, factors)
+
+        flows = {
+            'beginning_balance': pooled(self.scheduled[:, :-1], before),
+            'interest': pooled(self.scheduled_interest[:, :-1], before),
+            'scheduled_principal': pooled(self.scheduled[:, :-1] - self.scheduled[:, 1:], before),
+            'prepaid_principal': pooled(self.scheduled[:, 1:], before * smm),
+            'ending_balance': pooled(self.scheduled[:, 1:], survival[:, :, 1:]),
+        }
+        principal = flows['scheduled_principal'] + flows['prepaid_principal']
+        flows['total_principal'] = principal
+        flows['cash_flow'] = principal + flows['interest']
+        paid = principal.sum(axis=1)
+        flows['weighted_average_life'] = np.divide(principal @ elapsed, 12 * paid, out=np.zeros_like(paid),
+                                                   where=paid > 0)
+        shape = np.shape(speeds)
+        return {name: value.reshape(shape + value.shape[1:]) for name, value in flows.items()}
+
+
+def pool_cash_flows(balances, annual_rates, remaining_months, speeds, model='PSA', ages=0):  # One-shot sweep
+    return LoanPool(balances, annual_rates, remaining_months, ages).cash_flows(speeds, model)
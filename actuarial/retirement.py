@@ -0,0 +1,141 @@
+import numpy as np
+
+from .accel import backend, jit
+from .kernels import accumulation_factor, growth_factor
+
+CHUNK_PATHS = 25_000  # Paths per seeded chunk; results do not depend on worker count
+
+
+def retirement_funds(current_savings, monthly_contribution, annual_return, years):  # Deterministic projection
+    current_savings, monthly_contribution, annual_return, years = (
+        np.asarray(a, dtype=float) for a in (current_savings, monthly_contribution, annual_return, years))
+    fv_current = current_savings * growth_factor(annual_return, years)
+    fv_contributions = monthly_contribution * accumulation_factor(annual_return / 12, years * 12)
+    return fv_current, fv_contributions
+
+
+def retirement_balance_series(current_age, retirement_age, current_savings, monthly_contribution,
+                              annual_return):  # Balance at each age, compounding monthly
+    ages = np.arange(current_age, retirement_age + 1)
+    months = (ages - current_age) * 12
+    monthly_return = annual_return / 12
+    return ages, (current_savings * growth_factor(monthly_return, months) +
+                  monthly_contribution * accumulation_factor(monthly_return, months))
+
+
+def _monthly_growth(rng, monthly_drift, monthly_volatility, uniforms, shocks, growth):  # Fills growth in place
+    # Lognormal factors for 12 months x paths by Box-Muller on float32 uniforms,
+    # about twice as fast as standard_normal; 24-bit uniforms cap the shocks near
+    # 5.8 sigma. Only the shocks are exponentiated in float32; the drift factor
+    # multiplies them in float64, so it is not rounded away month after month.
+    # The uniforms are those of rng.random(dtype=np.float32), built from the raw
+    # bits without its overhead (a 24-bit integer converts exactly through int32,
+    # much faster than from uint32). Every step works in the chunk's buffers.
+    bits = rng.bit_generator.random_raw(uniforms.size // 2).view(np.uint32).reshape(uniforms.shape)
+    bits >>= np.uint32(8)
+    uniforms[...] = bits.view(np.int32)
+    uniforms *= np.float32(2 ** -24)
+    radius, angle = uniforms
+    np.negative(radius, out=radius)
+    np.log1p(radius, out=radius)  # 1 - u lies in (0, 1]
+    radius *= -2
+    np.sqrt(radius, out=radius)
+    radius *= np.float32(monthly_volatility)
+    angle *= np.float32(2 * np.pi)
+    np.cos(angle, out=shocks[:6])
+    np.sin(angle, out=shocks[6:])
+    shocks[:6] *= radius
+    shocks[6:] *= radius
+    np.exp(shocks, out=shocks)
+    np.multiply(shocks, np.exp(np.float64(monthly_drift)), out=growth)
+
+
+def _simulate_chunk(task):  # One chunk of paths -> yearly wealth snapshots
+    (seed, n_paths, months_to_retirement, total_months, current_savings, monthly_contribution,
+     monthly_drift, monthly_volatility, withdrawal_rate, monthly_withdrawal) = task
+    rng = np.random.default_rng(seed)
+    wealth = np.full(n_paths, float(current_savings))
+    yearly = np.empty((total_months // 12 + 1, n_paths))  # Ages x paths
+    yearly[0] = wealth
+    withdrawal = None
+    compiled = backend() != 'numpy'
+    buffers = np.empty((2, 6, n_paths), dtype=np.float32), np.empty((12, n_paths), dtype=np.float32)
+    growth = np.empty((12, n_paths))
+    if compiled:
+        withdrawal = np.full(n_paths, np.nan if monthly_withdrawal is None else float(monthly_withdrawal))
+    for year in range(total_months // 12):
+        _monthly_growth(rng, monthly_drift, monthly_volatility, *buffers, growth)
+        if compiled:
+            _grow_year(wealth, growth, year * 12 - months_to_retirement, float(monthly_contribution),
+                       float(withdrawal_rate), withdrawal)
+            yearly[year + 1] = wealth
+            continue
+        for month in range(12):  # In place: wealth is this chunk's own array
+            if year * 12 + month < months_to_retirement:
+                wealth *= growth[month]
+                wealth += monthly_contribution
+            else:
+                if withdrawal is None:
+                    withdrawal = wealth * withdrawal_rate / 12 if monthly_withdrawal is None \
+                        else np.full(n_paths, float(monthly_withdrawal))
+                wealth *= growth[month]
+                wealth -= withdrawal
+                np.maximum(wealth, 0.0, out=wealth)
+        yearly[year + 1] = wealth
+    return yearly
+
+
+@jit
+def _grow_year(wealth, growth, retired_months, contribution, withdrawal_rate, withdrawal):  # In place
+    # retired_months: months since retirement at the start of this year (negative before it);
+    # withdrawal holds NaN until it is fixed in the first retired month.
+    for month in range(growth.shape[0]):
+        if retired_months + month < 0:
+            for path in range(wealth.size):
+                wealth[path] = wealth[path] * growth[month, path] + contribution
+            continue
+        for path in range(wealth.size):
+            if withdrawal[path] != withdrawal[path]:
+                withdrawal[path] = wealth[path] * withdrawal_rate / 12
+            balance = wealth[path] * growth[month, path] - withdrawal[path]
+            if not (balance >= 0.0 or balance != balance):  # np.maximum
+                balance = 0.0
+            wealth[path] = balance
+
+
+def simulate_retirement(current_age, retirement_age, current_savings, monthly_contribution, annual_return,
+                        annual_volatility=0.15, end_age=95, n_paths=100_000, withdrawal_rate=0.04,
+                        monthly_withdrawal=None, percentiles=(5, 25, 50, 75, 95), seed=None, workers=1):  # Monte Carlo
+    # Monthly gross returns are lognormal with expected annual growth of
+    # 1 + annual_return. Savings accumulate until retirement, then a fixed
+    # monthly withdrawal (withdrawal_rate of each path's wealth at retirement,
+    # unless monthly_withdrawal is given) is drawn until end_age.
+    years_to_retirement = retirement_age - current_age
+    total_years = end_age - current_age
+    if years_to_retirement < 0 or total_years < years_to_retirement:
+        raise ValueError("Ages must satisfy current age <= retirement age <= end age.")
+    monthly_drift = (np.log1p(annual_return) - annual_volatility ** 2 / 2) / 12
+    monthly_volatility = annual_volatility / np.sqrt(12)
+
+    chunk_sizes = [min(CHUNK_PATHS, n_paths - start) for start in range(0, n_paths, CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [(chunk_seed, size, years_to_retirement * 12, total_years * 12, current_savings, monthly_contribution,
+              monthly_drift, monthly_volatility, withdrawal_rate, monthly_withdrawal)
+             for chunk_seed, size in zip(seeds, chunk_sizes)]
+    if workers > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+    else:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    yearly = np.concatenate(chunks, axis=1)
+
+    success_probability = float((yearly[-1] > 0).mean())
+    yearly.sort(axis=1)  # In place; np.percentile then finds its order statistics at once
+    bands = np.percentile(yearly, percentiles, axis=1, overwrite_input=True)
+    return {
+        'ages': np.arange(current_age, end_age + 1),
+        'percentiles': dict(zip(percentiles, bands)),
+        'success_probability': success_probability,
+        'retirement_wealth': dict(zip(percentiles, bands[:, years_to_retirement])),
+    }
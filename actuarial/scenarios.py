@@ -0,0 +1,75 @@
+import numpy as np
+
+SCENARIO_FIELDS = {  # Column -> default when the scenario table omits it (None: required)
+    'current_age': None,
+    'retirement_age': None,
+    'current_savings': 0.0,
+    'monthly_contribution': 0.0,
+    'annual_return': None,
+    'withdrawal_rate': 0.0,  # Share of the balance at retirement withdrawn per year, drawn monthly
+}
+
+
+class GrowthTable:  # (1 + i)^k and s_k = sum_{j<k} (1 + i)^j for k = 0..periods, one row per distinct rate
+    # Built with one cumprod and one cumsum over (distinct rates x periods);
+    # scenarios that share a rate share its row.
+    def __init__(self, periodic_rates, periods):
+        self.rates, self.rows = np.unique(np.asarray(periodic_rates, dtype=float).ravel(), return_inverse=True)
+        self.rows = self.rows.reshape(-1)
+        self.growth = np.ones((self.rates.size, periods + 1))
+        np.cumprod(np.broadcast_to(1 + self.rates[:, None], (self.rates.size, periods)), axis=1,
+                   out=self.growth[:, 1:])
+        self.accumulation = np.zeros_like(self.growth)
+        np.cumsum(self.growth[:, :-1], axis=1, out=self.accumulation[:, 1:])
+
+    def future_value(self, present, payment, k, scenarios=slice(None)):  # present (1+i)^k + payment s_k
+        rows = self.rows[scenarios]
+        return present * self.growth[rows, k] + payment * self.accumulation[rows, k]
+
+
+def scenario_columns(scenarios):  # Mapping, DataFrame or list of dicts -> broadcast float columns
+    if isinstance(scenarios, (list, tuple)):
+        scenarios = {name: [row.get(name, SCENARIO_FIELDS[name]) for row in scenarios]
+                     for name in SCENARIO_FIELDS if scenarios and name in scenarios[0]}
+    missing = [name for name, default in SCENARIO_FIELDS.items() if default is None and name not in scenarios]
+    if missing:
+        raise ValueError(f"Scenario table needs columns: {', '.join(missing)}")
+    columns = np.broadcast_arrays(*(np.asarray(scenarios[name] if name in scenarios else default, dtype=float)
+                                    for name, default in SCENARIO_FIELDS.items()))
+    return {name: column.ravel() for name, column in zip(SCENARIO_FIELDS, columns)}
+
+
+def project_retirement(scenarios, end_age=None, monthly=False):  # Age x scenario balance matrix
+    # Savings grow monthly at annual_return / 12 with contributions until
+    # retirement_age, then withdrawal_rate of the retirement balance is drawn
+    # each year (monthly) until end_age, floored at zero. Ages are whole years;
+    # rows are yearly ages (or every month with monthly=True) from the youngest
+    # current_age to end_age (default: the oldest retirement_age), and cells
+    # before a scenario's current_age are NaN.
+    columns = scenario_columns(scenarios)
+    current_age = columns['current_age'].astype(np.int64)
+    retirement_months = (columns['retirement_age'].astype(np.int64) - current_age) * 12
+    if np.any(retirement_months < 0):
+        raise ValueError("Ages must satisfy current age <= retirement age.")
+    start = int(current_age.min())
+    end = int(columns['retirement_age'].max()) if end_age is None else int(end_age)
+    steps = (end - start) * 12 + 1
+    months = np.arange(0, steps, 1 if monthly else 12)
+    elapsed = months[:, None] - (current_age - start) * 12  # Months since each scenario's current age
+    table = GrowthTable(columns['annual_return'] / 12, max(int(elapsed.max()), int(retirement_months.max())))
+
+    saving = np.clip(elapsed, 0, retirement_months)
+    balances = table.future_value(columns['current_savings'], columns['monthly_contribution'], saving)
+    at_retirement = table.future_value(columns['current_savings'], columns['monthly_contribution'],
+                                       retirement_months)
+    withdrawal = at_retirement * columns['withdrawal_rate'] / 12
+    drawing = np.clip(elapsed - retirement_months, 0, None)
+    retired = np.maximum(table.future_value(at_retirement, -withdrawal, drawing), 0.0)
+    balances = np.where(elapsed > retirement_months, retired, balances)
+    balances[elapsed < 0] = np.nan
+    return {
+        'ages': start + months / 12 if monthly else start + months // 12,
+        'balances': balances,  # (ages x scenarios)
+        'retirement_balance': at_retirement,
+        'monthly_withdrawal': withdrawal,
+    }
@@ -0,0 +1,77 @@
+# Columnar amortization schedule. One int32 payment-number array plus one
+# float64 array per money column (44 bytes per loan-month, against several
+# hundred for a row dict); values stay unrounded until display or export.
+import numpy as np
+
+SCHEDULE_FIELDS = ('Payment', 'Beginning Balance', 'Monthly Payment', 'Interest', 'Principal', 'Ending Balance')
+MONEY_FIELDS = SCHEDULE_FIELDS[1:]
+
+
+class Schedule:  # Read-only mapping of field name -> column array, one entry per payment
+    def __init__(self, columns):
+        # columns: mapping with every SCHEDULE_FIELDS entry; contiguous float64
+        # inputs (e.g. rows of an amortize_portfolio block) are kept as views
+        self._columns = {'Payment': np.ascontiguousarray(columns['Payment'], dtype=np.int32)}
+        for field in MONEY_FIELDS:
+            self._columns[field] = np.ascontiguousarray(columns[field], dtype=np.float64)
+        for field, values in self._columns.items():
+            self._columns[field] = values = values.view()  # Freeze our view, not the caller's array
+            values.flags.writeable = False
+
+    @classmethod
+    def from_portfolio(cls, schedules, loan):  # Views of one loan's rows in an amortize_portfolio result
+        n_rows = int(schedules['Payments Made'][loan])
+        return cls(dict({field: schedules[field][loan, :n_rows] for field in MONEY_FIELDS},
+                        Payment=np.arange(1, n_rows + 1)))
+
+    @classmethod
+    def from_rows(cls, rows):  # From the list-of-dicts rows of generate_amortization_schedule
+        table = np.array([[row[field] for field in SCHEDULE_FIELDS] for row in rows], dtype=float)
+        return cls(dict(zip(SCHEDULE_FIELDS, table.reshape(-1, len(SCHEDULE_FIELDS)).T)))
+
+    def __getitem__(self, field):
+        return self._columns[field]
+
+    def __iter__(self):
+        return iter(SCHEDULE_FIELDS)
+
+    def __contains__(self, field):
+        return field in self._columns
+
+    def __len__(self):  # Number of payments
+        return self._columns['Payment'].size
+
+    def keys(self):
+        return SCHEDULE_FIELDS
+
+    def values(self):
+        return [self._columns[field] for field in SCHEDULE_FIELDS]
+
+    def items(self):
+        return [(field, self._columns[field]) for field in SCHEDULE_FIELDS]
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self._columns.values())
+
+    def round(self, decimals=2):  # Copy with money columns rounded, for display
+        return Schedule({field: values if field == 'Payment' else np.round(values, decimals)
+                         for field, values in self._columns.items()})
+
+    def rows(self, decimals=2):  # The legacy list-of-dicts rows, rounded like generate_amortization_schedule
+        columns = [self._columns['Payment'].tolist()] + [
+            [round(value, decimals) for value in self._columns[field].tolist()] for field in MONEY_FIELDS]
+        return [dict(zip(SCHEDULE_FIELDS, row)) for row in zip(*columns)]
+
+    def to_dataframe(self, decimals=None):  # pandas DataFrame; rounded only if decimals is given
+        import pandas as pd
+        schedule = self if decimals is None else self.round(decimals)
+        return pd.DataFrame({field: schedule[field] for field in SCHEDULE_FIELDS}, copy=False)
+
+    def to_arrow(self, decimals=None):  # pyarrow Table; float columns are wrapped without copying
+        try:
+            import pyarrow as pa
+        except ImportError as error:
+            raise ImportError("Arrow export requires pyarrow: pip install pyarrow") from error
+        schedule = self if decimals is None else self.round(decimals)
+        return pa.table({field: pa.array(schedule[field]) for field in SCHEDULE_FIELDS})
@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class SensitivityGrid:  # Values of a valuation function over a grid of shocks
+    def __init__(self, axes, values):
+        self.axes = axes  # Parameter name -> 1-D shocks, in grid axis order
+        self.values = values
+
+    def to_frame(self, value_name='value'):  # Tidy table, one row per grid point
+        import pandas as pd
+        mesh = np.meshgrid(*self.axes.values(), indexing='ij')
+        columns = {f'{name} shock': grid.ravel() for name, grid in zip(self.axes, mesh)}
+        columns[value_name] = self.values.ravel()
+        return pd.DataFrame(columns)
+
+
+def _grid_params(base, shocks, relative=False):  # Shock each named parameter along its own axis
+    params = dict(base)
+    names = list(shocks)
+    for axis, name in enumerate(names):
+        shape = [1] * len(names)
+        shape[axis] = -1
+        shock = np.asarray(shocks[name], dtype=float).reshape(shape)
+        params[name] = np.asarray(base[name], dtype=float) * (1 + shock) if relative \
+            else np.asarray(base[name], dtype=float) + shock
+    return params
+
+
+def sensitivity_grid(func, base, shocks, relative=False):  # Full revaluation on a shock grid
+    # func is evaluated once with every shocked parameter broadcast along its own
+    # axis, so a rate x growth x term surface is a single vectorized call.
+    # base holds scalar parameter values; shocks maps parameter names to 1-D shocks.
+    params = _grid_params(base, shocks, relative)
+    shape = tuple(len(np.atleast_1d(shocks[name])) for name in shocks)
+    values = np.broadcast_to(np.asarray(func(**params), dtype=float), shape)
+    return SensitivityGrid({name: np.atleast_1d(np.asarray(shocks[name], dtype=float)) for name in shocks},
+                           np.array(values))
+
+
+def bump_and_reprice(func, base, bumps):  # Change in value for each single-parameter bump
+    base_value = np.asarray(func(**base), dtype=float)
+    changes = {}
+    for name, bump in bumps.items():
+        params = dict(base)
+        params[name] = np.asarray(base[name], dtype=float) + bump
+        changes[name] = np.asarray(func(**params), dtype=float) - base_value
+    return changes
+
+
+def finite_difference_greeks(func, base, name, bump=1e-4):  # Central-difference delta and gamma
+    # Down, base and up states are stacked on a leading axis and priced in one call,
+    # so base may hold arrays (a whole book) as well as scalars.
+    params = dict(base)
+    value = np.asarray(base[name], dtype=float)
+    params[name] = value + np.array([-bump, 0.0, bump]).reshape((3,) + (1,) * value.ndim)
+    down, mid, up = np.asarray(func(**params), dtype=float)
+    return {
+        'value': mid,
+        'delta': (up - down) / (2 * bump),
+        'gamma': (up - 2 * mid + down) / bump ** 2,
+    }
+
+
+def key_rate_bumps(func, curve, bump=1e-4):  # Change in value for a bump at each curve tenor
+    # func takes a YieldCurve; each knot's zero rate is bumped alone, so the
+    # changes add up (to first order) to the parallel-shift change.
+    base_value = np.asarray(func(curve), dtype=float)
+    return {float(tenor): np.asarray(func(curve.bumped(bump, tenor)), dtype=float) - base_value
+            for tenor in curve.times}
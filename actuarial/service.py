@@ -0,0 +1,357 @@
+# JSON over HTTP on stdlib asyncio. Numeric fields may be scalars or arrays (or
+# the body a list of objects), so one request carries a batch; large batches
+# and Monte Carlo runs go to a process pool, and schedules stream as NDJSON.
+import argparse
+import asyncio
+import json
+import os
+
+import numpy as np
+
+from .amortization import amortize_portfolio, loan_summaries
+from .annuities import annuity_value
+from .bonds import price_bonds
+from .cashflows import CashFlows
+from .instrumentation import disable, enable, events, invocation, is_enabled, merge_events, prometheus_text
+from .pool import pool_cash_flows
+from .retirement import retirement_funds, simulate_retirement
+from .scenarios import SCENARIO_FIELDS, project_retirement
+from .schedule import MONEY_FIELDS
+from .tvm import future_value, present_value
+
+INLINE_LIMIT = 4_096  # Largest batch (elements) computed on the event loop
+MAX_BODY = 64 * 1024 * 1024
+STREAM_LOANS = 100  # Loans amortized per streamed NDJSON chunk
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+          411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _tvm(payload):
+    calc = payload.get('calc', 'FV')
+    if calc not in ("FV", "PV"):
+        raise ValueError("calc must be 'FV' or 'PV'.")
+    func, value = (future_value, payload['PV']) if calc == "FV" else (present_value, payload['FV'])
+    return {'value': func(value, payload['r'], payload['n'], payload.get('m', 1), payload.get('PMT', 0.0),
+                          np.asarray(payload.get('payment_at_beginning', False), dtype=bool))}
+
+
+def _annuity(payload):
+    return {'value': annuity_value(payload.get('annuity_type', "Annuity Immediate"), payload.get('calc', "PV"),
+                                   payload['PMT'], payload['r'], payload['n'], payload.get('g', 0.0),
+                                   payload.get('m', 0))}
+
+
+def _bond(payload):
+    return price_bonds(payload['face_value'], payload['coupon_rate'], payload['years'], payload['ytm'],
+                       payload.get('frequency', 2))
+
+
+def _loan(payload):
+    return loan_summaries(payload['principal'], payload['annual_rate'], payload['years'],
+                          payload.get('extra_payment', 0.0))
+
+
+def _pool(payload):  # Whole pool in one request; 'speeds' may be a list for a sweep
+    return pool_cash_flows(payload['balance'], payload['annual_rate'], payload['remaining_months'],
+                           payload.get('speeds', 100), payload.get('model', 'PSA'), payload.get('age', 0))
+
+
+def _retirement(payload):
+    fv_current, fv_contributions = retirement_funds(payload['current_savings'], payload['monthly_contribution'],
+                                                    payload['annual_return'], payload['years'])
+    return {'fv_current': fv_current, 'fv_contributions': fv_contributions, 'total': fv_current + fv_contributions}
+
+
+def _cashflows(payload):  # Dated flows: NPV at 'rate' (scalar or array) when given, and the IRR
+    flows = CashFlows(payload['dates'], payload['amounts'], payload.get('valuation_date'),
+                      payload.get('convention', 'ACT/365F'))
+    compounding = payload.get('compounding', 1)
+    result = {}
+    if 'rate' in payload:
+        result['npv'] = flows.npv(payload['rate'], compounding)
+    if payload.get('irr', True) and compounding != 'simple':
+        solution = flows.irr(compounding, payload.get('guess', 0.1))
+        result['irr'] = solution.root if solution.converged else None
+    return result
+
+
+def _scenarios(payload):  # Scenario columns (arrays) -> ages x scenarios balances
+    return project_retirement({name: payload[name] for name in SCENARIO_FIELDS if name in payload},
+                              payload.get('end_age'), payload.get('monthly', False))
+
+
+MONTE_CARLO_FIELDS = ('current_age', 'retirement_age', 'current_savings', 'monthly_contribution', 'annual_return',
+                      'annual_volatility', 'end_age', 'n_paths', 'withdrawal_rate', 'monthly_withdrawal',
+                      'percentiles', 'seed')
+
+
+def _monte_carlo(payload):
+    return simulate_retirement(**{name: payload[name] for name in MONTE_CARLO_FIELDS if name in payload})
+
+
+ENDPOINTS = {
+    '/tvm': _tvm,
+    '/annuity': _annuity,
+    '/bond': _bond,
+    '/cashflows': _cashflows,
+    '/loan': _loan,
+    '/pool': _pool,
+    '/retirement': _retirement,
+    '/retirement/monte-carlo': _monte_carlo,
+    '/retirement/scenarios': _scenarios,
+}
+POOLED = {'/retirement/monte-carlo'}  # Always sent to the worker pool
+
+
+def _jsonable(value):  # Arrays to lists, non-finite floats to null
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (np.ndarray, np.generic)):
+        value = np.asarray(value)
+        if value.dtype.kind == 'f' and not np.isfinite(value).all():
+            value = np.where(np.isfinite(value), value, None)
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def evaluate(path, payload):  # One request body -> JSON-ready result; runs in the loop or a worker
+    if isinstance(payload, list):
+        return [evaluate(path, item) for item in payload]
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object or a list of objects.")
+    with invocation(path):
+        return _jsonable(ENDPOINTS[path](payload))
+
+
+def _batch_size(payload):  # Elements in the largest array field
+    if isinstance(payload, list):
+        return sum(_batch_size(item) for item in payload)
+    if not isinstance(payload, dict):
+        return 1
+    return max([len(value) for value in payload.values() if isinstance(value, list)] + [1])
+
+
+def schedule_ndjson(loans):  # NDJSON rows for a chunk of (loan_id, principal, annual_rate, years, extra)
+    loan_ids, principals, annual_rates, years, extra_payments = zip(*loans)
+    schedules = amortize_portfolio(principals, annual_rates, years, extra_payments)
+    lines = []
+    for index, loan_id in enumerate(loan_ids):
+        n_rows = int(schedules['Payments Made'][index])
+        columns = [[round(value, 2) for value in schedules[column][index, :n_rows].tolist()]
+                   for column in MONEY_FIELDS]
+        for payment, *values in zip(range(1, n_rows + 1), *columns):
+            lines.append(json.dumps({'loan': loan_id, 'Payment': payment,
+                                     **dict(zip(MONEY_FIELDS, values))}))
+    return ('\n'.join(lines) + '\n').encode() if lines else b''
+
+
+def _schedule_loans(payload):  # Validated loan tuples from a scalar or array request body
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object.")
+    fields = np.broadcast_arrays(*(np.atleast_1d(np.asarray(payload[name], dtype=float))
+                                   for name in ('principal', 'annual_rate', 'years')),
+                                 np.atleast_1d(np.asarray(payload.get('extra_payment', 0.0), dtype=float)))
+    loan_ids = payload.get('loan_id', list(range(fields[0].size)))
+    loan_ids = loan_ids if isinstance(loan_ids, list) else [loan_ids]
+    if fields[0].size == 0:
+        raise ValueError("No loans in the request.")
+    if len(loan_ids) != fields[0].size:
+        raise ValueError("loan_id must have one entry per loan.")
+    return list(zip(loan_ids, *(field.tolist() for field in fields)))
+
+
+def _pooled_call(instrument, func, *args):  # Worker side of _run: (result, error, events recorded by func)
+    enable() if instrument else disable()
+    events(clear=True)
+    try:
+        return func(*args), None, events(clear=True)
+    except Exception as error:
+        return None, error, events(clear=True)
+
+
+class CalculationService:  # asyncio HTTP/1.1 server with keep-alive and a process pool
+    def __init__(self, workers=None, inline_limit=INLINE_LIMIT):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.inline_limit = inline_limit
+        self.pool = None
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8000):
+        if self.workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.server = await asyncio.start_server(self._connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def _run(self, func, *args, pooled=False):  # Event loop for small work, pool for large
+        if self.pool is None or not pooled:
+            return func(*args)
+        result, error, recorded = await asyncio.get_running_loop().run_in_executor(
+            self.pool, _pooled_call, is_enabled(), func, *args)
+        merge_events(recorded)  # Worker timings reach /metrics too
+        if error is not None:
+            raise error
+        return result
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPError as error:
+                    await _respond(writer, error.status, {'error': str(error)}, keep_alive=False)
+                    break
+                method, path, body, keep_alive = request
+                try:
+                    await self._dispatch(writer, method, path, body, keep_alive)
+                except HTTPError as error:
+                    await _respond(writer, error.status, {'error': str(error)}, keep_alive)
+                except (KeyError, ValueError, TypeError) as error:
+                    message = f"Missing field {error}" if isinstance(error, KeyError) else str(error)
+                    await _respond(writer, 400, {'error': message}, keep_alive)
+                except ConnectionError:
+                    break
+                except Exception as error:  # Keep serving other requests
+                    await _respond(writer, 500, {'error': f"{type(error).__name__}: {error}"}, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer, method, path, body, keep_alive):
+        path = path.split('?', 1)[0].rstrip('/') or '/'
+        if path == '/health':
+            return await _respond(writer, 200, {'status': 'ok'}, keep_alive)
+        if path == '/metrics':
+            return await _respond(writer, 200, prometheus_text().encode(), keep_alive,
+                                  'text/plain; version=0.0.4')
+        if path != '/amortization/schedule' and path not in ENDPOINTS:
+            raise HTTPError(404, f"No endpoint {path}")
+        if method != 'POST':
+            raise HTTPError(405, f"{path} accepts POST")
+        try:
+            payload = json.loads(body or b'null')
+        except ValueError as error:
+            raise HTTPError(400, f"Invalid JSON: {error}") from error
+        if path == '/amortization/schedule':
+            return await self._stream_schedule(writer, payload, keep_alive)
+        pooled = path in POOLED or _batch_size(payload) > self.inline_limit
+        result = await self._run(evaluate, path, payload, pooled=pooled)
+        await _respond(writer, 200, result, keep_alive)
+
+    async def _stream_schedule(self, writer, payload, keep_alive):  # Chunked NDJSON, one loan chunk at a time
+        loans = _schedule_loans(payload)
+        pooled = 12 * sum(years for _, _, _, years, _ in loans) > self.inline_limit  # Schedule rows to compute
+        # Amortize the first chunk before committing to a 200, so bad inputs still get a 400
+        chunks = [loans[start:start + STREAM_LOANS] for start in range(0, len(loans), STREAM_LOANS)]
+        pending = asyncio.ensure_future(self._run(schedule_ndjson, chunks[0], pooled=pooled))
+        first = await pending
+        writer.write(_head(200, 'application/x-ndjson', keep_alive, chunked=True))
+        # The status line is gone: a later failure ends the stream with an error
+        # record instead of a second response
+        try:
+            for index in range(len(chunks)):
+                data = first if index == 0 else await pending
+                if index + 1 < len(chunks):  # Compute the next chunk while this one is sent
+                    pending = asyncio.ensure_future(self._run(schedule_ndjson, chunks[index + 1], pooled=pooled))
+                if data:
+                    writer.write(_chunk(data))
+                await writer.drain()
+        except ConnectionError:
+            pending.cancel()
+            raise
+        except Exception as error:
+            pending.cancel()
+            message = f"Missing field {error}" if isinstance(error, KeyError) else f"{type(error).__name__}: {error}"
+            writer.write(_chunk(json.dumps({'error': message}).encode() + b'\n'))
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+
+async def _read_request(reader):  # (method, path, body, keep_alive)
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.LimitOverrunError as error:
+        raise HTTPError(400, "Request headers are too large") from error
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, path, version = lines[0].split(' ', 2)
+        headers = dict((name.strip().lower(), value.strip())
+                       for name, value in (line.split(':', 1) for line in lines[1:] if line))
+    except ValueError as error:
+        raise HTTPError(400, "Malformed request") from error
+    if 'transfer-encoding' in headers:
+        raise HTTPError(411, "Send a Content-Length body")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError as error:
+        raise HTTPError(400, "Content-Length must be an integer") from error
+    if length < 0:
+        raise HTTPError(400, "Content-Length must not be negative")
+    if length > MAX_BODY:
+        raise HTTPError(413, f"Bodies are limited to {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b''
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return method, path, body, keep_alive
+
+
+def _head(status, content_type, keep_alive, length=None, chunked=False):
+    lines = [f"HTTP/1.1 {status} {STATUS[status]}", f"Content-Type: {content_type}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines.append("Transfer-Encoding: chunked" if chunked else f"Content-Length: {length}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def _chunk(data):  # One chunk of a chunked transfer-encoded body
+    return b'%x\r\n%b\r\n' % (len(data), data)
+
+
+async def _respond(writer, status, result, keep_alive, content_type='application/json'):
+    body = result if isinstance(result, bytes) else json.dumps(result).encode()
+    writer.write(_head(status, content_type, keep_alive, len(body)) + body)
+    await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8000, workers=None, inline_limit=INLINE_LIMIT):  # Runs until cancelled
+    service = CalculationService(workers, inline_limit)
+    server = await service.start(host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):  # python -m actuarial.service --port 8000 --workers 4
+    parser = argparse.ArgumentParser(description="JSON over HTTP for the actuarial calculators.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (0: compute on the loop)')
+    parser.add_argument('--inline-limit', type=int, default=INLINE_LIMIT)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.inline_limit))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
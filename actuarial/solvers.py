@@ -0,0 +1,176 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .accel import backend, jit
+from .kernels import accumulation_factor, accumulation_factor_derivative, growth_factor
+
+SolverResult = namedtuple('SolverResult', ['root', 'converged', 'iterations'])
+
+RATE_FLOOR = -1 + 1e-9  # Per-period rates must stay above -100%
+RATE_CEILING = 1e6
+
+
+def newton_bisect(func, lo, hi, guess=None, xtol=1e-12, max_iter=100):  # Vectorized safeguarded Newton
+    # func(x, idx) returns (f, df) for the problems selected by the index array idx.
+    # Every element keeps its own bracket [lo, hi]; a Newton step that leaves the
+    # bracket, or is not at most half the previous step (Newton creeping down a
+    # steep exponential), is replaced by bisection. Converged elements drop out
+    # of later passes.
+    lo, hi = np.broadcast_arrays(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float))
+    shape = lo.shape
+    lo, hi = lo.ravel().copy(), hi.ravel().copy()
+    everything = np.arange(lo.size)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        f_lo, _ = func(lo, everything)
+        f_hi, _ = func(hi, everything)
+    bracketed = np.sign(f_lo) * np.sign(f_hi) <= 0
+    if guess is None:
+        x = (lo + hi) / 2
+    else:
+        x = np.clip(np.broadcast_to(np.asarray(guess, dtype=float), lo.shape).ravel(), lo, hi)
+
+    converged = np.zeros(lo.size, dtype=bool)
+    iterations = np.zeros(lo.size, dtype=np.int64)
+    last_step = hi - lo
+    idx = np.flatnonzero(bracketed)
+    compiled = backend() != 'numpy'
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iter):
+            if idx.size == 0:
+                break
+            xi = x[idx]
+            f, df = func(xi, idx)
+            iterations[idx] += 1
+            if compiled:
+                done = np.empty(idx.size, dtype=bool)
+                _newton_pass(idx, f, df, x, lo, hi, f_lo, last_step, float(xtol), done)
+                converged[idx] = done
+                idx = idx[~done]
+                continue
+            a, b = lo[idx], hi[idx]
+            on_lo_side = np.sign(f) == np.sign(f_lo[idx])
+            a = np.where(on_lo_side, xi, a)
+            b = np.where(on_lo_side, b, xi)
+            step = xi - f / df
+            tol = xtol * (1 + np.abs(xi))
+            settled = np.isfinite(step) & (np.abs(step - xi) <= tol)
+            use_newton = settled | (np.isfinite(step) & (step > a) & (step < b) &
+                                    (2 * np.abs(step - xi) <= last_step[idx]))
+            done = (f == 0) | settled | (b - a <= tol)
+            x[idx] = np.where(f == 0, xi, np.where(use_newton, step, (a + b) / 2))
+            last_step[idx] = np.abs(x[idx] - xi)
+            lo[idx], hi[idx] = a, b
+            converged[idx] = done
+            idx = idx[~done]
+
+    root = np.where(bracketed, x, np.nan)
+    return SolverResult(root.reshape(shape), converged.reshape(shape), iterations.reshape(shape))
+
+
+@jit
+def _newton_pass(idx, f, df, x, lo, hi, f_lo, last_step, xtol, done):  # One newton_bisect pass over idx, in place
+    # f, df hold func at x[idx]; same operations as the NumPy loop body.
+    for j in range(idx.size):
+        i = idx[j]
+        xi, fj = x[i], f[j]
+        if (fj > 0 and f_lo[i] > 0) or (fj < 0 and f_lo[i] < 0) or (fj == 0 and f_lo[i] == 0):  # Same np.sign
+            lo[i] = xi
+        else:
+            hi[i] = xi
+        step = xi - fj / df[j]
+        tol = xtol * (1 + abs(xi))
+        finite = step - step == 0  # np.isfinite
+        settled = finite and abs(step - xi) <= tol
+        use_newton = settled or (finite and step > lo[i] and step < hi[i] and 2 * abs(step - xi) <= last_step[i])
+        done[j] = fj == 0 or settled or hi[i] - lo[i] <= tol
+        if fj != 0:
+            x[i] = step if use_newton else (lo[i] + hi[i]) / 2
+        last_step[i] = abs(x[i] - xi)
+
+
+def _annuity_factors(x, n):  # (1+x)^n, s_n(x) and ds_n/dx from the shared zero-rate-safe kernels
+    return growth_factor(x, n), accumulation_factor(x, n), accumulation_factor_derivative(x, n)
+
+
+def _expand_ceiling(func, lo, hi):  # Double the upper bracket until the sign flips
+    everything = np.arange(lo.size)
+    f_lo, _ = func(lo, everything)
+    f_hi, _ = func(hi, everything)
+    grow = np.sign(f_hi) == np.sign(f_lo)
+    while grow.any():
+        hi = np.where(grow, hi * 2, hi)
+        f_hi, _ = func(hi, everything)
+        grow = (np.sign(f_hi) == np.sign(f_lo)) & (hi < RATE_CEILING)
+    return hi
+
+
+def solve_tvm_rate(PV, FV, PMT, n_periods, payment_at_beginning=False, xtol=1e-12, max_iter=100):  # Periodic rate
+    # Solves PV (1+x)^n + PMT s_n(x) [(1+x) if due] = FV for x, elementwise.
+    arrays = np.broadcast_arrays(
+        np.asarray(PV, dtype=float), np.asarray(FV, dtype=float), np.asarray(PMT, dtype=float),
+        np.asarray(n_periods, dtype=float), np.asarray(payment_at_beginning, dtype=bool))
+    shape = arrays[0].shape
+    PV, FV, PMT, n_periods, payment_at_beginning = (a.ravel() for a in arrays)
+
+    def func(x, idx):
+        n, pmt, due = n_periods[idx], PMT[idx], payment_at_beginning[idx]
+        growth, s, ds = _annuity_factors(x, n)
+        f = PV[idx] * growth + pmt * s * np.where(due, 1 + x, 1.0) - FV[idx]
+        df = PV[idx] * n * growth / (1 + x) + pmt * np.where(due, ds * (1 + x) + s, ds)
+        return f, df
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        guess = (FV / (PV + PMT * n_periods)) ** (1 / n_periods) - 1
+        lo = np.full(PV.shape, RATE_FLOOR)
+        hi = _expand_ceiling(func, lo, np.ones(PV.shape))
+    result = newton_bisect(func, lo, hi, np.where(np.isfinite(guess), guess, 0.0), xtol, max_iter)
+    return SolverResult(*(a.reshape(shape) for a in result))
+
+
+def bond_ytm(price, face_value, coupon_rate, years, frequency=2, xtol=1e-12, max_iter=100):  # Annual YTM from price
+    arrays = np.broadcast_arrays(
+        np.asarray(price, dtype=float), np.asarray(face_value, dtype=float),
+        np.asarray(coupon_rate, dtype=float), np.asarray(years, dtype=float), np.asarray(frequency, dtype=float))
+    shape = arrays[0].shape
+    price, face_value, coupon_rate, years, frequency = (a.ravel() for a in arrays)
+    periods = np.rint(years * frequency)
+    coupon_payment = face_value * coupon_rate / frequency
+
+    def func(y, idx):
+        n, coupon, face = periods[idx], coupon_payment[idx], face_value[idx]
+        growth, s, ds = _annuity_factors(y, n)
+        # Annuity-immediate a_n = s_n / (1+y)^n; differentiate the quotient
+        annuity = s / growth
+        d_annuity = ds / growth - n * annuity / (1 + y)
+        f = coupon * annuity + face / growth - price[idx]
+        df = coupon * d_annuity - face * n / (growth * (1 + y))
+        return f, df
+
+    guess = (coupon_payment + (face_value - price) / periods) / ((face_value + price) / 2)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        lo = np.full(price.shape, RATE_FLOOR)
+        hi = _expand_ceiling(func, lo, np.ones(price.shape))
+    result = newton_bisect(func, lo, hi, guess, xtol, max_iter)
+    return SolverResult((result.root * frequency).reshape(shape), result.converged.reshape(shape),
+                        result.iterations.reshape(shape))
+
+
+def solve_tvm_periods(PV, FV, PMT, period_rate, payment_at_beginning=False, raise_on_unreachable=True):  # Periods n
+    # PV (1+i)^n + K ((1+i)^n - 1) = FV with K = PMT [(1+i) if due] / i gives
+    # n = log((FV + K) / (PV + K)) / log(1+i); at i = 0 it is (FV - PV) / PMT.
+    # FV == PV needs no periods; at i = 0 with no payments any other FV is unreachable.
+    PV, FV, PMT, period_rate, payment_at_beginning = np.broadcast_arrays(
+        np.asarray(PV, dtype=float), np.asarray(FV, dtype=float), np.asarray(PMT, dtype=float),
+        np.asarray(period_rate, dtype=float), np.asarray(payment_at_beginning, dtype=bool))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        K = PMT * np.where(payment_at_beginning, 1 + period_rate, 1.0) / period_rate
+        n = np.log((FV + K) / (PV + K)) / np.log1p(period_rate)
+        level = np.divide(FV - PV, PMT, out=np.full(n.shape, np.inf), where=PMT != 0)
+        n = np.where(FV == PV, 0.0, np.where(period_rate == 0, level, n))
+    unreachable = ~np.isfinite(n) | (n < 0) | (period_rate <= -1)
+    if raise_on_unreachable and unreachable.any():
+        count = int(unreachable.sum())
+        raise ValueError(f"Target future value is unreachable for {count} of {n.size} input(s): "
+                         "it is below the starting value or the balance never grows toward it.")
+    return np.where(unreachable, np.nan, n)
@@ -0,0 +1,35 @@
+import numpy as np
+
+from .curves import YieldCurve
+from .kernels import accumulation_factor, annuity_factor, growth_factor
+
+
+def _curve_annuity(curve, n, m, PMT, payment_at_beginning):  # PV of n*m level payments discounted on the curve
+    return np.asarray(PMT, dtype=float) * curve.annuity_factor(np.asarray(n, dtype=float) * m, m,
+                                                               due=payment_at_beginning)
+
+
+def future_value(PV, r, n, m, PMT=0.0, payment_at_beginning=False):  # FV of a lump sum plus level payments
+    if isinstance(r, YieldCurve):  # r may be a YieldCurve; m then only sets the payment frequency
+        growth = 1 / r.discount(n)
+        return (np.asarray(PV, dtype=float) + _curve_annuity(r, n, m, PMT, payment_at_beginning)) * growth
+    PV, r, n, m, PMT = (np.asarray(a, dtype=float) for a in (PV, r, n, m, PMT))
+    growth = growth_factor(r/m, n*m)
+    annuity = PMT * accumulation_factor(r/m, n*m) * np.where(payment_at_beginning, 1 + r/m, 1.0)
+    return PV * growth + annuity
+
+
+def present_value(FV, r, n, m, PMT=0.0, payment_at_beginning=False):  # PV of a lump sum less level payments
+    if isinstance(r, YieldCurve):
+        return np.asarray(FV, dtype=float) * r.discount(n) - _curve_annuity(r, n, m, PMT, payment_at_beginning)
+    FV, r, n, m, PMT = (np.asarray(a, dtype=float) for a in (FV, r, n, m, PMT))
+    growth = growth_factor(r/m, n*m)
+    annuity = PMT * annuity_factor(r/m, n*m) * np.where(payment_at_beginning, 1 + r/m, 1.0)
+    return FV / growth - annuity
+
+
+def tvm_growth_series(value, r, n, m, calc_type, PMT=0.0, payment_at_beginning=False):  # Value at each whole year
+    years = np.arange(int(n) + 1)
+    if calc_type == "FV":
+        return years, future_value(value, r, years, m, PMT, payment_at_beginning)
+    return years, present_value(value, r, years, m, PMT, payment_at_beginning)
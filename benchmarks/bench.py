@@ -0,0 +1,268 @@
+"""Throughput benchmarks for the calculator hot paths.
+
+    python benchmarks/bench.py --save results.json
+    python benchmarks/bench.py --compare results.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from actuarial import (accel, amortization, annuities, bonds, cashflows, curves, pool, retirement,  # noqa: E402
+                       scenarios, sensitivity, solvers, tvm)
+
+SIZES = (1, 1_000, 100_000, 1_000_000)
+SEED = 20240101
+BENCHMARKS = {}
+
+
+def benchmark(name, max_size=None):  # Register setup(size, rng) -> zero-argument callable
+    def register(setup):
+        BENCHMARKS[name] = (setup, max_size)
+        return setup
+    return register
+
+
+def _rates(rng, size, low=0.01, high=0.10):
+    return rng.uniform(low, high, size)
+
+
+@benchmark('tvm.future_value')
+def _(size, rng):
+    PV, r = rng.uniform(100, 1e5, size), _rates(rng, size)
+    return lambda: tvm.future_value(PV, r, 10, 12, 100.0, False)
+
+
+@benchmark('tvm.present_value')
+def _(size, rng):
+    FV, r = rng.uniform(100, 1e5, size), _rates(rng, size)
+    return lambda: tvm.present_value(FV, r, 10, 12, 100.0, True)
+
+
+@benchmark('tvm.solve_rate')
+def _(size, rng):
+    PV, PMT, r = rng.uniform(100, 1e4, size), rng.uniform(0, 500, size), _rates(rng, size, 0.0005, 0.01)
+    FV = tvm.future_value(PV, r * 12, 10, 12, PMT, False)
+    return lambda: solvers.solve_tvm_rate(PV, FV, PMT, 120)
+
+
+@benchmark('tvm.solve_periods')
+def _(size, rng):
+    PV, PMT, r = rng.uniform(100, 1e4, size), rng.uniform(1, 500, size), _rates(rng, size, 0.0005, 0.01)
+    return lambda: solvers.solve_tvm_periods(PV, PV * 5 + PMT * 100, PMT, r)
+
+
+def _cash_flows(size, rng):  # One irregular stream of `size` dated flows
+    dates = np.datetime64('2025-01-01') + np.sort(rng.integers(0, 30 * 365, size))
+    amounts = rng.uniform(100, 5000, size)
+    amounts[0] = -amounts[1:].sum() * 0.6
+    return cashflows.CashFlows(dates, amounts, convention='ACT/ACT')
+
+
+@benchmark('cashflows.xnpv')
+def _(size, rng):
+    flows = _cash_flows(size, rng)
+    return lambda: flows.npv(0.05, 'continuous')
+
+
+@benchmark('cashflows.xirr')
+def _(size, rng):
+    flows = _cash_flows(size, rng)
+    return lambda: flows.irr()
+
+
+for _annuity_type in ("Annuity Immediate", "Annuity Due", "Growing Annuity", "Deferred Annuity"):
+    def _annuity_setup(size, rng, annuity_type=_annuity_type):
+        PMT, r = rng.uniform(100, 5000, size), _rates(rng, size)
+        return lambda: annuities.annuity_value(annuity_type, "PV", PMT, r, 30, 0.02, 5)
+    benchmark(f'annuity.{_annuity_type.lower().replace(" ", "_")}')(_annuity_setup)
+
+
+@benchmark('bond.price_and_duration')
+def _(size, rng):
+    coupon, years, ytm = _rates(rng, size, 0, 0.08), rng.integers(1, 31, size), _rates(rng, size)
+    return lambda: bonds.price_bonds(1000.0, coupon, years, ytm, 2)
+
+
+@benchmark('bond.price_on_curve')
+def _(size, rng):
+    coupon, years = _rates(rng, size, 0, 0.08), rng.integers(1, 31, size)
+    tenors, par = [0.5, 1, 2, 3, 5, 7, 10, 20, 30], _rates(rng, 9)
+    return lambda: bonds.price_bonds(1000.0, coupon, years, curves.YieldCurve.from_par_yields(tenors, par), 2)
+
+
+@benchmark('bond.ytm')
+def _(size, rng):
+    coupon, years, ytm = _rates(rng, size, 0, 0.08), rng.integers(1, 31, size), _rates(rng, size)
+    price = bonds.price_bonds(1000.0, coupon, years, ytm, 2)['price']
+    return lambda: solvers.bond_ytm(price, 1000.0, coupon, years, 2)
+
+
+@benchmark('amortization.schedule', max_size=1_000)
+def _(size, rng):
+    loans = [amortization.LoanModel(p, r, 30) for p, r in zip(rng.uniform(5e4, 5e5, size), _rates(rng, size))]
+    return lambda: [amortization.generate_amortization_schedule(
+        loan.principal, loan.monthly_rate, loan.n_payments, loan.monthly_payment) for loan in loans]
+
+
+@benchmark('amortization.columnar_schedule', max_size=1_000)
+def _(size, rng):
+    loans = [(p, r) for p, r in zip(rng.uniform(5e4, 5e5, size), _rates(rng, size))]
+    return lambda: [amortization.LoanModel(p, r, 30).schedule for p, r in loans]
+
+
+@benchmark('amortization.events', max_size=100_000)
+def _(size, rng):
+    months, amounts = rng.integers(1, 360, size), rng.uniform(1, 100, size)
+    def run():
+        schedule = amortization.LoanSchedule(300_000.0, 0.05, 30)
+        for month, amount in zip(np.sort(months).tolist(), amounts.tolist()):
+            schedule.prepay(month, amount)
+        return schedule.payoff_month
+    return run
+
+
+@benchmark('pool.psa_sweep', max_size=100_000)
+def _(size, rng):  # `size` loans across 20 PSA speeds
+    balances, rates = rng.uniform(5e4, 5e5, size), _rates(rng, size, 0.02, 0.08)
+    terms, ages = rng.integers(240, 361, size), rng.integers(0, 120, size)
+    return lambda: pool.pool_cash_flows(balances, rates, terms, np.linspace(50, 500, 20), 'PSA', ages)
+
+
+@benchmark('amortization.schedule_with_extra', max_size=1_000)
+def _(size, rng):
+    loans = [amortization.LoanModel(p, r, 30, e) for p, r, e in
+             zip(rng.uniform(5e4, 5e5, size), _rates(rng, size), rng.uniform(50, 500, size))]
+    return lambda: [amortization.generate_amortization_schedule_with_extra(
+        loan.principal, loan.monthly_rate, loan.n_payments, loan.monthly_payment, loan.extra_payment)
+        for loan in loans]
+
+
+@benchmark('amortization.portfolio', max_size=100_000)
+def _(size, rng):
+    principals, rates, extra = rng.uniform(5e4, 5e5, size), _rates(rng, size), rng.uniform(0, 500, size)
+    return lambda: amortization.amortize_portfolio(principals, rates, 30, extra)
+
+
+@benchmark('retirement.projection')
+def _(size, rng):
+    savings, contribution, returns = rng.uniform(0, 1e5, size), rng.uniform(0, 2000, size), _rates(rng, size)
+    return lambda: retirement.retirement_funds(savings, contribution, returns, 35)
+
+
+@benchmark('retirement.balance_series', max_size=100_000)
+def _(size, rng):
+    returns = _rates(rng, size)
+    return lambda: [retirement.retirement_balance_series(30, 65, 10_000.0, 500.0, r) for r in returns]
+
+
+@benchmark('retirement.monte_carlo', max_size=100_000)
+def _(size, rng):  # `size` paths from age 30 to 95, retiring at 65
+    seed = int(rng.integers(2 ** 32))
+    return lambda: retirement.simulate_retirement(30, 65, 10_000.0, 500.0, 0.07, n_paths=size, seed=seed)
+
+
+@benchmark('retirement.scenarios', max_size=100_000)
+def _(size, rng):  # `size` scenarios, 40 years monthly, returns on a 0.5% grid
+    table = {'current_age': 25, 'retirement_age': rng.integers(55, 66, size), 'current_savings': 10_000.0,
+             'monthly_contribution': rng.uniform(100, 2000, size),
+             'annual_return': rng.integers(4, 21, size) / 200, 'withdrawal_rate': 0.04}
+    return lambda: scenarios.project_retirement(table, end_age=65, monthly=True)
+
+
+@benchmark('sensitivity.grid')
+def _(size, rng):
+    # size grid points over rate x growth
+    side = max(1, int(round(size ** 0.5)))
+    shocks = {'r': np.linspace(-0.03, 0.03, side), 'g': np.linspace(-0.02, 0.02, side)}
+    return lambda: sensitivity.sensitivity_grid(
+        lambda r, g: annuities.growing_annuity(1000.0, r, g, 30), {'r': 0.06, 'g': 0.03}, shocks)
+
+
+def run(names, sizes, repeats, budget):  # Time each benchmark at each size
+    results = []
+    for name in names:
+        setup, max_size = BENCHMARKS[name]
+        for size in sizes:
+            if max_size is not None and size > max_size:
+                continue
+            func = setup(size, np.random.default_rng(SEED))
+            func()  # Warm-up
+            timings = []
+            started = time.perf_counter()
+            while len(timings) < repeats and (not timings or time.perf_counter() - started < budget):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+            median = statistics.median(timings)
+            results.append({'name': name, 'size': size, 'repeats': len(timings),
+                            'seconds_min': min(timings), 'seconds_median': median,
+                            'items_per_second': size / median if median > 0 else None})
+            print(f"{name:40s} {size:>9,d} {median * 1e3:12.3f} ms", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):  # Regressions slower than baseline by more than threshold
+    previous = {(entry['name'], entry['size']): entry for entry in baseline['results']}
+    regressions = []
+    for entry in results:
+        old = previous.get((entry['name'], entry['size']))
+        if old is None:
+            continue
+        ratio = entry['seconds_median'] / old['seconds_median']
+        entry['baseline_seconds_median'] = old['seconds_median']
+        entry['ratio'] = ratio
+        if ratio > 1 + threshold:
+            regressions.append(entry)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', default='', help='Only run benchmarks whose name contains this text')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=2.0, help='Seconds per benchmark/size before stopping early')
+    parser.add_argument('--save', help='Write results JSON to this path')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown before failing (0.2 = 20%%)')
+    parser.add_argument('--backend', choices=accel.BACKENDS, help='Loop backend (default: detected)')
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    backend = args.backend or accel.backend()
+    with accel.use_backend(backend):
+        results = run(names, args.sizes, args.repeats, args.budget)
+    report = {
+        'metadata': {'python': platform.python_version(), 'numpy': np.__version__, 'backend': backend,
+                     'platform': platform.platform(), 'processor': platform.processor(),
+                     'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'seed': SEED},
+        'results': results,
+    }
+    regressions = []
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(report['results'], json.load(handle), args.threshold)
+        report['regressions'] = [(entry['name'], entry['size'], entry['ratio']) for entry in regressions]
+
+    output = json.dumps(report, indent=2)
+    if args.save:
+        with open(args.save, 'w') as handle:
+            handle.write(output)
+    else:
+        print(output)
+    for entry in regressions:
+        print(f"REGRESSION {entry['name']} size={entry['size']}: {entry['ratio']:.2f}x baseline",
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
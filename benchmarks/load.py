@@ -0,0 +1,118 @@
+"""Load test for the calculation service: throughput and latency percentiles.
+
+    python -m actuarial.service --port 8000 &
+    python benchmarks/load.py --port 8000 --endpoint /bond --connections 32 --duration 10
+    python benchmarks/load.py --spawn --p99-ms 50  # starts a local service, exits 1 if p99 is over target
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BODIES = {  # One representative request per endpoint
+    '/tvm': {'calc': 'FV', 'PV': 1000, 'r': 0.05, 'n': 10, 'm': 12, 'PMT': 100},
+    '/annuity': {'annuity_type': 'Growing Annuity', 'calc': 'PV', 'PMT': 100, 'r': 0.05, 'n': 20, 'g': 0.02},
+    '/bond': {'face_value': 1000, 'coupon_rate': 0.05, 'years': 10, 'ytm': 0.04, 'frequency': 2},
+    '/loan': {'principal': 300000, 'annual_rate': 0.065, 'years': 30, 'extra_payment': 100},
+    '/retirement': {'current_savings': 10000, 'monthly_contribution': 500, 'annual_return': 0.07, 'years': 30},
+}
+
+
+def _request(host, endpoint, body):
+    payload = json.dumps(body).encode()
+    return (f"POST {endpoint} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n").encode() + payload
+
+
+async def _client(host, port, request, deadline, latencies, errors):  # One keep-alive connection
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = int(head.lower().split(b'content-length:')[1].split(b'\r\n')[0])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b'HTTP/1.1 200'):
+                errors.append(head.split(b'\r\n')[0].decode())
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, endpoint, body, connections, duration):
+    request = _request(host, endpoint, body)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, request, deadline, latencies, errors) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    return {
+        'endpoint': endpoint,
+        'connections': connections,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(ms, 50)) if ms.size else None,
+        'p90_ms': float(np.percentile(ms, 90)) if ms.size else None,
+        'p99_ms': float(np.percentile(ms, 99)) if ms.size else None,
+        'max_ms': float(ms.max()) if ms.size else None,
+    }
+
+
+def _spawn(port, workers):  # Start a local service and wait until it answers
+    process = subprocess.Popen([sys.executable, '-m', 'actuarial.service', '--port', str(port),
+                                '--workers', str(workers)], cwd=ROOT)
+    for _ in range(100):
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Service did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--endpoint', action='append', choices=sorted(BODIES),
+                        help='Endpoint to load (repeatable; default: all)')
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per endpoint')
+    parser.add_argument('--spawn', action='store_true', help='Start a local service for the run')
+    parser.add_argument('--workers', type=int, default=1, help='Service workers when spawning')
+    parser.add_argument('--p99-ms', type=float, help='Exit non-zero if any endpoint p99 exceeds this')
+    args = parser.parse_args(argv)
+
+    process = _spawn(args.port, args.workers) if args.spawn else None
+    try:
+        results = [asyncio.run(run_load(args.host, args.port, endpoint, BODIES[endpoint], args.connections,
+                                        args.duration))
+                   for endpoint in args.endpoint or sorted(BODIES)]
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print(json.dumps({'results': results}, indent=2))
+    for result in results:
+        print(f"{result['endpoint']:<14} {result['requests_per_second']:>10,.0f} req/s  "
+              f"p50 {result['p50_ms']:.2f} ms  p99 {result['p99_ms']:.2f} ms  errors {result['errors']}",
+              file=sys.stderr)
+    if args.p99_ms is not None and any(result['p99_ms'] > args.p99_ms or result['errors'] for result in results):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
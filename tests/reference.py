@@ -0,0 +1,70 @@
+# The per-loan and per-bond formulas of the original single-file app, copied
+# verbatim; the batch engines are checked against them.
+
+
+def monthly_payment(principal, monthly_rate, n_payments):
+    return principal * \
+        (monthly_rate * (1 + monthly_rate) ** n_payments) / \
+        ((1 + monthly_rate) ** n_payments - 1)
+
+
+def generate_amortization_schedule(principal, monthly_rate, n_payments, monthly_payment):
+    schedule = []
+    balance = principal
+    for payment_num in range(1, n_payments + 1):
+        interest = balance * monthly_rate
+        principal_payment = monthly_payment - interest
+        ending_balance = balance - principal_payment
+        schedule.append({
+            'Payment': payment_num,
+            'Beginning Balance': round(balance, 2),
+            'Monthly Payment': round(monthly_payment, 2),
+            'Interest': round(interest, 2),
+            'Principal': round(principal_payment, 2),
+            'Ending Balance': round(ending_balance, 2)
+        })
+        balance = ending_balance
+    return schedule
+
+
+def generate_amortization_schedule_with_extra(principal, monthly_rate, n_payments, monthly_payment, extra_payment):
+    schedule, balance, total_payment, payment_num = [
+    ], principal, monthly_payment + extra_payment, 0
+
+    while balance > 0 and payment_num < 1000:
+        payment_num += 1
+        interest_payment = balance * monthly_rate
+        principal_payment = min(total_payment - interest_payment, balance)
+        balance -= principal_payment
+
+        # Adjusted last PMT
+        if balance < 0.01:
+            principal_payment += balance
+            total_payment = interest_payment + principal_payment
+            balance = 0
+
+        schedule.append({
+            'Payment': payment_num,
+            'Beginning Balance': round(balance + principal_payment, 2),
+            'Monthly Payment': round(total_payment, 2),
+            'Interest': round(interest_payment, 2),
+            'Principal': round(principal_payment, 2),
+            'Ending Balance': round(balance, 2)
+        })
+
+    return schedule
+
+
+def bond_pricing(face_value, coupon_rate, years, ytm, frequency):  # (price, pv_coupons, pv_face, macaulay, modified)
+    coupon_payment = (face_value * coupon_rate) / frequency
+    periods = years * frequency
+    period_rate = ytm / frequency
+    pv_coupons = coupon_payment * \
+        ((1 - (1 + period_rate) ** -periods) / period_rate)
+    pv_face = face_value / (1 + period_rate) ** periods
+    bond_price = pv_coupons + pv_face
+
+    macaulay_duration = sum((t / frequency) * (coupon_payment if t < periods else coupon_payment +
+                            face_value) / (1 + period_rate) ** t for t in range(1, periods + 1)) / bond_price
+    modified_duration = macaulay_duration / (1 + ytm / frequency)
+    return bond_price, pv_coupons, pv_face, macaulay_duration, modified_duration
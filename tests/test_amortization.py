@@ -0,0 +1,178 @@
+import numpy as np
+import pytest
+
+import reference
+from actuarial.accel import use_backend
+from actuarial.amortization import (PAYOFF_THRESHOLD, LoanModel, LoanSchedule, _raw_balances, amortize_portfolio,
+                                    generate_amortization_schedule, generate_amortization_schedule_with_extra,
+                                    level_payment, loan_summaries, payoff_months, schedule_rows)
+from actuarial.schedule import SCHEDULE_FIELDS
+
+
+def _loans(seed, n_loans):  # Loans like the app's inputs: cents, basis points, common terms, half with extra
+    rng = np.random.default_rng(seed)
+    principals = rng.uniform(5e4, 1e6, n_loans).round(2)
+    annual_rates = rng.uniform(0.01, 0.1, n_loans).round(4)
+    years = rng.choice([1, 10, 15, 20, 30], n_loans)
+    extra_payments = np.where(rng.random(n_loans) < 0.5, 0.0, rng.uniform(1, 2000, n_loans).round(2))
+    return principals, annual_rates, years, extra_payments
+
+
+def _baseline_rows(principal, annual_rate, years, extra_payment):
+    monthly_rate, n_payments = annual_rate / 12, int(years) * 12
+    payment = reference.monthly_payment(principal, monthly_rate, n_payments)
+    if extra_payment > 0:
+        return reference.generate_amortization_schedule_with_extra(principal, monthly_rate, n_payments, payment,
+                                                                   extra_payment)
+    return reference.generate_amortization_schedule(principal, monthly_rate, n_payments, payment)
+
+
+def test_amortize_portfolio_matches_baseline_rows():
+    loans = _loans(1, 400)
+    schedules = amortize_portfolio(*loans)
+    for loan, (principal, annual_rate, years, extra_payment) in enumerate(zip(*loans)):
+        assert schedule_rows(schedules, loan) == _baseline_rows(principal, annual_rate, years, extra_payment)
+
+
+def test_generate_functions_match_baseline():
+    for principal, annual_rate, years, extra_payment in zip(*_loans(2, 50)):
+        monthly_rate, n_payments = annual_rate / 12, int(years) * 12
+        payment = reference.monthly_payment(principal, monthly_rate, n_payments)
+        assert generate_amortization_schedule(principal, monthly_rate, n_payments, payment) == \
+            reference.generate_amortization_schedule(principal, monthly_rate, n_payments, payment)
+        extra_payment += 1
+        assert generate_amortization_schedule_with_extra(principal, monthly_rate, n_payments, payment, extra_payment) \
+            == reference.generate_amortization_schedule_with_extra(principal, monthly_rate, n_payments, payment,
+                                                                   extra_payment)
+
+
+def test_level_payment_matches_baseline():
+    principals, annual_rates, years, _ = _loans(3, 200)
+    expected = [reference.monthly_payment(p, r / 12, int(y) * 12) for p, r, y in zip(principals, annual_rates, years)]
+    np.testing.assert_allclose(level_payment(principals, annual_rates / 12, years * 12), expected, rtol=1e-12)
+
+
+def test_loan_model_matches_schedule():
+    for principal, annual_rate, years, extra_payment in zip(*_loans(4, 60)):
+        model = LoanModel(principal, annual_rate, years, extra_payment)
+        schedule = model.schedule
+        assert model.payoff_month == len(schedule)
+        paid = np.cumsum(schedule['Monthly Payment'])
+        for k in (1, len(schedule) // 2, len(schedule) - 1, len(schedule)):
+            assert model.balance(k) == pytest.approx(schedule['Ending Balance'][k - 1], abs=1e-6)
+            assert model.payments_to_date(k) == pytest.approx(paid[k - 1], rel=1e-10)
+        assert model.total_interest == pytest.approx(schedule['Interest'].sum(), rel=1e-9)
+
+
+def test_schedule_kernel_matches_step_generators():  # The uncompiled _schedule_loop against the NumPy path
+    for loan in zip(*_loans(6, 40)):
+        with use_backend('numpy'):
+            expected = LoanModel(*loan).schedule
+        with use_backend('python'):
+            actual = LoanModel(*loan).schedule
+        for field in expected:
+            assert actual[field].tobytes() == expected[field].tobytes(), field
+
+
+def test_loan_summaries_match_loan_model():
+    loans = _loans(5, 300)
+    summaries = loan_summaries(*loans)
+    for loan, args in enumerate(zip(*loans)):
+        model = LoanModel(*args)
+        assert summaries['payoff_month'][loan] == model.payoff_month
+        assert summaries['total_payments'][loan] == pytest.approx(model.total_payments, rel=1e-12)
+
+
+def _replay(principal, annual_rate, years, extra_payment, events):  # Month-by-month from scratch: (endings, total)
+    n_payments, rate, balance = years * 12, annual_rate / 12, principal
+    payment = float(level_payment(principal, rate, n_payments))
+    endings, total, month = [], 0.0, 0
+    while balance > 0:
+        month += 1
+        lump = 0.0
+        for event_month, kind, value, option in events:
+            if event_month != month:
+                continue
+            remaining = max(n_payments - month + 1, 1)
+            if kind == 'prepayment':
+                lump += min(value, balance)
+                balance -= min(value, balance)
+                payment = float(level_payment(balance, rate, remaining)) if option else payment
+            elif kind == 'rate':
+                rate = value / 12
+                payment = float(level_payment(balance, rate, remaining)) if option else payment
+            elif kind == 'payment':
+                payment = value
+            else:
+                extra_payment = value
+        interest = balance * rate
+        principal_payment = min(payment + extra_payment - interest, balance)
+        balance -= principal_payment
+        if balance < 0.01:
+            principal_payment += balance
+            balance = 0.0
+        total += lump + interest + principal_payment
+        endings.append(balance)
+    return endings, total
+
+
+def test_loan_schedule_without_events_matches_loan_model():
+    for principal, annual_rate, years, extra_payment in zip(*_loans(6, 40)):
+        schedule = LoanSchedule(principal, annual_rate, years, extra_payment)
+        model = LoanModel(principal, annual_rate, years, extra_payment)
+        assert schedule.payoff_month == model.payoff_month
+        assert schedule.total_payments == pytest.approx(model.total_payments, rel=1e-9)
+        rows, expected = schedule.rows(), model.schedule.rows()
+        assert len(rows) == len(expected)
+        for row, other in zip(rows, expected):
+            assert all(abs(row[field] - other[field]) <= 0.011 for field in SCHEDULE_FIELDS)
+
+
+def test_loan_schedule_events_match_replay():
+    rng = np.random.default_rng(7)
+    for _ in range(150):
+        principal, annual_rate = float(rng.uniform(1e4, 5e5)), float(rng.uniform(0.01, 0.1))
+        years, extra_payment = int(rng.integers(5, 31)), float(rng.choice([0, 100]))
+        schedule, events = LoanSchedule(principal, annual_rate, years, extra_payment), []
+        for _ in range(int(rng.integers(1, 6))):
+            month, kind = int(rng.integers(1, years * 12)), str(rng.choice(['prepayment', 'rate', 'payment', 'extra']))
+            option = bool(rng.integers(2)) if kind in ('prepayment', 'rate') else None
+            value = {'prepayment': rng.uniform(0, principal / 3), 'rate': rng.uniform(0.01, 0.1),
+                     'payment': schedule.columns()['Monthly Payment'][0] * rng.uniform(0.9, 1.5),
+                     'extra': rng.uniform(0, 300)}[kind]
+            schedule.rows()  # Materialize a prefix, so events land on cached rows
+            add = {'prepayment': schedule.prepay, 'rate': schedule.reset_rate,
+                   'payment': schedule.change_payment, 'extra': schedule.change_extra}[kind]
+            try:
+                add(month, float(value), *([] if option is None else [option]))
+            except ValueError:
+                continue  # Rejected (the loan would never pay off) and rolled back
+            events.append((month, kind, float(value), option))
+        endings, total = _replay(principal, annual_rate, years, extra_payment, sorted(events, key=lambda e: e[0]))
+        columns = schedule.columns()
+        assert schedule.payoff_month == len(endings) == len(columns)
+        np.testing.assert_allclose(columns['Ending Balance'], endings, atol=1e-6)
+        assert schedule.total_payments == pytest.approx(total, rel=1e-9)
+        for k in (1, len(endings) // 2, len(endings)):
+            assert schedule.balance(k) == pytest.approx(endings[k - 1], abs=1e-5)
+
+
+def test_loan_schedule_rejects_events_after_payoff():
+    schedule = LoanSchedule(100_000.0, 0.06, 10, 500.0)
+    payoff = schedule.payoff_month
+    for add, value in ((schedule.prepay, 1_000.0), (schedule.reset_rate, 0.05), (schedule.change_payment, 2_000.0),
+                       (schedule.change_extra, 0.0)):
+        with pytest.raises(ValueError, match=f"paid off with payment {payoff}"):
+            add(payoff + 1, value)
+    assert schedule.events == [] and schedule.payoff_month == payoff
+    schedule.prepay(payoff, 10.0)  # The payoff month itself still takes events
+    assert len(schedule.events) == 1 and schedule.payoff_month == payoff
+
+
+def test_payoff_months_agree_with_balances():
+    rng = np.random.default_rng(11)
+    principal, monthly_rate = rng.uniform(1e3, 1e6, 5_000), rng.uniform(0, 0.01, 5_000)
+    total_payment = principal * rng.uniform(monthly_rate + 1e-4, 0.2)
+    months = payoff_months(principal, monthly_rate, total_payment)
+    assert (_raw_balances(principal, monthly_rate, total_payment, months) < PAYOFF_THRESHOLD).all()
+    assert (_raw_balances(principal, monthly_rate, total_payment, months - 1) >= PAYOFF_THRESHOLD).all()
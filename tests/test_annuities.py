@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from actuarial.annuities import annuity_due, annuity_immediate, annuity_value, deferred_annuity, growing_annuity
+from actuarial.curves import YieldCurve
+
+TYPES = ("Annuity Immediate", "Annuity Due", "Growing Annuity", "Deferred Annuity")
+
+
+def _flat(r):  # Flat curve with annual compounding: DF(t) = (1 + r)^-t
+    return YieldCurve([1.0, 100.0], [r, r], compounding=1)
+
+
+@pytest.mark.parametrize('annuity_type', TYPES)
+@pytest.mark.parametrize('calc', ["PV", "FV"])
+@pytest.mark.parametrize('r', [0.001, 0.05, 0.12])
+def test_flat_curve_matches_scalar_rate(annuity_type, calc, r):
+    n, g, m = np.array([1, 5, 30]), 0.02, np.array([0, 3, 10])
+    expected = annuity_value(annuity_type, calc, 1000.0, r, n, g, m)
+    np.testing.assert_allclose(annuity_value(annuity_type, calc, 1000.0, _flat(r), n, g, m), expected, rtol=1e-12)
+
+
+def test_deferred_fv_on_flat_curve():  # FV_immediate carried forward m periods, as for a flat rate
+    assert deferred_annuity(100.0, _flat(0.05), 20, 5, "FV") == pytest.approx(
+        deferred_annuity(100.0, 0.05, 20, 5, "FV"), rel=1e-12)
+    assert deferred_annuity(100.0, 0.05, 20, 5, "FV") == pytest.approx(
+        annuity_immediate(100.0, 0.05, 20, "FV") * 1.05 ** 5, rel=1e-12)
+
+
+def test_scalar_annuities_match_payment_sums():
+    r, n, g = 0.04, 25, 0.03
+    v = 1 / (1 + r)
+    assert annuity_immediate(1.0, r, n) == pytest.approx(sum(v ** k for k in range(1, n + 1)), rel=1e-13)
+    assert annuity_due(1.0, r, n) == pytest.approx(sum(v ** k for k in range(n)), rel=1e-13)
+    assert growing_annuity(1.0, r, g, n) == pytest.approx(sum((1 + g) ** (k - 1) * v ** k for k in range(1, n + 1)),
+                                                          rel=1e-13)
+    assert annuity_immediate(1.0, 0.0, n, "FV") == n
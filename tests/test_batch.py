@@ -0,0 +1,98 @@
+import csv
+
+import numpy as np
+import pytest
+
+from actuarial import batch
+from actuarial.bonds import price_bonds
+
+
+@pytest.fixture
+def book(tmp_path):  # 1,234 bonds with a few blank (defaulted) frequencies, CRLF line ends, no final line break
+    rng = np.random.default_rng(0)
+    rows = [['id', 'face_value', 'coupon_rate', 'years', 'ytm', 'frequency']]
+    for i in range(1_234):
+        rows.append([f'B{i}', '1000', f'{rng.uniform(0, 0.1):.4f}', str(rng.integers(1, 31)),
+                     f'{rng.uniform(0.001, 0.1):.4f}', '' if i % 7 == 0 else str(rng.choice([1, 2, 4]))])
+    path = tmp_path / 'book.csv'
+    path.write_bytes('\r\n'.join(','.join(row) for row in rows).encode())
+    return rows, str(path)
+
+
+def _read(path):
+    with open(path, newline='') as handle:
+        return list(csv.reader(handle))
+
+
+def test_chunks_cover_every_row_once(book):
+    rows, path = book
+    chunks = list(batch.read_chunks(path, chunk_rows=100))
+    assert [size for _, size in chunks] == [100] * 12 + [34]
+    assert sum((chunk['id'] for chunk, _ in chunks), []) == [row[0] for row in rows[1:]]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_batch_matches_price_bonds(book, tmp_path, workers):
+    rows, path = book
+    output = str(tmp_path / f'prices-{workers}.csv')
+    assert batch.run_batch('bond', path, output, chunk_rows=100, workers=workers) == len(rows) - 1
+    table = _read(output)
+    assert table[0] == rows[0] + ['price', 'pv_coupons', 'pv_face', 'macaulay_duration', 'modified_duration',
+                                  'convexity']
+    assert [row[:6] for row in table[1:]] == rows[1:]
+    inputs = np.array([[float(value or 2) for value in row[1:]] for row in rows[1:]]).T
+    expected = price_bonds(*inputs)
+    np.testing.assert_array_equal([float(row[6]) for row in table[1:]], expected['price'])
+
+
+def test_resume_after_interruption(book, tmp_path, monkeypatch):
+    _, path = book
+    complete = str(tmp_path / 'complete.csv')
+    batch.run_batch('bond', path, complete, chunk_rows=100, workers=1)
+
+    output, saves = str(tmp_path / 'resumed.csv'), []
+    save_checkpoint = batch._save_checkpoint
+
+    def crash_after_five(checkpoint, state):
+        save_checkpoint(checkpoint, state)
+        saves.append(state['chunks_done'])
+        if len(saves) == 5:
+            raise KeyboardInterrupt
+    monkeypatch.setattr(batch, '_save_checkpoint', crash_after_five)
+    with pytest.raises(KeyboardInterrupt):
+        batch.run_batch('bond', path, output, chunk_rows=100, workers=1)
+    with open(output, 'ab') as handle:
+        handle.write(b'half a row written before the crash')
+    monkeypatch.setattr(batch, '_save_checkpoint', save_checkpoint)
+    assert batch.run_batch('bond', path, output, chunk_rows=100, workers=2, resume=True) == 734
+    with open(output, 'rb') as resumed, open(complete, 'rb') as expected:
+        assert resumed.read() == expected.read()
+
+
+def test_resume_rejects_other_chunking(book, tmp_path):
+    _, path = book
+    output = str(tmp_path / 'prices.csv')
+    batch.run_batch('bond', path, output, chunk_rows=100, workers=1)
+    with pytest.raises(ValueError):
+        batch.run_batch('bond', path, output, chunk_rows=200, workers=1, resume=True)
+
+
+def test_failed_pool_start_reports_the_real_error(book, tmp_path, monkeypatch):
+    import concurrent.futures
+
+    def no_pool(*args, **kwargs):
+        raise OSError("no processes")
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', no_pool)
+    with pytest.raises(OSError, match="no processes"):
+        batch.run_batch('bond', book[1], str(tmp_path / 'prices.csv'), chunk_rows=100, workers=2)
+
+
+@pytest.mark.parametrize('cell, problem', [('', 'is blank'), ('n/a', "is not a number: 'n/a'")])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_bad_required_cell_names_column_and_row(book, tmp_path, cell, problem, workers):
+    rows, path = book
+    rows[251][4] = cell  # Contract 251: the 51st row of the third chunk
+    with open(path, 'w', newline='') as handle:
+        csv.writer(handle).writerows(rows)
+    with pytest.raises(ValueError, match=f"Row 251: 'ytm' {problem}"):
+        batch.run_batch('bond', path, str(tmp_path / 'prices.csv'), chunk_rows=100, workers=workers)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+import reference
+from actuarial.bonds import price_bonds
+
+FIELDS = ('price', 'pv_coupons', 'pv_face', 'macaulay_duration', 'modified_duration')
+
+
+def test_price_bonds_matches_baseline():
+    rng = np.random.default_rng(0)
+    n_bonds = 2_000
+    face_value = rng.choice([100, 1000], n_bonds).astype(float)
+    coupon_rate, years = rng.uniform(0, 0.1, n_bonds), rng.integers(1, 31, n_bonds)
+    ytm, frequency = rng.uniform(0.001, 0.1, n_bonds), rng.choice([1, 2, 4, 12], n_bonds)
+    result = price_bonds(face_value, coupon_rate, years, ytm, frequency)
+    for bond in range(n_bonds):
+        expected = reference.bond_pricing(face_value[bond], coupon_rate[bond], int(years[bond]), ytm[bond],
+                                          int(frequency[bond]))
+        actual = [result[field][bond] for field in FIELDS]
+        np.testing.assert_allclose(actual, expected, rtol=1e-10)
+
+
+def test_price_bonds_broadcasts_scalars():
+    result = price_bonds(1000.0, 0.05, 10, np.array([0.03, 0.04, 0.05]), 2)
+    assert result['price'].shape == (3,)
+    assert result['price'][2] == pytest.approx(1000.0, abs=1e-9)  # At par when coupon rate == yield
+
+
+def test_convexity_matches_finite_difference():
+    ytm, h = np.array([0.02, 0.05, 0.08]), 1e-5
+    price = price_bonds(1000.0, 0.06, 20, ytm, 2)
+    up, down = price_bonds(1000.0, 0.06, 20, ytm + h, 2)['price'], price_bonds(1000.0, 0.06, 20, ytm - h, 2)['price']
+    np.testing.assert_allclose((up + down - 2 * price['price']) / h ** 2 / price['price'], price['convexity'],
+                               rtol=1e-4)
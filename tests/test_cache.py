@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from actuarial import cache
+from actuarial.cache import ResultCache, cache_stats, normalize_key
+
+
+def _counting(results):  # compute callback that records every call
+    calls = []
+
+    def compute(value):
+        def run():
+            calls.append(value)
+            return results(value)
+        return run
+    return calls, compute
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru = ResultCache('test lru', maxsize=2)
+    calls, compute = _counting(lambda value: value * 10)
+    assert lru.get_or_compute('a', compute('a')) == 'a' * 10
+    lru.get_or_compute('b', compute('b'))
+    lru.get_or_compute('a', compute('a'))  # a is now the most recent; b goes first
+    lru.get_or_compute('c', compute('c'))
+    lru.get_or_compute('a', compute('a'))
+    lru.get_or_compute('b', compute('b'))
+    assert calls == ['a', 'b', 'c', 'b']
+    assert lru.stats == {'hits': 2, 'misses': 4, 'evictions': 2, 'expirations': 0, 'size': 2, 'maxsize': 2}
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(cache, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    ttl = ResultCache('test ttl', maxsize=4, ttl=30)
+    calls, compute = _counting(lambda value: value)
+    ttl.get_or_compute('x', compute('x'))
+    clock.now = 129.9
+    ttl.get_or_compute('x', compute('x'))
+    clock.now = 130.0
+    ttl.get_or_compute('x', compute('x'))
+    assert calls == ['x', 'x']
+    assert ttl.stats['hits'] == 1 and ttl.stats['expirations'] == 1 and ttl.stats['size'] == 1
+
+
+def test_keys_agree_to_significant_digits():
+    assert normalize_key(0.1 + 0.2) == normalize_key(0.3)
+    assert normalize_key(1e6 * (1 + 1e-14)) == normalize_key(1e6)
+    assert normalize_key(0.3) != normalize_key(0.3 * (1 + 1e-10))
+    assert normalize_key(np.float32(0.5)) == normalize_key(0.5) == normalize_key(np.int64(0) + 0.5)
+    assert normalize_key(np.array([0.1 + 0.2, 1.0])) == normalize_key(np.array([0.3, 1.0]))
+    assert normalize_key({'b': 2, 'a': [1, 2.0]}) == normalize_key({'a': (1, 2), 'b': 2.0})
+    assert normalize_key(True) is True and normalize_key(np.bool_(False)) is False
+    assert normalize_key(float('nan')) != normalize_key(float('nan'))  # NaN never hits
+    large = np.arange(100.0)
+    assert normalize_key(large) == normalize_key(large.copy()) != normalize_key(large + 1e-9)
+    with pytest.raises(TypeError):
+        normalize_key(object())
+
+
+def test_memoize_fills_defaults_and_shares_near_equal_calls():
+    memo = ResultCache('test memoize', maxsize=8)
+    calls = []
+
+    @memo.memoize
+    def future_value(PV, r, n=10):
+        calls.append((PV, r, n))
+        return PV * (1 + r) ** n
+
+    assert future_value(100.0, 0.05) == future_value(100.0, 0.05, n=10) == future_value(PV=100.0, r=0.1 - 0.05)
+    future_value(100.0, 0.0500001)
+    assert calls == [(100.0, 0.05, 10), (100.0, 0.0500001, 10)]
+    assert future_value.cache is memo
+    assert cache_stats()['test memoize'] == memo.stats
+    memo.clear()
+    assert memo.stats['size'] == 0
@@ -0,0 +1,78 @@
+import datetime
+import io
+
+import numpy as np
+import pytest
+
+from actuarial.cashflows import CashFlows, load_cash_flows, xirr, xnpv, year_fractions
+
+
+def _flows(seed, n_flows):  # An outlay followed by irregularly dated inflows
+    rng = np.random.default_rng(seed)
+    start = datetime.date(2020, 1, 15)
+    dates = [start] + sorted(start + datetime.timedelta(days=int(d)) for d in rng.integers(1, 3650, n_flows - 1))
+    amounts = np.r_[-rng.uniform(5e4, 1e6), rng.uniform(1e3, 2e5, n_flows - 1)]
+    return amounts, dates
+
+
+def _xnpv(rate, amounts, dates):  # Spreadsheet definition, one flow at a time
+    return sum(amount / (1 + rate) ** ((date - dates[0]).days / 365) for amount, date in zip(amounts, dates))
+
+
+def test_xnpv_matches_flow_by_flow_sum():
+    amounts, dates = _flows(1, 40)
+    for rate in (-0.5, 0.0, 0.03, 0.25, 2.0):
+        assert xnpv(rate, amounts, dates) == pytest.approx(_xnpv(rate, amounts, dates), rel=1e-12, abs=1e-6)
+
+
+def test_xirr_roundtrips_through_xnpv():
+    for seed in range(20):
+        amounts, dates = _flows(seed, 30)
+        result = xirr(amounts, dates)
+        assert result.converged
+        assert _xnpv(result.root, amounts, dates) == pytest.approx(0, abs=1e-6 * np.abs(amounts).sum())
+
+
+@pytest.mark.parametrize('rate', [-0.3, 0.0, 0.07, 1.5])
+def test_xirr_recovers_the_rate_flows_were_built_at(rate):
+    amounts, dates = _flows(7, 25)
+    amounts[0] -= _xnpv(rate, amounts, dates)  # Outlay equal to the PV of the inflows at rate
+    result = xirr(amounts, dates)
+    assert result.converged
+    assert result.root == pytest.approx(rate, abs=1e-10)
+
+
+def test_irr_quotes_the_same_root_under_any_compounding():
+    amounts, dates = _flows(3, 20)
+    flows = CashFlows(dates, amounts)
+    annual = flows.irr().root
+    for compounding in (12, 365, 'continuous'):
+        rate = flows.irr(compounding).root
+        assert flows.npv(rate, compounding) == pytest.approx(0, abs=1e-6 * np.abs(amounts).sum())
+        assert flows.npv(annual) == pytest.approx(flows.npv(rate, compounding), abs=1e-6)
+
+
+def test_npv_array_matches_scalar_rates():
+    amounts, dates = _flows(4, 50)
+    flows = CashFlows(dates, amounts)
+    rates = np.linspace(-0.2, 0.5, 12).reshape(3, 4)
+    expected = np.array([flows.npv(float(rate)) for rate in rates.ravel()]).reshape(rates.shape)
+    assert flows.npv(rates) == pytest.approx(expected, rel=1e-12)
+
+
+def test_year_fractions_day_counts():
+    start, end = '2020-01-31', ['2020-03-31', '2021-01-31', '2024-02-29']
+    days = np.array([60, 366, 1490])
+    assert year_fractions(start, end, 'ACT/365F') == pytest.approx(days / 365)
+    assert year_fractions(start, end, 'ACT/360') == pytest.approx(days / 360)
+    assert year_fractions(start, end, '30/360') == pytest.approx(np.array([60, 360, 1469]) / 360)
+    assert year_fractions('2020-07-01', '2022-07-01', 'ACT/ACT') == pytest.approx(184 / 366 + 1 + 181 / 365)
+    with pytest.raises(ValueError):
+        year_fractions(start, end, 'ACT/364')
+
+
+def test_load_cash_flows_reads_csv():
+    flows = load_cash_flows(io.StringIO("date,amount\n2021-01-01,-100\n 2022-01-01 ,110\n\n"))
+    assert flows.irr().root == pytest.approx(0.10, abs=1e-12)
+    with pytest.raises(ValueError):
+        load_cash_flows(io.StringIO("when,amount\n2020-01-01,-100\n"))
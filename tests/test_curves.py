@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from actuarial.bonds import price_bonds
+from actuarial.curves import YieldCurve, yield_curve
+
+TIMES = [0.25, 0.5, 1, 2, 3, 5, 7, 10, 20, 30]
+PAR_YIELDS = [0.046, 0.045, 0.044, 0.042, 0.041, 0.040, 0.0405, 0.041, 0.0435, 0.044]
+ZERO = YieldCurve([0.5, 2, 5, 10, 30], [0.03, 0.032, 0.035, 0.038, 0.04])
+
+
+@pytest.mark.parametrize('method', YieldCurve.METHODS)
+def test_bootstrapped_curve_reprices_par_bonds(method):
+    curve = YieldCurve.from_par_yields(TIMES, PAR_YIELDS, frequency=2, method=method)
+    coupon_tenors = [(t, y) for t, y in zip(TIMES, PAR_YIELDS) if t >= 0.5]
+    prices = price_bonds(100.0, [y for _, y in coupon_tenors], [t for t, _ in coupon_tenors], curve, 2)['price']
+    np.testing.assert_allclose(prices, 100.0, rtol=1e-9 if method == 'log_linear' else 1e-6)
+    assert float(curve.discount(0.25)) == pytest.approx(1 / (1 + 0.046 * 0.25), rel=1e-12)  # A simple-interest bill
+
+
+@pytest.mark.parametrize('method', YieldCurve.METHODS)
+def test_curve_matches_its_knots_and_extrapolates_flat(method):
+    curve = YieldCurve(ZERO.times, ZERO.zero_rates, method=method)
+    np.testing.assert_allclose(curve.zero_rate(curve.times), curve.zero_rates, rtol=1e-12)
+    np.testing.assert_allclose(curve.discount(curve.times), np.exp(-curve.zero_rates * curve.times), rtol=1e-12)
+    np.testing.assert_allclose(curve.zero_rate([40.0, 100.0]), 0.04, rtol=1e-12)
+    assert float(curve.zero_rate(0.0)) == 0.03
+    between = curve.zero_rate(np.linspace(0.5, 30, 200))
+    assert between.min() >= 0.03 - 1e-3 and between.max() <= 0.04 + 1e-3
+
+
+def test_log_linear_forwards_are_flat_between_knots():
+    t = np.linspace(2, 5, 7)
+    forwards = -np.diff(np.log(ZERO.discount(t))) / np.diff(t)
+    np.testing.assert_allclose(forwards, (0.035 * 5 - 0.032 * 2) / 3, rtol=1e-10)
+
+
+def test_cubic_curve_is_smooth_at_the_knots():
+    cubic = YieldCurve(ZERO.times, ZERO.zero_rates, method='cubic')
+    h = 0.05
+    for knot in ZERO.times[1:-1]:
+        left = (cubic.zero_rate(knot) - cubic.zero_rate(knot - h)) / h
+        right = (cubic.zero_rate(knot + h) - cubic.zero_rate(knot)) / h
+        assert float(left) == pytest.approx(float(right), abs=2e-4)
+
+
+def test_periodic_compounding_converts_to_continuous():
+    annual = YieldCurve([1, 5], [0.05, 0.05], compounding=1)
+    np.testing.assert_allclose(annual.discount([1, 3, 5]), 1.05 ** -np.array([1, 3, 5]), rtol=1e-14)
+
+
+@pytest.mark.parametrize('method', YieldCurve.METHODS)
+def test_shifted_and_bumped(method):
+    curve = YieldCurve(ZERO.times, ZERO.zero_rates, method=method)
+    t = np.linspace(0.1, 40, 50)
+    np.testing.assert_allclose(curve.shifted(0.01).discount(t), curve.discount(t) * np.exp(-0.01 * t), rtol=1e-12)
+    bumped = curve.bumped(0.001, 4.0)  # Nearest knot: 5y
+    np.testing.assert_allclose(bumped.zero_rates - curve.zero_rates, [0, 0, 0.001, 0, 0], atol=1e-15)
+    assert bumped.method == curve.method and bumped.key != curve.key
+    if method == 'log_linear':  # Only the two intervals around the knot move
+        np.testing.assert_array_equal(bumped.discount([0.5, 1, 2, 10, 20]), curve.discount([0.5, 1, 2, 10, 20]))
+
+
+def test_annuity_factor_sums_discount_factors():
+    n, deferred, growth = np.array([1, 12, 40]), np.array([0, 4, 0]), np.array([0.0, 0.0, 0.02])
+    for due in (False, True):
+        factor = ZERO.annuity_factor(n, frequency=4, due=due, deferred=deferred, growth=growth)
+        for i in range(3):
+            k = np.arange(1, n[i] + 1)
+            expected = np.sum((1 + growth[i]) ** (k - 1) * ZERO.discount((k - due + deferred[i]) / 4))
+            assert factor[i] == pytest.approx(expected, rel=1e-13)
+    schedule = ZERO.discount_schedule(8, 2)
+    assert schedule is ZERO.discount_schedule(8, 2) and not schedule.flags.writeable
+
+
+def test_yield_curve_is_shared_and_validated():
+    assert yield_curve(TIMES, PAR_YIELDS, basis='par') is yield_curve(list(TIMES), PAR_YIELDS, basis='par')
+    assert yield_curve([1, 2], [0.03, 0.04]).key == YieldCurve([1, 2], [0.03, 0.04]).key
+    with pytest.raises(ValueError):
+        yield_curve([1, 2], [0.03, 0.04], basis='forward')
+    with pytest.raises(ValueError):
+        YieldCurve([0, 1], [0.03, 0.04])
+    with pytest.raises(ValueError):
+        YieldCurve([1, 2], [0.03, 0.04], method='linear')
+
+
+def test_bond_analytics_on_a_curve():
+    coupons, years = np.array([0.0, 0.05, 0.1]), np.array([5, 10, 30])
+    bond = price_bonds(100.0, coupons, years, ZERO, 2)
+    flat = price_bonds(100.0, coupons, years, bond['ytm'], 2)
+    np.testing.assert_allclose(flat['price'], bond['price'], rtol=1e-12)  # The yield reprices the bond
+    for field in ('macaulay_duration', 'modified_duration', 'convexity'):
+        np.testing.assert_allclose(bond[field], flat[field], rtol=1e-10)
+    h = 1e-5
+    up, down = (price_bonds(100.0, coupons, years, ZERO, 2, shift)['price'] for shift in (h, -h))
+    np.testing.assert_allclose(-(up - down) / (2 * h) / bond['price'], bond['curve_duration'], rtol=1e-8)
+    np.testing.assert_allclose((up + down - 2 * bond['price']) / h ** 2 / bond['price'], bond['curve_convexity'],
+                               rtol=1e-4)
+    assert bond['curve_duration'][0] == 5.0 and np.all(bond['modified_duration'] < bond['macaulay_duration'])
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from actuarial.downsample import downsample, lttb, min_max, percentile_bands
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+@pytest.mark.parametrize('n_series', [1, 2, 5, 600])
+@pytest.mark.parametrize('max_points', [4, 7, 100, 2_000])
+def test_union_never_exceeds_max_points(method, n_series, max_points):
+    rng = np.random.default_rng(n_series)
+    x = np.arange(10_001)
+    ys = rng.standard_normal((n_series, x.size)).cumsum(axis=1)  # Unrelated random walks pick different points
+    x_out, *ys_out = downsample(x, *ys, max_points=max_points, method=method)
+    assert x_out.size <= max_points
+    assert np.all(np.diff(x_out) > 0) and x_out[0] == 0 and x_out[-1] == x[-1]
+    for y, y_out in zip(ys, ys_out):
+        np.testing.assert_array_equal(y_out, y[x_out])
+
+
+def test_min_max_keeps_extremes_within_budget():
+    y = np.sin(np.linspace(0, 50, 10_000))
+    y[1234], y[8765] = 5.0, -5.0
+    picks = min_max(y, 100)
+    assert picks.size <= 100 and 1234 in picks and 8765 in picks
+
+
+def test_lttb_keeps_endpoints():
+    picks = lttb(np.arange(1000), np.random.default_rng(0).standard_normal(1000), 50)
+    assert picks.size == 50 and picks[0] == 0 and picks[-1] == 999
+
+
+def test_short_series_pass_through():
+    x, y = downsample(np.arange(10), np.arange(10.0) ** 2, max_points=20)
+    np.testing.assert_array_equal(y, np.arange(10.0) ** 2)
+    assert x.size == 10
+
+
+def test_percentile_bands():
+    paths = np.arange(100.0)[None, :] + np.zeros((3, 1))
+    bands = percentile_bands(paths, (0, 50, 100))
+    np.testing.assert_allclose(bands[50], 49.5)
+    np.testing.assert_allclose(bands[100], 99.0)
@@ -0,0 +1,80 @@
+import csv
+import io
+
+import numpy as np
+import pytest
+
+from actuarial.amortization import LoanModel, amortize_portfolio, iter_amortization_schedule, schedule_rows
+from actuarial.export import iter_portfolio_rows, write_portfolio_csv, write_portfolio_parquet, write_schedule_csv
+from actuarial.schedule import MONEY_FIELDS, SCHEDULE_FIELDS
+
+LOANS = [('A-1', 250_000.0, 0.065, 30, 0.0), ('A-2', 180_000.0, 0.045, 15, 350.0), ('B-1', 12_500.0, 0.0, 5, 0.0),
+         ('B-2', 99_999.99, 0.0725, 10, 1234.56), ('C-1', 5_000.0, 0.0, 1, 400.0)]
+
+
+def _read(text):  # Header and rows of a CSV, numbers parsed
+    header, *rows = csv.reader(io.StringIO(text))
+    return header, [[cell if column == 'Loan ID' else float(cell) for column, cell in zip(header, row)]
+                    for row in rows]
+
+
+def _expected_rows():  # (loan_id, row dict) per payment, straight from amortize_portfolio
+    loan_ids, *inputs = zip(*LOANS)
+    schedules = amortize_portfolio(*(np.array(values) for values in inputs))
+    return [(loan_id, row) for index, loan_id in enumerate(loan_ids) for row in schedule_rows(schedules, index)]
+
+
+@pytest.mark.parametrize('chunk_rows', [7, 10_000])
+def test_schedule_csv_from_columns_and_rows(chunk_rows):
+    model = LoanModel(180_000.0, 0.045, 15, 350.0)
+    from_columns, from_rows = io.StringIO(), io.StringIO()
+    write_schedule_csv(model.schedule, from_columns, chunk_rows=chunk_rows)
+    write_schedule_csv(iter(model.schedule.rows()), from_rows, chunk_rows=chunk_rows)
+    assert from_columns.getvalue() == from_rows.getvalue()
+    header, rows = _read(from_columns.getvalue())
+    assert header == list(SCHEDULE_FIELDS)
+    assert rows == [[row[field] for field in SCHEDULE_FIELDS] for row in model.schedule.rows()]
+
+
+def test_schedule_csv_streams_a_generator(tmp_path):
+    rows = iter_amortization_schedule(10_000.0, 0.005, 24, 443.21)
+    path = tmp_path / 'schedule.csv'
+    write_schedule_csv(rows, str(path), chunk_rows=5)
+    header, written = _read(path.read_text())
+    assert header == list(SCHEDULE_FIELDS) and len(written) == 24
+    assert [row[0] for row in written] == list(range(1, 25))
+
+
+@pytest.mark.parametrize('chunk_loans, chunk_rows', [(2, 50), (1_000, 10_000)])
+def test_portfolio_csv_round_trips_amortize_portfolio(chunk_loans, chunk_rows):
+    target = io.StringIO()
+    write_portfolio_csv(iter(LOANS), target, chunk_loans=chunk_loans, chunk_rows=chunk_rows)
+    header, rows = _read(target.getvalue())
+    assert header == ['Loan ID', *SCHEDULE_FIELDS]
+    expected = _expected_rows()
+    assert len(rows) == len(expected)
+    for (loan_id, *values), (expected_id, row) in zip(rows, expected):
+        assert loan_id == expected_id
+        assert values == [row[field] for field in SCHEDULE_FIELDS]
+
+
+def test_portfolio_rows_match_loan_models():
+    rows = list(iter_portfolio_rows(LOANS, chunk_loans=2))
+    for loan_id, *loan in LOANS:
+        model_rows = LoanModel(*loan).schedule.rows()
+        loan_rows = [row[1:] for row in rows if row[0] == loan_id]
+        assert [row[0] for row in loan_rows] == [row['Payment'] for row in model_rows]
+        for row, model_row in zip(loan_rows, model_rows):  # Rounded from different float paths
+            assert all(abs(value - model_row[field]) <= 0.011 for value, field in zip(row[1:], MONEY_FIELDS))
+
+
+def test_portfolio_parquet_matches_csv(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'portfolio.parquet'
+    write_portfolio_parquet(LOANS, str(path), chunk_loans=2)
+    table = pq.read_table(str(path)).to_pydict()
+    assert list(table) == ['Loan ID', *SCHEDULE_FIELDS]
+    expected = _expected_rows()
+    assert table['Loan ID'] == [loan_id for loan_id, _ in expected]
+    for field in SCHEDULE_FIELDS:
+        assert table[field] == [row[field] for _, row in expected]
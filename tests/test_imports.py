@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+import actuarial
+
+HEAVY = ('numpy', 'pandas', 'plotly', 'pyarrow', 'scipy', 'numba', 'streamlit')
+
+
+def _loaded_after(code):  # Top-level packages and actuarial submodules in sys.modules after running code afresh
+    script = f"import sys\n{code}\nprint(__import__('json').dumps(sorted(sys.modules)))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(actuarial.__file__)))
+    modules = json.loads(subprocess.run([sys.executable, '-c', script], cwd=root, check=True, capture_output=True,
+                                        text=True).stdout)
+    return {name for name in modules if name.startswith('actuarial.') or name.split('.')[0] in HEAVY}
+
+
+def test_import_loads_no_submodules():
+    assert _loaded_after('import actuarial') == set()
+
+
+def test_calculators_load_only_numpy():
+    loaded = _loaded_after('import actuarial\nactuarial.price_bonds(100, 0.05, 10, 0.04)\nactuarial.LoanModel')
+    assert {name.split('.')[0] for name in loaded} == {'numpy', 'actuarial'}
+    assert not {'actuarial.charts', 'actuarial.export', 'actuarial.service', 'actuarial.batch'} & loaded
+
+
+def test_every_export_resolves():
+    for name in actuarial.__all__:
+        assert getattr(actuarial, name) is not None, name
+    assert set(actuarial.__all__) <= set(dir(actuarial))
@@ -0,0 +1,117 @@
+import io
+import json
+
+import pytest
+
+from actuarial import instrumentation
+from actuarial.instrumentation import (disable, enable, events, export_jsonl, instrumented, invocation,
+                                       merge_events, metrics_app, phase, prometheus_text)
+
+
+@pytest.fixture
+def recording():  # Instrumentation on with an empty event log; the previous state comes back afterwards
+    was_enabled = instrumentation.is_enabled()
+    enable()
+    events(clear=True)
+    yield
+    enable()
+    events(clear=True)
+    if not was_enabled:
+        disable()
+
+
+def test_disabled_phases_record_nothing(recording):
+    disable()
+    with invocation('tvm'), phase('solve'):
+        pass
+    assert phase('solve') is invocation('tvm')  # The shared no-op context
+    assert events() == []
+
+
+def test_phases_nest_inside_invocations(recording):
+    with invocation('amortization', loans=3):
+        with phase('schedule'):
+            with phase('rounding', rows=360):
+                pass
+        with invocation('bond'):  # A nested invocation gets its own id, then hands the outer one back
+            with phase('price'):
+                pass
+        with phase('chart'):
+            pass
+    with phase('outside'):
+        pass
+    recorded = {event['phase']: event for event in events()}
+    outer, inner = recorded['schedule']['invocation'], recorded['price']['invocation']
+    assert outer != inner and outer is not None
+    assert [event['phase'] for event in events()] == ['rounding', 'schedule', 'price', 'total', 'chart', 'total',
+                                                       'outside']
+    assert {name: (event['invocation'], event['calculator']) for name, event in recorded.items()} == {
+        'rounding': (outer, 'amortization'), 'schedule': (outer, 'amortization'), 'price': (inner, 'bond'),
+        'chart': (outer, 'amortization'), 'total': (outer, 'amortization'), 'outside': (None, None)}
+    assert recorded['rounding']['rows'] == 360 and recorded['total']['loans'] == 3
+    assert all(event['seconds'] >= 0 and event['error'] is None for event in events())
+
+
+def test_errors_are_recorded_and_raised(recording):
+    @instrumented('divide')
+    def divide(a, b):
+        return a / b
+
+    assert divide(1, 2) == 0.5
+    with pytest.raises(ZeroDivisionError):
+        with invocation('tvm'):
+            divide(1, 0)
+    assert [(event['phase'], event['error']) for event in events()] == [
+        ('divide', None), ('divide', 'ZeroDivisionError'), ('total', 'ZeroDivisionError')]
+
+
+def test_event_log_is_bounded_and_exports_once(recording):
+    enable(max_events=5)
+    for index in range(8):
+        with phase('step', index=index):
+            pass
+    assert [event['index'] for event in events()] == [3, 4, 5, 6, 7]  # The oldest are dropped
+    merge_events([{'phase': 'remote', 'index': 8}])
+    target = io.StringIO()
+    assert export_jsonl(target) == 5
+    lines = [json.loads(line) for line in target.getvalue().splitlines()]
+    assert [event['index'] for event in lines] == [4, 5, 6, 7, 8]
+    assert events() == [] and export_jsonl(io.StringIO()) == 0  # Exported events are cleared
+
+
+def test_export_jsonl_appends_to_a_path(recording, tmp_path):
+    path = tmp_path / 'events.jsonl'
+    for _ in range(2):
+        with phase('step'):
+            pass
+        assert export_jsonl(str(path), clear=False) == 1
+        events(clear=True)
+    assert [json.loads(line)['phase'] for line in path.read_text().splitlines()] == ['step', 'step']
+
+
+def test_prometheus_text_format(recording):
+    merge_events([
+        {'calculator': 'bond', 'phase': 'total', 'seconds': 0.25, 'allocated_blocks': 10},
+        {'calculator': 'bond', 'phase': 'total', 'seconds': 0.5, 'allocated_blocks': -4},
+        {'calculator': None, 'phase': 'chart', 'seconds': 1.0, 'allocated_blocks': 2},
+        {'calculator': 'say "hi"\\\n', 'phase': 'x', 'seconds': 0.0, 'allocated_blocks': 0},
+    ])
+    assert prometheus_text().splitlines() == [
+        '# HELP actuarial_phase_seconds Time spent in each calculator phase.',
+        '# TYPE actuarial_phase_seconds summary',
+        'actuarial_phase_seconds_count{calculator="",phase="chart"} 1',
+        'actuarial_phase_seconds_sum{calculator="",phase="chart"} 1.000000000',
+        'actuarial_phase_seconds_count{calculator="bond",phase="total"} 2',
+        'actuarial_phase_seconds_sum{calculator="bond",phase="total"} 0.750000000',
+        'actuarial_phase_seconds_count{calculator="say \\"hi\\"\\\\\\n",phase="x"} 1',
+        'actuarial_phase_seconds_sum{calculator="say \\"hi\\"\\\\\\n",phase="x"} 0.000000000',
+        '# HELP actuarial_phase_allocated_blocks_total Net memory blocks allocated in each phase.',
+        '# TYPE actuarial_phase_allocated_blocks_total counter',
+        'actuarial_phase_allocated_blocks_total{calculator="",phase="chart"} 2',
+        'actuarial_phase_allocated_blocks_total{calculator="bond",phase="total"} 10',
+        'actuarial_phase_allocated_blocks_total{calculator="say \\"hi\\"\\\\\\n",phase="x"} 0',
+    ]
+    responses = []
+    body = b''.join(metrics_app({}, lambda status, headers: responses.append((status, dict(headers)))))
+    assert body == prometheus_text().encode()
+    assert responses == [('200 OK', {'Content-Type': 'text/plain; version=0.0.4', 'Content-Length': str(len(body))})]
@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pytest
+
+from actuarial.kernels import (SERIES_CUTOFF, accumulation_factor, accumulation_factor_derivative, annuity_factor,
+                               compensated_sum, growing_annuity_factor, growth_factor)
+
+RATES = [0.0, 1e-9, -1e-9, 1e-7, -1e-7, 0.003, -0.003, 0.05]
+TERMS = [1, 2, 12, 360, 10_000]
+
+
+def _powers(r, exponents):  # (1 + r)^j from the exact r, one term at a time
+    return [math.exp(j * math.log1p(r)) for j in exponents]
+
+
+@pytest.mark.parametrize('n', TERMS)
+@pytest.mark.parametrize('r', RATES)
+def test_factors_match_fsum_of_payments(r, n):
+    s = math.fsum(_powers(r, range(n)))
+    a = math.fsum(_powers(r, range(-1, -n - 1, -1)))
+    ds = math.fsum(j * p for j, p in zip(range(1, n), _powers(r, range(n - 1))))
+    assert accumulation_factor(r, n) == pytest.approx(s, rel=1e-13)
+    assert annuity_factor(r, n) == pytest.approx(a, rel=1e-13)
+    assert growth_factor(r, n) == pytest.approx(math.exp(n * math.log1p(r)), rel=1e-15)
+    assert accumulation_factor_derivative(r, n) == pytest.approx(ds, rel=1e-9, abs=1e-12)
+
+
+def test_zero_rate_is_exact():
+    n = np.array([0, 1, 7, 360])
+    np.testing.assert_array_equal(accumulation_factor(0.0, n), n)
+    np.testing.assert_array_equal(annuity_factor(0.0, n), n)
+    np.testing.assert_array_equal(accumulation_factor_derivative(0.0, n), n * (n - 1) / 2)
+
+
+@pytest.mark.parametrize('n', [12.0, 360.0])
+def test_factors_are_continuous_at_the_series_cutoff(n):
+    r = np.expm1(SERIES_CUTOFF / n) * np.array([1 - 1e-9, 1 + 1e-9])
+    for factor in (accumulation_factor, annuity_factor):
+        values = factor(r, n)
+        assert values[0] == pytest.approx(values[1], rel=1e-12)
+
+
+def test_growing_annuity_is_continuous_through_r_equal_g():
+    g, n = 0.03, 40
+    r = np.array([g - 1e-12, g, g + 1e-12])
+    expected = math.fsum((1 + g) ** (k - 1) / (1 + g) ** k for k in range(1, n + 1))
+    np.testing.assert_allclose(growing_annuity_factor(r, g, n), expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize('shape, axis', [((1000,), 0), ((500, 40), 0), ((30, 700), 1), ((3, 5), 0)])
+def test_compensated_sum_matches_fsum(shape, axis):
+    rng = np.random.default_rng(0)
+    values = rng.standard_normal(shape) * 10.0 ** rng.integers(-8, 9, shape)  # Ill-conditioned: heavy cancellation
+    expected = np.apply_along_axis(math.fsum, axis, values)
+    np.testing.assert_allclose(compensated_sum(values, axis), expected, rtol=1e-15, atol=1e-15)
+
+
+def test_compensated_sum_of_nothing():
+    np.testing.assert_array_equal(compensated_sum(np.zeros((0, 3))), np.zeros(3))
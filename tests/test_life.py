@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from actuarial.life import CommutationTable, MortalityTable, life_annuity_value, makeham_table
+
+
+def _survival(table, x, years):  # t_p_x for t = 0..years, zero past the table
+    px = np.append(1 - table.qx[x - table.min_age:], np.zeros(years + 1))
+    return np.concatenate(([1.0], np.cumprod(px[:years])))
+
+
+def _annuity_due(table, x, i, n=None, deferred=0):  # sum over payment years of v^t t_p_x
+    n = table.max_age + 1 - (x + deferred) if n is None else n
+    tpx = _survival(table, x, deferred + n)
+    return sum((1 + i) ** -t * tpx[t] for t in range(deferred, deferred + n))
+
+
+def _insurance(table, x, i, n=None):  # sum of v^(t+1) t_p_x q_(x+t)
+    n = table.max_age + 1 - x if n is None else n
+    tpx = _survival(table, x, n)
+    qx = np.append(table.qx[x - table.min_age:], np.ones(n))
+    return sum((1 + i) ** -(t + 1) * tpx[t] * qx[t] for t in range(n))
+
+
+@pytest.mark.parametrize('i', [0.0, 0.03, 0.05])
+def test_commutation_values_match_brute_force(i):
+    table = makeham_table()
+    commutation = CommutationTable.build(table, i)
+    for x in (20, 45, 65, 90, 119):
+        assert commutation.annuity_due(x) == pytest.approx(_annuity_due(table, x, i), rel=1e-12)
+        assert commutation.annuity_immediate(x) == pytest.approx(_annuity_due(table, x, i) - 1, rel=1e-12)
+        assert commutation.insurance(x) == pytest.approx(_insurance(table, x, i), rel=1e-12)
+        n = min(10, table.max_age + 1 - x)
+        assert commutation.annuity_due(x, n) == pytest.approx(_annuity_due(table, x, i, n), rel=1e-12)
+        assert commutation.annuity_due(x, n, deferred=5) == pytest.approx(
+            _annuity_due(table, x, i, n, deferred=5), rel=1e-12, abs=1e-15)
+        assert commutation.pure_endowment(x, n) == pytest.approx(_survival(table, x, n)[n] * (1 + i) ** -n,
+                                                                 rel=1e-12, abs=1e-300)
+        assert commutation.endowment_insurance(x, n) == pytest.approx(
+            _insurance(table, x, i, n) + _survival(table, x, n)[n] * (1 + i) ** -n, rel=1e-12)
+
+
+def test_whole_life_identity():  # A_x = 1 - d * ä_x
+    commutation = CommutationTable.build(makeham_table(), 0.05)
+    ages = np.arange(20, 121)
+    np.testing.assert_allclose(commutation.insurance(ages), 1 - 0.05 / 1.05 * commutation.annuity_due(ages),
+                               rtol=1e-12)
+
+
+def test_life_annuity_value_vectorizes_ages_and_rates():
+    table = makeham_table()
+    values = life_annuity_value(table, 1000.0, np.array([0.03, 0.05]), np.array([40, 65]))
+    for row, i in enumerate((0.03, 0.05)):
+        for col, x in enumerate((40, 65)):
+            assert values[row, col] == pytest.approx(1000.0 * _annuity_due(table, x, i), rel=1e-12)
+
+
+def test_mortality_table_validation():
+    with pytest.raises(ValueError):
+        MortalityTable([60, 62], [0.01, 0.02])
+    with pytest.raises(ValueError):
+        MortalityTable([60, 61], [0.01, 1.5])
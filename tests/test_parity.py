@@ -0,0 +1,120 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from actuarial.accel import available, backend, use_backend
+from actuarial.amortization import LoanModel, amortize_portfolio
+from actuarial.cashflows import xirr
+from actuarial.retirement import _simulate_chunk
+from actuarial.solvers import bond_ytm, solve_tvm_rate
+
+needs_numba = pytest.mark.skipif(not available(), reason="numba is not installed")
+
+
+def _loans(seed, n_loans):  # (principals, annual_rates, years, extra_payments) covering the edge cases
+    rng = np.random.default_rng(seed)
+    principals = rng.uniform(1_000, 1_000_000, n_loans)
+    principals[::17] = rng.uniform(0.01, 5.0, principals[::17].size)
+    annual_rates = rng.uniform(0, 0.15, n_loans)
+    annual_rates[::7] = 0.0
+    years = rng.integers(1, 41, n_loans)
+    extra_payments = np.where(rng.random(n_loans) < 0.5, rng.uniform(1, 5_000, n_loans), 0.0)
+    return principals, annual_rates, years, extra_payments
+
+
+def _tvm_problems(seed, n_problems):  # (PV, FV, PMT, n_periods, due) with zero, negative and extreme rates
+    rng = np.random.default_rng(seed)
+    PV = -rng.uniform(1e2, 1e6, n_problems)
+    PMT = -rng.uniform(0, 1e4, n_problems)
+    PMT[::5] = 0.0
+    n_periods = rng.integers(1, 480, n_problems).astype(float)
+    rates = rng.uniform(-0.05, 0.3, n_problems)
+    rates[::7] = 0.0
+    rates[::11] = rng.uniform(1e-9, 1e-5, rates[::11].size)
+    due = rng.random(n_problems) < 0.5
+    growth = (1 + rates) ** n_periods
+    s = np.where(rates == 0, n_periods, (growth - 1) / np.where(rates == 0, 1.0, rates))
+    FV = PV * growth + PMT * s * np.where(due, 1 + rates, 1.0)
+    FV[::13] = 1e6  # No root: the kernels must agree on NaN too
+    return PV, FV, PMT, n_periods, due
+
+
+def _bonds(seed, n_bonds):  # (price, face, coupon_rate, years, frequency), deep discounts and premiums included
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(5, 250, n_bonds), 100.0, rng.uniform(0, 0.15, n_bonds), rng.integers(1, 50, n_bonds),
+            rng.choice([1, 2, 4, 12], n_bonds))
+
+
+SIMULATIONS = {  # (months_to_retirement, total_months, savings, contribution, withdrawal_rate, withdrawal)
+    'accumulate only': (360, 360, 10_000.0, 500.0, 0.04, None),
+    'rate withdrawals': (246, 720, 50_000.0, 750.0, 0.09, None),
+    'fixed withdrawals': (0, 480, 400_000.0, 0.0, 0.04, 3_000.0),
+}
+
+
+def _schedules(loans):
+    columns = [LoanModel(*loan).schedule for loan in zip(*loans)]
+    return {field: np.concatenate([schedule[field] for schedule in columns]) for field in columns[0]}
+
+
+def _simulation(name, seed=0):
+    retire, total, savings, contribution, rate, withdrawal = SIMULATIONS[name]
+    task = (np.random.SeedSequence(seed), 2_000, retire, total, savings, contribution, 0.005, 0.045, rate, withdrawal)
+    return {'yearly': _simulate_chunk(task)}
+
+
+def _xirr(seed, n_problems):  # Irregular flows, some with no sign change (no root)
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64('2020-01-01') + np.cumsum(rng.integers(1, 200, 24))
+    results = []
+    for _ in range(n_problems):
+        amounts = np.r_[-rng.uniform(1e3, 1e5), rng.uniform(-1e3, 1e4, 23)]
+        results.append(xirr(amounts, dates, guess=rng.uniform(-0.5, 1.0)))
+    return {field: np.array([getattr(result, field) for result in results]) for field in results[0]._fields}
+
+
+CASES = {
+    'amortize_portfolio': lambda: amortize_portfolio(*_loans(0, 2_000)),
+    'LoanModel.schedule': lambda: _schedules(_loans(1, 300)),
+    'solve_tvm_rate': lambda: solve_tvm_rate(*_tvm_problems(2, 3_000))._asdict(),
+    'bond_ytm': lambda: bond_ytm(*_bonds(3, 3_000))._asdict(),
+    'xirr': lambda: _xirr(4, 50),
+}
+CASES.update({f'simulate_retirement ({name})': lambda name=name: _simulation(name) for name in SIMULATIONS})
+
+
+def _assert_identical(expected, actual):
+    assert expected.keys() == actual.keys()
+    for key, value in expected.items():
+        value, other = np.asarray(value), np.asarray(actual[key])
+        assert value.dtype == other.dtype and value.shape == other.shape, key
+        assert value.tobytes() == other.tobytes(), key
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_uncompiled_kernels_match_numpy(name):
+    with use_backend('numpy'):
+        expected = CASES[name]()
+    with use_backend('python'):
+        actual = CASES[name]()
+    _assert_identical(expected, actual)
+
+
+@needs_numba
+@pytest.mark.parametrize('name', CASES)
+def test_numba_matches_numpy(name):
+    with use_backend('numpy'):
+        expected = CASES[name]()
+    with use_backend('numba'):
+        actual = CASES[name]()
+    _assert_identical(expected, actual)
+
+
+def test_use_backend_is_local_to_the_thread():
+    default = backend()
+    with use_backend('python'):
+        with ThreadPoolExecutor(1) as pool:
+            assert pool.submit(backend).result() == default
+        assert backend() == 'python'
+    assert backend() == default
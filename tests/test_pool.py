@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from actuarial.pool import LoanPool, cpr_from_smm, pool_cash_flows, prepayment_rates, smm_from_cpr
+
+FIELDS = ('beginning_balance', 'interest', 'scheduled_principal', 'prepaid_principal', 'ending_balance')
+
+
+def _smm(speed, age, model):  # One month's SMM, straight from the model definitions
+    if model == 'SMM':
+        return speed
+    cpr = speed if model == 'CPR' else speed / 100 * 0.06 * min(age, 30) / 30
+    return 1 - (1 - min(cpr, 1.0)) ** (1 / 12)
+
+
+def _replay(balances, annual_rates, remaining_months, ages, speed, model):  # Loan by loan, month by month
+    months = int(max(remaining_months))
+    flows = {field: np.zeros(months) for field in FIELDS}
+    for balance, annual_rate, term, age in zip(balances, annual_rates, remaining_months, ages):
+        rate = annual_rate / 12
+        for t in range(int(term)):
+            remaining = term - t
+            payment = balance / remaining if rate == 0 else balance * rate / (1 - (1 + rate) ** -remaining)
+            interest = balance * rate
+            scheduled = payment - interest
+            prepaid = (balance - scheduled) * _smm(speed, age + t + 1, model)
+            flows['beginning_balance'][t] += balance
+            flows['interest'][t] += interest
+            flows['scheduled_principal'][t] += scheduled
+            flows['prepaid_principal'][t] += prepaid
+            balance -= scheduled + prepaid
+            flows['ending_balance'][t] += balance
+    return flows
+
+
+def _loans(seed, n_loans):
+    rng = np.random.default_rng(seed)
+    balances = rng.uniform(5e4, 5e5, n_loans)
+    annual_rates = rng.uniform(0.02, 0.08, n_loans)
+    annual_rates[::9] = 0.0
+    remaining_months = rng.integers(1, 121, n_loans)
+    ages = rng.choice([0, 6, 24, 60], n_loans)
+    return balances, annual_rates, remaining_months, ages
+
+
+@pytest.mark.parametrize('model, speed', [('CPR', 0.0), ('CPR', 0.08), ('SMM', 0.01), ('PSA', 100.0),
+                                          ('PSA', 250.0), ('PSA', 2000.0)])
+def test_pool_matches_loan_by_loan_replay(model, speed):
+    balances, annual_rates, remaining_months, ages = _loans(1, 60)
+    flows = pool_cash_flows(balances, annual_rates, remaining_months, speed, model, ages)
+    expected = _replay(balances, annual_rates, remaining_months, ages, speed, model)
+    for field in FIELDS:
+        assert flows[field] == pytest.approx(expected[field], rel=1e-9, abs=1e-6), field
+    principal = expected['scheduled_principal'] + expected['prepaid_principal']
+    assert flows['cash_flow'] == pytest.approx(principal + expected['interest'], rel=1e-9, abs=1e-6)
+    months = np.arange(1, principal.size + 1)
+    assert flows['weighted_average_life'] == pytest.approx(principal @ months / principal.sum() / 12, rel=1e-9)
+
+
+def test_speed_sweep_matches_one_speed_at_a_time():
+    pool = LoanPool(*_loans(2, 200))
+    speeds = np.array([[50.0, 100.0, 150.0], [200.0, 300.0, 400.0]])
+    sweep = pool.cash_flows(speeds)
+    assert sweep['cash_flow'].shape == (2, 3, pool.months)
+    for index in np.ndindex(speeds.shape):
+        single = pool.cash_flows(speeds[index])
+        for field, values in single.items():
+            assert sweep[field][index] == pytest.approx(values, rel=1e-12, abs=1e-9), field
+
+
+def test_principal_is_fully_returned():
+    balances, annual_rates, remaining_months, ages = _loans(3, 100)
+    flows = pool_cash_flows(balances, annual_rates, remaining_months, [0, 100, 500], 'PSA', ages)
+    assert flows['total_principal'].sum(axis=1) == pytest.approx(np.full(3, balances.sum()), rel=1e-12)
+    assert flows['ending_balance'][:, -1] == pytest.approx(np.zeros(3), abs=1e-6)
+
+
+def test_paid_off_loans_are_ignored():
+    flows = pool_cash_flows([1e5, 0.0, 5e4], [0.05, 0.05, 0.04], [12, 24, 0], 0.06, 'CPR')
+    assert flows['cash_flow'].shape == (12,)
+    assert flows['beginning_balance'][0] == pytest.approx(1e5)
+
+
+def test_prepayment_rates():
+    assert cpr_from_smm(smm_from_cpr([0.0, 0.06, 0.5])) == pytest.approx([0.0, 0.06, 0.5], rel=1e-12)
+    psa = prepayment_rates([100, 200], [1, 15, 30, 100], 'PSA')
+    assert cpr_from_smm(psa) == pytest.approx(np.array([[0.002, 0.03, 0.06, 0.06], [0.004, 0.06, 0.12, 0.12]]),
+                                            rel=1e-12)
+    assert prepayment_rates(5000, [40], 'PSA') == pytest.approx(np.ones((1, 1)))
+    with pytest.raises(ValueError):
+        prepayment_rates(100, [1], 'ABS')
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from actuarial.accel import use_backend
+from actuarial.retirement import _monthly_growth, _simulate_chunk, retirement_balance_series, simulate_retirement
+
+
+def _deterministic(current_savings, monthly_contribution, annual_return, months, withdrawal_rate, retire):
+    # Zero-volatility path: monthly growth (1 + annual_return)^(1/12), month by month
+    growth, wealth, withdrawal, balances = (1 + annual_return) ** (1 / 12), current_savings, None, [current_savings]
+    for month in range(months):
+        if month < retire:
+            wealth = wealth * growth + monthly_contribution
+        else:
+            withdrawal = wealth * withdrawal_rate / 12 if withdrawal is None else withdrawal
+            wealth = max(wealth * growth - withdrawal, 0.0)
+        if month % 12 == 11:
+            balances.append(wealth)
+    return np.array(balances)
+
+
+def test_zero_volatility_matches_deterministic_path():
+    result = simulate_retirement(30, 65, 10_000.0, 500.0, 0.07, annual_volatility=0.0, end_age=95, n_paths=50,
+                                 withdrawal_rate=0.06, seed=1)
+    expected = _deterministic(10_000.0, 500.0, 0.07, 65 * 12, 0.06, 35 * 12)
+    for band in result['percentiles'].values():
+        np.testing.assert_allclose(band, expected, rtol=1e-12)
+    _, series = retirement_balance_series(30, 65, 10_000.0, 500.0, 12 * np.expm1(np.log1p(0.07) / 12))
+    assert result['retirement_wealth'][50] == pytest.approx(series[-1], rel=1e-12)
+
+
+def _growth(seed, n_paths, monthly_drift, monthly_volatility):
+    growth = np.empty((12, n_paths))
+    _monthly_growth(np.random.default_rng(seed), monthly_drift, monthly_volatility,
+                    np.empty((2, 6, n_paths), dtype=np.float32), np.empty((12, n_paths), dtype=np.float32), growth)
+    return growth
+
+
+def test_monthly_growth_moments():
+    growth = _growth(0, 200_000, 0.005, 0.04)
+    log_returns = np.log(growth)
+    assert growth.shape == (12, 200_000) and growth.dtype == np.float64
+    assert log_returns.mean() == pytest.approx(0.005, abs=3 * 0.04 / np.sqrt(log_returns.size))
+    assert log_returns.std() == pytest.approx(0.04, rel=2e-3)
+
+
+def test_monthly_growth_is_box_muller_on_float32_uniforms():
+    uniforms = np.random.default_rng(3).random((2, 6, 1_000), dtype=np.float32)
+    radius = np.sqrt(-2 * np.log1p(-uniforms[0].astype(float))) * 0.04
+    angle = 2 * np.pi * uniforms[1].astype(float)
+    expected = np.exp(0.005 + np.r_[radius * np.cos(angle), radius * np.sin(angle)])
+    np.testing.assert_allclose(_growth(3, 1_000, 0.005, 0.04), expected, rtol=1e-6)
+
+
+def test_results_do_not_depend_on_workers():
+    kwargs = dict(end_age=40, n_paths=30_000, seed=7)
+    serial = simulate_retirement(30, 35, 10_000.0, 500.0, 0.07, **kwargs)
+    parallel = simulate_retirement(30, 35, 10_000.0, 500.0, 0.07, workers=2, **kwargs)
+    for percentile, band in serial['percentiles'].items():
+        np.testing.assert_array_equal(band, parallel['percentiles'][percentile])
+
+
+@pytest.mark.parametrize('withdrawal', [None, 2_500.0])
+def test_kernel_matches_numpy_path(withdrawal):  # The uncompiled _grow_year against the NumPy month loop
+    task = (np.random.SeedSequence(3), 400, 246, 480, 50_000.0, 750.0, 0.005, 0.045, 0.09, withdrawal)
+    with use_backend('numpy'):
+        expected = _simulate_chunk(task)
+    with use_backend('python'):
+        actual = _simulate_chunk(task)
+    assert actual.tobytes() == expected.tobytes()
+    assert (expected[-1] == 0).any()  # Some paths run out, so the floor at zero is exercised
+
+
+def test_rejects_inconsistent_ages():
+    with pytest.raises(ValueError):
+        simulate_retirement(70, 65, 10_000.0, 500.0, 0.07, n_paths=10)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from actuarial.scenarios import GrowthTable, project_retirement, scenario_columns
+
+SCENARIOS = [
+    {'current_age': 30, 'retirement_age': 65, 'current_savings': 10_000, 'monthly_contribution': 500,
+     'annual_return': 0.07, 'withdrawal_rate': 0.04},
+    {'current_age': 45, 'retirement_age': 60, 'current_savings': 250_000, 'monthly_contribution': 1_500,
+     'annual_return': 0.05, 'withdrawal_rate': 0.15},
+    {'current_age': 60, 'retirement_age': 60, 'current_savings': 800_000, 'monthly_contribution': 0,
+     'annual_return': 0.0, 'withdrawal_rate': 0.06},
+    {'current_age': 25, 'retirement_age': 40, 'current_savings': 0, 'monthly_contribution': 200,
+     'annual_return': -0.02, 'withdrawal_rate': 0.5},
+]
+
+
+def _balances(scenario, start, end):  # Month by month from current_age; NaN before it
+    rate = scenario['annual_return'] / 12
+    retirement_months = (scenario['retirement_age'] - scenario['current_age']) * 12
+    balance = float(scenario['current_savings'])
+    withdrawal, path = balance * scenario['withdrawal_rate'] / 12, [balance]
+    for month in range(1, (end - scenario['current_age']) * 12 + 1):
+        if month <= retirement_months:
+            balance = balance * (1 + rate) + scenario['monthly_contribution']
+            withdrawal = balance * scenario['withdrawal_rate'] / 12
+        else:
+            balance = max(balance * (1 + rate) - withdrawal, 0.0)
+        path.append(balance)
+    return np.r_[np.full((scenario['current_age'] - start) * 12, np.nan), path]
+
+
+@pytest.mark.parametrize('monthly', [False, True])
+def test_projection_matches_month_loop(monthly):
+    result = project_retirement(SCENARIOS, end_age=90, monthly=monthly)
+    start = min(scenario['current_age'] for scenario in SCENARIOS)
+    expected = np.column_stack([_balances(scenario, start, 90) for scenario in SCENARIOS])
+    expected = expected if monthly else expected[::12]
+    assert result['balances'].shape == expected.shape
+    assert np.array_equal(np.isnan(result['balances']), np.isnan(expected))
+    assert result['balances'] == pytest.approx(expected, rel=1e-9, abs=1e-6, nan_ok=True)
+    assert result['ages'][0] == start and result['ages'][-1] == 90
+    assert len(result['ages']) == expected.shape[0]
+
+
+def test_retirement_balance_and_withdrawal():
+    result = project_retirement(SCENARIOS)
+    for index, scenario in enumerate(SCENARIOS):
+        path = _balances(scenario, scenario['current_age'], scenario['retirement_age'])
+        assert result['retirement_balance'][index] == pytest.approx(path[-1], rel=1e-12)
+        assert result['monthly_withdrawal'][index] == pytest.approx(path[-1] * scenario['withdrawal_rate'] / 12,
+                                                                    rel=1e-12)
+    assert result['ages'][-1] == max(scenario['retirement_age'] for scenario in SCENARIOS)
+
+
+def test_growth_table_matches_powers_and_sums():
+    rates = np.array([0.01, -0.005, 0.0, 0.01])
+    table = GrowthTable(rates, 24)
+    assert table.rates.size == 3  # Equal rates share a row
+    k = np.array([0, 1, 12, 24])
+    for index, rate in enumerate(rates):
+        expected = [100 * (1 + rate) ** n + 5 * sum((1 + rate) ** j for j in range(n)) for n in k]
+        actual = [table.future_value(100.0, 5.0, n, index) for n in k]
+        assert actual == pytest.approx(expected, rel=1e-12)
+
+
+def test_scenario_columns_defaults_and_validation():
+    columns = scenario_columns({'current_age': [30, 40], 'retirement_age': 65, 'annual_return': 0.05})
+    assert columns['current_savings'].tolist() == [0.0, 0.0]
+    assert columns['retirement_age'].tolist() == [65.0, 65.0]
+    with pytest.raises(ValueError, match='annual_return'):
+        scenario_columns([{'current_age': 30, 'retirement_age': 65}])
+    with pytest.raises(ValueError):
+        project_retirement({'current_age': 70, 'retirement_age': 65, 'annual_return': 0.05})
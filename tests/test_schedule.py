@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import reference
+from actuarial.amortization import LoanModel, amortize_portfolio
+from actuarial.schedule import MONEY_FIELDS, SCHEDULE_FIELDS, Schedule
+
+LOANS = [(250_000.0, 0.065, 30, 0.0), (180_000.0, 0.045, 15, 350.0), (12_500.0, 0.0, 5, 0.0),
+         (99_999.99, 0.0725, 10, 1234.56), (5_000.0, 0.0, 1, 400.0)]
+
+
+def _baseline_rows(principal, annual_rate, years, extra_payment):  # The baseline's payment divides by zero at 0%
+    monthly_rate, n_payments = annual_rate / 12, years * 12
+    payment = reference.monthly_payment(principal, monthly_rate, n_payments) if monthly_rate else principal / n_payments
+    if extra_payment > 0:
+        return reference.generate_amortization_schedule_with_extra(principal, monthly_rate, n_payments, payment,
+                                                                   extra_payment)
+    return reference.generate_amortization_schedule(principal, monthly_rate, n_payments, payment)
+
+
+@pytest.mark.parametrize('loan', LOANS)
+def test_loan_model_schedule_matches_baseline_rows(loan):
+    schedule, rows = LoanModel(*loan).schedule, _baseline_rows(*loan)
+    assert len(schedule) == len(rows)
+    assert schedule.rows() == rows
+    assert schedule['Payment'].tolist() == [row['Payment'] for row in rows]
+    for field in MONEY_FIELDS:  # Columns stay unrounded, within half a cent of the rounded rows
+        assert np.abs(schedule[field] - [row[field] for row in rows]).max() <= 0.005 + 1e-9, field
+
+
+@pytest.mark.parametrize('loan', LOANS)
+def test_from_rows_and_from_portfolio_agree_with_loan_model(loan):
+    expected = LoanModel(*loan).schedule
+    from_rows = Schedule.from_rows(_baseline_rows(*loan))
+    assert from_rows.rows() == expected.rows()
+    assert from_rows['Payment'].dtype == np.int32
+    schedules = amortize_portfolio(*([value] for value in loan))
+    from_portfolio = Schedule.from_portfolio(schedules, 0)
+    assert len(from_portfolio) == len(expected)
+    for field in SCHEDULE_FIELDS:
+        assert from_portfolio[field] == pytest.approx(expected[field], abs=1e-6), field
+
+
+def test_mapping_interface_and_size():
+    schedule = LoanModel(*LOANS[0]).schedule
+    assert list(schedule) == list(SCHEDULE_FIELDS) == list(schedule.keys())
+    assert [field for field, _ in schedule.items()] == list(SCHEDULE_FIELDS)
+    assert all(values is schedule[field] for field, values in zip(SCHEDULE_FIELDS, schedule.values()))
+    assert 'Interest' in schedule and 'Rate' not in schedule
+    assert schedule.nbytes == len(schedule) * (4 + 8 * len(MONEY_FIELDS))
+
+
+def test_round_copies_money_columns():
+    schedule = LoanModel(*LOANS[1]).schedule
+    rounded = schedule.round()
+    for field in MONEY_FIELDS:
+        assert rounded[field].tolist() == [row[field] for row in schedule.rows()]
+    assert not np.array_equal(rounded['Interest'], schedule['Interest'])  # The original stays unrounded
+    assert np.array_equal(rounded['Payment'], schedule['Payment'])
+
+
+def test_columns_are_read_only_views():
+    source = {field: np.arange(1.0, 4.0) for field in SCHEDULE_FIELDS}
+    schedule = Schedule(source)
+    with pytest.raises(ValueError):
+        schedule['Interest'][0] = 0.0
+    assert np.shares_memory(schedule['Interest'], source['Interest'])
+    source['Interest'][0] = 9.0  # The caller's array stays writeable
+    assert schedule['Interest'][0] == 9.0
+
+
+def test_to_dataframe():
+    pd = pytest.importorskip('pandas')
+    schedule = LoanModel(*LOANS[3]).schedule
+    frame = schedule.to_dataframe(decimals=2)
+    assert list(frame.columns) == list(SCHEDULE_FIELDS)
+    pd.testing.assert_frame_equal(frame, pd.DataFrame(schedule.rows()), check_dtype=False)
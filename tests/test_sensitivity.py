@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from actuarial.annuities import growing_annuity
+from actuarial.bonds import price_bonds
+from actuarial.curves import YieldCurve
+from actuarial.sensitivity import bump_and_reprice, finite_difference_greeks, key_rate_bumps, sensitivity_grid
+
+
+def _annuity(PMT, r, g, n):
+    return growing_annuity(PMT, r, g, n)
+
+
+def test_grid_matches_scalar_loop():
+    base = {'PMT': 1000.0, 'r': 0.06, 'g': 0.03, 'n': 30}
+    shocks = {'r': np.linspace(-0.03, 0.03, 7), 'g': np.linspace(-0.02, 0.02, 5), 'n': [-10, 0, 10]}
+    grid = sensitivity_grid(_annuity, base, shocks)
+    assert grid.values.shape == (7, 5, 3)
+    for i, dr in enumerate(shocks['r']):
+        for j, dg in enumerate(shocks['g']):
+            for k, dn in enumerate(shocks['n']):
+                expected = float(_annuity(1000.0, 0.06 + dr, 0.03 + dg, 30 + dn))
+                assert grid.values[i, j, k] == pytest.approx(expected, rel=1e-13)
+
+
+def test_relative_grid_and_constant_function():
+    grid = sensitivity_grid(_annuity, {'PMT': 1000.0, 'r': 0.05, 'g': 0.0, 'n': 10}, {'PMT': [-0.5, 0.0, 1.0]},
+                            relative=True)
+    base = float(_annuity(1000.0, 0.05, 0.0, 10))
+    np.testing.assert_allclose(grid.values, [base / 2, base, 2 * base], rtol=1e-13)
+    flat = sensitivity_grid(lambda x: 1.0, {'x': 0.0}, {'x': [1, 2, 3]})  # Broadcast to the grid shape
+    np.testing.assert_array_equal(flat.values, [1.0, 1.0, 1.0])
+
+
+def test_to_frame_is_tidy():
+    pytest.importorskip('pandas')
+    grid = sensitivity_grid(lambda a, b: a * b, {'a': 1.0, 'b': 2.0}, {'a': [0, 1], 'b': [0, 1, 2]})
+    frame = grid.to_frame('product')
+    assert list(frame.columns) == ['a shock', 'b shock', 'product']
+    assert len(frame) == 6
+    np.testing.assert_allclose(frame['product'], (1 + frame['a shock']) * (2 + frame['b shock']))
+
+
+def test_bump_and_reprice_matches_scalar_reprice():
+    base = {'face_value': 100.0, 'coupon_rate': 0.05, 'years': 10, 'ytm': 0.04, 'frequency': 2}
+
+    def price(**params): return price_bonds(**params)['price']
+
+    changes = bump_and_reprice(price, base, {'ytm': 1e-4, 'coupon_rate': 0.01})
+    assert changes['ytm'] == pytest.approx(float(price(**dict(base, ytm=0.0401)) - price(**base)), rel=1e-10)
+    assert changes['coupon_rate'] == pytest.approx(float(price(**dict(base, coupon_rate=0.06)) - price(**base)),
+                                                   rel=1e-10)
+
+
+def test_greeks_match_analytic_duration_and_convexity():
+    ytm = np.array([0.01, 0.04, 0.08])
+    base = {'face_value': 100.0, 'coupon_rate': np.array([0.0, 0.05, 0.1]), 'years': np.array([5, 10, 30]),
+            'ytm': ytm, 'frequency': 2}
+
+    def price(**params): return price_bonds(**params)['price']
+
+    greeks = finite_difference_greeks(price, base, 'ytm', bump=1e-5)
+    analytic = price_bonds(**base)
+    np.testing.assert_allclose(greeks['value'], analytic['price'], rtol=1e-14)
+    np.testing.assert_allclose(-greeks['delta'] / greeks['value'], analytic['modified_duration'], rtol=1e-7)
+    np.testing.assert_allclose(greeks['gamma'] / greeks['value'], analytic['convexity'], rtol=1e-4)
+
+
+def test_curve_shift_grid_matches_shifted_curves():
+    curve = YieldCurve([0.5, 2, 5, 10, 30], [0.03, 0.032, 0.035, 0.038, 0.04])
+    shocks = np.linspace(-0.03, 0.03, 13)
+    grid = sensitivity_grid(lambda curve_shift: price_bonds(100.0, 0.045, 12, curve, 2, curve_shift)['price'],
+                            {'curve_shift': 0.0}, {'curve_shift': shocks})
+    expected = [float(price_bonds(100.0, 0.045, 12, curve.shifted(shock), 2)['price']) for shock in shocks]
+    np.testing.assert_allclose(grid.values, expected, rtol=1e-13)
+
+
+def test_key_rate_bumps_add_up_to_parallel_shift():
+    curve = YieldCurve([1, 2, 5, 10, 30], [0.03, 0.032, 0.035, 0.038, 0.04])
+
+    def price(c): return price_bonds(100.0, 0.05, 10, c, 2)['price']
+
+    bumps = key_rate_bumps(price, curve)
+    assert list(bumps) == [1.0, 2.0, 5.0, 10.0, 30.0]
+    assert bumps[30.0] == 0.0  # Past the bond's maturity
+    parallel = float(price(curve.shifted(1e-4)) - price(curve))
+    assert sum(bumps.values()) == pytest.approx(parallel, rel=1e-3)
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from actuarial import service
+from actuarial.amortization import amortize_portfolio, schedule_rows
+from actuarial.bonds import price_bonds
+
+
+async def _read_response(reader):  # (status, body bytes), de-chunking a chunked body
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    headers = dict(line.lower().split(': ', 1) for line in head[1:] if line)
+    if headers.get('transfer-encoding') == 'chunked':
+        body = b''
+        while size := int((await reader.readuntil(b'\r\n'))[:-2], 16):
+            body += await reader.readexactly(size)
+            assert await reader.readexactly(2) == b'\r\n'
+        assert await reader.readexactly(2) == b'\r\n'
+    else:
+        body = await reader.readexactly(int(headers['content-length']))
+    return int(head[0].split()[1]), body
+
+
+def _exchange(requests, **options):  # Send (method, path, payload) requests on one keep-alive connection
+    async def run():
+        calculation = service.CalculationService(**{'workers': 0, **options})
+        server = await calculation.start(port=0)
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        responses = []
+        try:
+            for method, path, payload in requests:
+                body = b'' if payload is None else json.dumps(payload).encode()
+                writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                responses.append(await _read_response(reader))
+        finally:
+            writer.close()
+            await calculation.close()
+        return responses
+    return asyncio.run(run())
+
+
+def test_bond_batch_and_errors():
+    payload = {'face_value': 1000, 'coupon_rate': [0.05, 0.03], 'years': 10, 'ytm': 0.04}
+    (status, body), (bad, error), (missing, _) = _exchange([
+        ('POST', '/bond', payload), ('POST', '/bond', {'face_value': 1000}), ('GET', '/nowhere', None)])
+    assert status == 200
+    np.testing.assert_array_equal(json.loads(body)['price'], price_bonds(1000, [0.05, 0.03], 10, 0.04)['price'])
+    assert bad == 400 and 'coupon_rate' in json.loads(error)['error']
+    assert missing == 404
+
+
+def test_schedule_stream_matches_rows():
+    payload = {'principal': [1e5, 2.5e5] * 60, 'annual_rate': 0.05, 'years': 15}
+    [(status, body)] = _exchange([('POST', '/amortization/schedule', payload)])
+    records = [json.loads(line) for line in body.decode().splitlines()]
+    schedules = amortize_portfolio(payload['principal'], 0.05, 15)
+    assert status == 200 and len(records) == 120 * 180
+    for loan in (0, 101):
+        rows = [{key: value for key, value in record.items() if key != 'loan'}
+                for record in records if record['loan'] == loan]
+        assert rows == schedule_rows(schedules, loan)
+
+
+def test_error_after_stream_start_ends_the_stream(monkeypatch):
+    schedule_ndjson = service.schedule_ndjson
+
+    def fail_on_second_chunk(loans):
+        if loans[0][0] >= service.STREAM_LOANS:
+            raise ValueError("chunk failed")
+        return schedule_ndjson(loans)
+    monkeypatch.setattr(service, 'schedule_ndjson', fail_on_second_chunk)
+    payload = {'principal': [1e5] * 150, 'annual_rate': 0.05, 'years': 1}
+    (status, body), (health, _) = _exchange([('POST', '/amortization/schedule', payload), ('GET', '/health', None)])
+    lines = body.decode().splitlines()
+    assert status == 200 and len(lines) == service.STREAM_LOANS * 12 + 1
+    assert json.loads(lines[-1]) == {'error': 'ValueError: chunk failed'}
+    assert health == 200  # The connection is still in sync for the next request
+
+
+def test_worker_timings_reach_metrics():
+    from actuarial import instrumentation
+    instrumentation.enable()
+    try:
+        instrumentation.events(clear=True)
+        payload = {'face_value': 1000, 'coupon_rate': 0.05, 'years': 10, 'ytm': 0.04}
+        (status, _), (bad, _), (_, metrics) = _exchange(
+            [('POST', '/bond', payload), ('POST', '/bond', {'years': 10}), ('GET', '/metrics', None)],
+            workers=1, inline_limit=0)
+    finally:
+        instrumentation.disable()
+        instrumentation.events(clear=True)
+    assert status == 200 and bad == 400
+    assert 'actuarial_phase_seconds_count{calculator="/bond",phase="total"} 2' in metrics.decode()
+
+
+@pytest.mark.parametrize('request_head', [
+    b"POST /bond HTTP/1.1\r\nContent-Length: ten\r\n\r\n",
+    b"POST /bond HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+    b"POST /bond HTTP/1.1\r\nX-Padding: " + b"x" * 100_000 + b"\r\n\r\n",
+])
+def test_bad_request_heads_get_a_400(request_head):
+    async def run():
+        calculation = service.CalculationService(workers=0)
+        server = await calculation.start(port=0)
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        try:
+            writer.write(request_head)
+            return await _read_response(reader)
+        finally:
+            writer.close()
+            await calculation.close()
+    status, body = asyncio.run(run())
+    assert status == 400 and json.loads(body)['error']
+
+
+def test_schedule_streams_size_the_work_by_term(monkeypatch):
+    calls = []
+
+    async def record(self, func, *args, pooled=False):
+        calls.append(pooled)
+        return func(*args)
+    monkeypatch.setattr(service.CalculationService, '_run', record)
+    short = {'principal': [1e5] * 20, 'annual_rate': 0.05, 'years': 1}
+    long = {'principal': 1e5, 'annual_rate': 0.05, 'years': 40}
+    _exchange([('POST', '/amortization/schedule', short), ('POST', '/amortization/schedule', long)],
+              inline_limit=300)
+    assert calls == [False, True]  # 240 rows stay on the loop; 480 go to the pool
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from actuarial.accel import use_backend
+from actuarial.bonds import price_bonds
+from actuarial.kernels import SERIES_CUTOFF
+from actuarial.solvers import _annuity_factors, bond_ytm, solve_tvm_periods, solve_tvm_rate
+
+
+@pytest.mark.parametrize('n', [1, 2, 12, 360, 1200])
+def test_annuity_factor_derivative_matches_finite_difference(n):
+    # Small rates either side of zero, across the |n log1p(x)| < SERIES_CUTOFF series cutoff for the longer terms
+    x = np.array([-2e-5, -1.0001e-5, -9.999e-6, -1e-6, 0.0, 1e-6, 9.999e-6, 1.0001e-5, 2e-5, 1e-3, 0.05])
+    h = 1e-7
+    _, s_up, _ = _annuity_factors(x + h, float(n))
+    _, s_down, _ = _annuity_factors(x - h, float(n))
+    _, _, ds = _annuity_factors(x, float(n))
+    np.testing.assert_allclose(ds, (s_up - s_down) / (2 * h), rtol=1e-6, atol=1e-6)
+
+
+def test_annuity_factor_derivative_continuous_at_cutoff():
+    n = 360.0
+    x = np.expm1(SERIES_CUTOFF / n)
+    _, _, ds = _annuity_factors(np.array([x * (1 - 1e-9), x * (1 + 1e-9)]), n)
+    assert ds[0] == pytest.approx(ds[1], rel=1e-9)
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'python'])
+def test_solve_tvm_rate_roundtrip(backend):
+    rng = np.random.default_rng(0)
+    rate, n = rng.uniform(0, 0.02, 500), rng.integers(1, 480, 500).astype(float)
+    PV, PMT = rng.uniform(0, 1e5, 500), rng.uniform(0, 1e3, 500)
+    growth = np.exp(n * np.log1p(rate))
+    FV = PV * growth + PMT * np.where(rate == 0, n, np.expm1(n * np.log1p(rate)) / np.where(rate == 0, 1, rate))
+    with use_backend(backend):
+        result = solve_tvm_rate(PV, FV, PMT, n)
+    assert result.converged.all()
+    np.testing.assert_allclose(result.root, rate, atol=1e-10)
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'python'])
+def test_bond_ytm_roundtrip(backend):
+    rng = np.random.default_rng(1)
+    ytm, coupon, years = rng.uniform(0.001, 0.12, 500), rng.uniform(0, 0.1, 500), rng.integers(1, 31, 500)
+    price = price_bonds(1000.0, coupon, years, ytm, 2)['price']
+    with use_backend(backend):
+        result = bond_ytm(price, 1000.0, coupon, years, 2)
+    assert result.converged.all()
+    np.testing.assert_allclose(result.root, ytm, atol=1e-10)
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'python'])
+def test_solve_tvm_rate_converges_on_steep_long_loans(backend):  # Newton alone creeps down from the bracket top
+    n = np.array([60.0, 240.0, 360.0, 480.0])
+    with use_backend(backend):
+        result = solve_tvm_rate(1000.0, 0.0, -10.0, n)
+    assert result.converged.all()
+    np.testing.assert_allclose(1000 * (1 + result.root) ** n - 10 * ((1 + result.root) ** n - 1) / result.root, 0,
+                               atol=1e-8)
+
+
+def test_solver_kernels_match_numpy_solvers():  # Bitwise, NaN for unbracketed problems included
+    PV, FV, PMT = np.array([1e3, -1e3, 1e3, -5e4]), np.array([2e3, 0.0, 0.0, 1e9]), np.array([0.0, 50.0, -10.0, 0.0])
+    n_periods, due = np.array([120.0, 24.0, 360.0, 12.0]), np.array([False, True, False, False])
+    price, coupon = np.array([5.0, 99.0, 100.0, 250.0]), np.array([0.0, 0.05, 0.0, 0.15])
+    years = np.array([50, 1, 10, 3])
+    with use_backend('numpy'):
+        expected = solve_tvm_rate(PV, FV, PMT, n_periods, due), bond_ytm(price, 100.0, coupon, years, 2)
+    with use_backend('python'):
+        actual = solve_tvm_rate(PV, FV, PMT, n_periods, due), bond_ytm(price, 100.0, coupon, years, 2)
+    for result, other in zip(expected, actual):
+        for field, values in result._asdict().items():
+            assert getattr(other, field).tobytes() == values.tobytes(), field
+
+
+def test_solve_tvm_periods_roundtrip():
+    n = solve_tvm_periods(1000.0, 1000.0 * 1.01 ** 120 + 50 * (1.01 ** 120 - 1) / 0.01, 50.0, 0.01)
+    assert n == pytest.approx(120, rel=1e-12)
+    assert solve_tvm_periods(1000.0, 2200.0, 10.0, 0.0) == pytest.approx(120)
+
+
+def test_solve_tvm_periods_zero_rate_without_payments():
+    assert solve_tvm_periods(1000.0, 1000.0, 0.0, 0.0) == 0.0
+    assert solve_tvm_periods(0.0, 0.0, 0.0, 0.05) == 0.0
+    with pytest.raises(ValueError):
+        solve_tvm_periods(1000.0, 2000.0, 0.0, 0.0)
+    n = solve_tvm_periods([1000.0, 1000.0, 1000.0], [1000.0, 2000.0, 2000.0], [0.0, 0.0, 10.0], 0.0,
+                          raise_on_unreachable=False)
+    np.testing.assert_array_equal(n, [0.0, np.nan, 100.0])
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from actuarial.curves import YieldCurve
+from actuarial.tvm import future_value, present_value, tvm_growth_series
+
+
+def _flat(r, m):  # Flat curve compounding m times a year: DF(t) = (1 + r/m)^-(m t)
+    return YieldCurve([1.0, 100.0], [r, r], compounding=m)
+
+
+def _payments_fv(PV, r, n, m, PMT, due):  # Period by period
+    balance = PV
+    for _ in range(n * m):
+        balance = (balance + PMT) * (1 + r / m) if due else balance * (1 + r / m) + PMT
+    return balance
+
+
+@pytest.mark.parametrize('PMT', [-100.0, 0.0, 100.0])
+@pytest.mark.parametrize('due', [False, True])
+def test_future_value_matches_period_loop(PMT, due):
+    assert future_value(1000.0, 0.05, 5, 12, PMT, due) == pytest.approx(_payments_fv(1000.0, 0.05, 5, 12, PMT, due),
+                                                                          rel=1e-12)
+
+
+def test_negative_payment_is_not_dropped():
+    assert future_value(1000.0, 0.05, 5, 12, -100.0) < future_value(1000.0, 0.05, 5, 12, 0.0)
+    assert present_value(1000.0, 0.05, 5, 12, -100.0) > present_value(1000.0, 0.05, 5, 12, 0.0)
+
+
+@pytest.mark.parametrize('PMT', [-100.0, 0.0, 250.0])
+@pytest.mark.parametrize('due', [False, True])
+def test_flat_curve_matches_flat_rate(PMT, due):
+    r, m, n = 0.05, 12, np.array([1, 5, 30])
+    curve = _flat(r, m)
+    np.testing.assert_allclose(future_value(1000.0, curve, n, m, PMT, due), future_value(1000.0, r, n, m, PMT, due),
+                               rtol=1e-12)
+    np.testing.assert_allclose(present_value(1000.0, curve, n, m, PMT, due),
+                               present_value(1000.0, r, n, m, PMT, due), rtol=1e-12, atol=1e-9)
+
+
+def test_present_value_inverts_future_value():
+    fv = future_value(1000.0, 0.07, 10, 4, -50.0, True)
+    assert present_value(fv, 0.07, 10, 4, -50.0, True) == pytest.approx(1000.0, rel=1e-12)
+
+
+def test_growth_series_and_zero_rate():
+    years, values = tvm_growth_series(1000.0, 0.0, 3, 12, "FV", -10.0)
+    assert years.tolist() == [0, 1, 2, 3]
+    np.testing.assert_allclose(values, [1000.0, 880.0, 760.0, 640.0])